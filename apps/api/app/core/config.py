@@ -31,10 +31,100 @@ class Settings(BaseSettings):
     vertex_location: str = "asia-northeast1"
     vector_index_id: str = ""
     vector_index_endpoint_id: str = ""
+    vector_deployed_index_id: str = "ai_paper_deployed_index"
+    # 近傍検索のマルチクエリバッチ（件数上限 / 最初の要求からの最大待ち秒）と専用スレッド数
+    vector_query_max_batch_size: int = 16
+    vector_query_batch_wait: float = 0.005
+    vector_query_max_workers: int = 2
+    # ベクトルストア（auto: Vector Search の設定があれば vertex、なければ local = NumPy）
+    vector_store_backend: str = "auto"
+    # local の保存先（.npz + 追記ログ。空ならメモリのみで Worker と共有されない）と保持精度（float32 / float16）
+    vector_store_path: str = ""
+    vector_store_dtype: str = "float32"
+    # 埋め込み生成のマイクロバッチ（件数上限 / 最初の要求からの最大待ち秒）と専用スレッド数
+    embedding_max_batch_size: int = 16
+    embedding_batch_wait: float = 0.01
+    embedding_max_workers: int = 2
+    # 埋め込みキャッシュ（メモリ LRU 件数 / SQLite ファイル、空ならメモリのみ）
+    embedding_cache_size: int = 4096
+    embedding_cache_path: str = ""
 
     # CORS
     cors_allow_origins: str = "http://localhost:3000"
 
+    # 外部HTTP接続プール（検索API共通）
+    http_connect_timeout: float = 5.0
+    http_read_timeout: float = 30.0
+    http_max_connections_per_host: int = 10
+    http_max_keepalive_per_host: int = 5
+    http_keepalive_expiry: float = 30.0
+    http_enable_http2: bool = False
+
+    # 検索結果キャッシュ（秒）
+    search_cache_max_entries: int = 1024
+    search_cache_default_ttl: float = 1800.0
+    search_cache_stale_ttl: float = 600.0
+    search_cache_ttls: dict[str, float] = {
+        "arxiv": 3600.0,
+        "pubmed": 1800.0,
+        "scholar": 21600.0,
+        "merged": 600.0,
+    }
+
+    # auto検索の戦略（hedged: 並列ヘッジ / sequential: 従来の順次）
+    search_auto_strategy: str = "hedged"
+    # 優先ソース起動から残りソースを起動するまでの待ち時間（秒）
+    search_hedge_delay: float = 1.0
+    # ソース間の近似重複（タイトル MinHash）を統合する
+    search_fuzzy_dedupe: bool = True
+
+    # ローカル論文カタログ（SQLite FTS5、空ならメモリ上）
+    local_catalog_path: str = ""
+    # カタログの上限件数（超えたら最後に登録・ヒットした時刻が古い行から削除）
+    local_catalog_max_rows: int = 50000
+    # auto 検索でカタログを先に引き、limit × この比率以上ヒットすれば外部APIを呼ばない
+    search_local_first: bool = True
+    search_local_min_ratio: float = 1.0
+    # ローカル優先で使うのは外部APIからこの秒数以内に受け取った行だけ（古い結果で外部APIを呼ばなくなるのを防ぐ）
+    search_local_max_age: float = 6 * 3600.0
+
+    # 検索結果の被引用数補完（Semantic Scholar /paper/batch）
+    citation_enrich_enabled: bool = True
+    # 検索レスポンスが被引用数の取得を待つ上限（秒）。超えた分は次回以降キャッシュから埋まる
+    citation_enrich_timeout: float = 0.3
+    citation_cache_ttl: float = 7 * 24 * 3600.0
+    citation_cache_size: int = 20000
+
+    # ユーザーごとのライブラリ（いいね済みID）集合のキャッシュ（表示用。他インスタンスでの変更はこの秒数だけ遅れる）
+    library_membership_ttl: float = 60.0
+    library_membership_max_users: int = 10000
+
+    # 検索再整理（LLM）の結果キャッシュとプロンプト圧縮
+    recluster_cache_size: int = 256
+    recluster_cache_ttl: float = 1800.0
+    # 全候補のアブストラクト合計の概算トークン上限（1件あたり最低 recluster_abstract_min_tokens）
+    recluster_abstract_token_budget: int = 6000
+    recluster_abstract_min_tokens: int = 40
+
+    # 検索ソース別レート制御（公開上限内のバースト数 / 同時実行数）
+    search_rate_bursts: dict[str, int] = {"arxiv": 1, "pubmed": 3, "scholar": 1}
+    search_rate_max_in_flight: dict[str, int] = {"arxiv": 1, "pubmed": 4, "scholar": 1}
+
+    # 検索ソース別サーキットブレーカー（直近 window 秒の呼び出しで判定）
+    search_breaker_window_seconds: float = 60.0
+    search_breaker_min_calls: int = 5
+    search_breaker_failure_rate: float = 0.5
+    # 上流リクエスト1回の所要時間（レート制御の待ちは含まない。arXiv はリトライ込み）
+    search_breaker_slow_call_seconds: float = 20.0
+    search_breaker_slow_call_rate: float = 0.8
+    search_breaker_open_seconds: float = 30.0
+
+    # Google Scholar（scholarly: 実スクレイピング / stub: オフライン負荷試験用）
+    scholar_backend: str = "scholarly"
+    scholar_max_workers: int = 2
+    scholar_search_timeout: float = 15.0
+    scholar_stub_delay: float = 0.2
+
     # Semantic Scholar
     # semantic_scholar_api_key is explicitly disabled per user request
     # semantic_scholar_api_key: str | None = None
@@ -44,6 +134,11 @@ class Settings(BaseSettings):
 
     # PubMed API Key
     pubmed_api_key: str | None = None
+    # efetch 1回あたりのPMID数 / アブストラクトキャッシュ件数
+    pubmed_efetch_batch_size: int = 200
+    pubmed_abstract_cache_size: int = 4096
+    # efetch の応答に含まれなかった PMID（途中で切れた応答など）を空として覚えておく秒数
+    pubmed_abstract_miss_ttl: float = 600.0
 
     # LLM Settings
     google_model_name: str = "gemini-2.0-flash"
@@ -51,6 +146,13 @@ class Settings(BaseSettings):
     # Graph connection strategy
     graph_connection_mode: str = "keyword"
 
+    # 関連論文の事前計算リスト（保存件数 / 再計算する経過秒 / 裏の再計算の同時実行数）
+    related_materialized_top_k: int = 20
+    related_materialized_max_age: float = 7 * 24 * 3600.0
+    related_refresh_concurrency: int = 2
+    # 取り込み・キーワード変更時に一緒に再計算する、リスト上位の論文数
+    related_refresh_neighbors: int = 10
+
     @property
     def cors_allow_origins_list(self) -> list[str]:
         """CORS許可オリジンをリストで返す"""
@@ -1,40 +1,174 @@
 """
 Vertex AI Embedding Utility
+
+- モデルはプロセス内で1回だけロードする
+- ブロッキングな get_embeddings は専用スレッドプールで実行し、イベントループを止めない
+- 同時に来た1件ずつの埋め込み要求を task_type ごとにマイクロバッチへまとめ、
+  max_batch_size 件たまるか max_wait 秒経過した時点で1回の API 呼び出しにする
+- 計算済みのベクトルは EmbeddingCache に保存し、同じテキストでは API を呼ばない
 """
-from google.cloud import aiplatform
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
 from vertexai.language_models import TextEmbeddingInput, TextEmbeddingModel
+
 from app.core.config import settings
-import logging
+from app.core.embedding_cache import EmbeddingCache, embedding_cache, embedding_cache_key
 
 logger = logging.getLogger(__name__)
 
 # Model constant (should match worker)
 MODEL_NAME = "text-embedding-004"
 
+# Vertex AI docs: RETRIEVAL_QUERY for query, RETRIEVAL_DOCUMENT for corpus.
+# Related-paper lookup treats the source paper as a query against the index.
+DEFAULT_TASK_TYPE = "RETRIEVAL_QUERY"
+
+
+@dataclass(eq=False)
+class _Batch:
+    items: list[tuple[str, asyncio.Future]] = field(default_factory=list)
+    timer: asyncio.TimerHandle | None = None
+
+
+class EmbeddingService:
+    def __init__(
+        self,
+        model_name: str = MODEL_NAME,
+        max_batch_size: int | None = None,
+        max_wait: float | None = None,
+        max_workers: int | None = None,
+        model=None,
+        cache: EmbeddingCache | None = None,
+    ):
+        self.model_name = model_name
+        self.max_batch_size = max(1, max_batch_size or settings.embedding_max_batch_size)
+        self.max_wait = settings.embedding_batch_wait if max_wait is None else max_wait
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.embedding_max_workers,
+            thread_name_prefix="embedding",
+        )
+        self._model = model
+        self.cache = cache if cache is not None else embedding_cache
+        self._model_lock = threading.Lock()
+        self._pending: dict[str, _Batch] = {}
+        self._running: set[asyncio.Task] = set()
+        self._counters = {"requests": 0, "batches": 0, "texts": 0, "errors": 0}
+
+    def _get_model(self):
+        """初回呼び出し時にロード（失敗時は次回再試行）。executor スレッドから呼ばれる"""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = TextEmbeddingModel.from_pretrained(self.model_name)
+        return self._model
+
+    def embed_batch_sync(self, texts: list[str], task_type: str = DEFAULT_TASK_TYPE) -> list[list[float]]:
+        """ブロッキングで複数テキストを埋め込む。キャッシュにないものだけを1回の API 呼び出しで送る"""
+        keys = [embedding_cache_key(self.model_name, task_type, text) for text in texts]
+        cached = self.cache.get_many(keys)
+        missing = list(dict.fromkeys(text for text, key in zip(texts, keys) if key not in cached))
+        if missing:
+            for text, vector in zip(missing, self._embed_uncached(missing, task_type)):
+                cached[embedding_cache_key(self.model_name, task_type, text)] = vector
+        return [cached[key] for key in keys]
+
+    def _embed_uncached(self, texts: list[str], task_type: str) -> list[list[float]]:
+        """API を呼び、結果をキャッシュへ書き込む"""
+        inputs = [TextEmbeddingInput(text=text, task_type=task_type) for text in texts]
+        vectors = [embedding.values for embedding in self._get_model().get_embeddings(inputs)]
+        if len(vectors) != len(texts):
+            raise RuntimeError(f"expected {len(texts)} embeddings, got {len(vectors)}")
+        self.cache.put_many(
+            {embedding_cache_key(self.model_name, task_type, text): vector for text, vector in zip(texts, vectors)}
+        )
+        return vectors
+
+    async def embed(self, text: str, task_type: str = DEFAULT_TASK_TYPE) -> list[float]:
+        """
+        1件の埋め込み（マイクロバッチ経由）。失敗時は空リストを返す。
+        """
+        if not text:
+            return []
+        self._counters["requests"] += 1
+        cached = self.cache.get(embedding_cache_key(self.model_name, task_type, text))
+        if cached is not None:
+            return cached
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        batch = self._pending.get(task_type)
+        if batch is None:
+            batch = _Batch()
+            self._pending[task_type] = batch
+            batch.timer = loop.call_later(self.max_wait, self._flush, task_type, batch)
+        batch.items.append((text, future))
+        if len(batch.items) >= self.max_batch_size:
+            self._flush(task_type, batch)
+
+        try:
+            return await future
+        except Exception as e:
+            logger.error(f"Embedding generation failed: {e}")
+            return []
+
+    def _flush(self, task_type: str, batch: _Batch) -> None:
+        if self._pending.get(task_type) is not batch:
+            return  # 件数上限で既に送信済み
+        del self._pending[task_type]
+        if batch.timer is not None:
+            batch.timer.cancel()
+        task = asyncio.ensure_future(self._run_batch(task_type, batch.items))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, task_type: str, items: list[tuple[str, asyncio.Future]]) -> None:
+        # 同じテキストはバッチ内で1回だけ送る
+        texts = list(dict.fromkeys(text for text, _ in items))
+        self._counters["batches"] += 1
+        self._counters["texts"] += len(texts)
+        loop = asyncio.get_running_loop()
+        try:
+            vectors = await loop.run_in_executor(self.executor, self._embed_uncached, texts, task_type)
+        except Exception as exc:
+            self._counters["errors"] += 1
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        by_text = dict(zip(texts, vectors))
+        for text, future in items:
+            if not future.done():
+                future.set_result(by_text[text])
+
+    def stats(self) -> dict:
+        batches = self._counters["batches"]
+        return {
+            **self._counters,
+            "avg_batch_size": round(self._counters["texts"] / batches, 2) if batches else 0.0,
+            "pending": sum(len(batch.items) for batch in self._pending.values()),
+            "cache": self.cache.stats(),
+        }
+
+
+# シングルトンインスタンス
+embedding_service = EmbeddingService()
+
+
 def generate_embedding(text: str) -> list[float]:
     """
-    Generate embedding for a single text string.
+    Generate embedding for a single text string (blocking, no batching).
+    Prefer `await embedding_service.embed(text)` from async code.
     """
     if not text:
         return []
 
     try:
-        model = TextEmbeddingModel.from_pretrained(MODEL_NAME)
-        inputs = [TextEmbeddingInput(text=text, task_type="RETRIEVAL_DOCUMENT")] # or RETRIEVAL_QUERY?
-        
-        # For searching related papers (paper-to-paper), DOCUMENT or QUERY?
-        # If we are finding customizable papers, maybe QUERY is better if we treat the source paper as a query.
-        # But 'RETRIEVAL_QUERY' is for short queries. A paper abstract is long.
-        # 'SEMANTIC_SIMILARITY' might be best for STS tasks?
-        # Vertex AI docs say: RETRIEVAL_QUERY for query, RETRIEVAL_DOCUMENT for corpus.
-        # Let's use RETRIEVAL_QUERY for now as we are "querying" the index.
-        inputs = [TextEmbeddingInput(text=text, task_type="RETRIEVAL_QUERY")]
-        
-        embeddings = model.get_embeddings(inputs)
-        if not embeddings:
-            return []
-            
-        return embeddings[0].values
+        return embedding_service.embed_batch_sync([text])[0]
     except Exception as e:
         logger.error(f"Embedding generation failed: {e}")
         return []
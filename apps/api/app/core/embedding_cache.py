@@ -0,0 +1,139 @@
+"""
+埋め込みベクトルのキャッシュ
+
+同じテキストの埋め込みを何度も API に要求しないよう、(モデル, task_type, sha256(テキスト)) をキーに保持する。
+- 1段目: プロセス内の LRU（返した値をそのまま保持）
+- 2段目: SQLite ファイル（float16 に詰めて保存、768次元で約1.5KB/件）
+  API と Worker が同じ `embedding_cache_path` を指せば互いの計算結果を再利用できる
+- float16 化による誤差はコサイン類似度で 1e-3 程度で、近傍検索の順位にはほぼ影響しない
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def embedding_cache_key(model: str, task_type: str, text: str) -> str:
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"{model}:{task_type}:{digest}"
+
+
+def pack_vector(vector: list[float]) -> bytes:
+    return np.asarray(vector, dtype=np.float16).tobytes()
+
+
+def unpack_vector(blob: bytes) -> list[float]:
+    return np.frombuffer(blob, dtype=np.float16).astype(np.float32).tolist()
+
+
+class EmbeddingCache:
+    def __init__(self, path: str = "", max_entries: int = 4096):
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self._memory: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"lookups": 0, "memory_hits": 0, "store_hits": 0, "misses": 0, "writes": 0}
+        self._conn: sqlite3.Connection | None = None
+        if path:
+            try:
+                self._conn = sqlite3.connect(path, check_same_thread=False)
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+                )
+                self._conn.commit()
+            except sqlite3.Error as exc:
+                logger.warning("Embedding cache store disabled (%s): %s", path, exc)
+                self._conn = None
+
+    @classmethod
+    def from_settings(cls) -> "EmbeddingCache":
+        return cls(path=settings.embedding_cache_path, max_entries=settings.embedding_cache_size)
+
+    def get(self, key: str) -> list[float] | None:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        """見つかったキーだけを返す。ファイル側のヒットはメモリ側へ昇格する"""
+        found: dict[str, list[float]] = {}
+        with self._lock:
+            missing: list[str] = []
+            for key in keys:
+                self._counters["lookups"] += 1
+                vector = self._memory.get(key)
+                if vector is None:
+                    missing.append(key)
+                    continue
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                found[key] = vector
+
+            if missing and self._conn is not None:
+                try:
+                    placeholders = ",".join("?" * len(missing))
+                    rows = self._conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", missing
+                    ).fetchall()
+                except sqlite3.Error as exc:
+                    logger.warning("Embedding cache read failed: %s", exc)
+                    rows = []
+                for key, blob in rows:
+                    vector = unpack_vector(blob)
+                    self._remember(key, vector)
+                    found[key] = vector
+                self._counters["store_hits"] += len(rows)
+            self._counters["misses"] += len(keys) - len(found)
+        return found
+
+    def put_many(self, vectors: dict[str, list[float]]) -> None:
+        vectors = {key: vector for key, vector in vectors.items() if vector}
+        if not vectors:
+            return
+        with self._lock:
+            for key, vector in vectors.items():
+                self._remember(key, vector)
+            self._counters["writes"] += len(vectors)
+            if self._conn is None:
+                return
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                        [(key, pack_vector(vector)) for key, vector in vectors.items()],
+                    )
+            except sqlite3.Error as exc:
+                logger.warning("Embedding cache write failed: %s", exc)
+
+    def _remember(self, key: str, vector: list[float]) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["lookups"]
+            hits = self._counters["memory_hits"] + self._counters["store_hits"]
+            stats = {
+                **self._counters,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "persistent": self._conn is not None,
+            }
+            if self._conn is not None:
+                try:
+                    stats["store_entries"] = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+                except sqlite3.Error:
+                    pass
+        return stats
+
+
+# シングルトンインスタンス
+embedding_cache = EmbeddingCache.from_settings()
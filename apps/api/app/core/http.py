@@ -0,0 +1,104 @@
+"""
+共有HTTPクライアントプール
+
+外部検索API（arXiv / PubMed / Semantic Scholar）向けの httpx.AsyncClient を
+ホスト単位で保持し、Keep-Alive による接続再利用を行います。
+起動・終了は FastAPI の lifespan から管理します。
+"""
+
+import importlib.util
+import logging
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class HttpClientPool:
+    """ホストごとに接続プールを持つ AsyncClient の管理クラス"""
+
+    def __init__(
+        self,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        max_connections_per_host: int = 10,
+        max_keepalive_per_host: int = 5,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+    ):
+        self._timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self._limits = httpx.Limits(
+            max_connections=max_connections_per_host,
+            max_keepalive_connections=max_keepalive_per_host,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._http2 = http2 and self._http2_available()
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        # aclose() 後は startup() まで新しいクライアントを作らない（終了後に接続が漏れないように）
+        self._closed = False
+
+    @classmethod
+    def from_settings(cls) -> "HttpClientPool":
+        return cls(
+            connect_timeout=settings.http_connect_timeout,
+            read_timeout=settings.http_read_timeout,
+            max_connections_per_host=settings.http_max_connections_per_host,
+            max_keepalive_per_host=settings.http_max_keepalive_per_host,
+            keepalive_expiry=settings.http_keepalive_expiry,
+            http2=settings.http_enable_http2,
+        )
+
+    @staticmethod
+    def _http2_available() -> bool:
+        # HTTP/2 は h2 パッケージがある場合のみ有効化（任意依存）
+        if importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested but 'h2' is not installed. Falling back to HTTP/1.1.")
+            return False
+        return True
+
+    def client_for(self, url: str) -> httpx.AsyncClient:
+        """URLのホストに対応する共有クライアントを返す（未作成なら生成）"""
+        if self._closed:
+            raise RuntimeError("HTTP client pool is closed")
+        host = urlsplit(url).netloc or url
+        client = self._clients.get(host)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=self._timeout,
+                limits=self._limits,
+                http2=self._http2,
+                follow_redirects=True,
+            )
+            self._clients[host] = client
+        return client
+
+    async def startup(self, hosts: list[str] | None = None) -> None:
+        """起動時に既知ホストのクライアントを事前生成する"""
+        self._closed = False
+        for url in hosts or []:
+            self.client_for(url)
+        logger.info("HTTP client pool started hosts=%s http2=%s", len(self._clients), self._http2)
+
+    async def aclose(self) -> None:
+        """全クライアントを閉じる（シャットダウン時）"""
+        self._closed = True
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as exc:
+                logger.warning("HTTP client close failed: %s", exc)
+
+    def stats(self) -> dict:
+        return {
+            "hosts": sorted(self._clients.keys()),
+            "http2": self._http2,
+        }
+
+
+# シングルトンインスタンス
+http_pool = HttpClientPool.from_settings()
@@ -1,6 +1,28 @@
 from .base import SearchResult, BaseSearchClient
+from .cache import SearchResultCache, search_cache
+from .singleflight import SingleFlight, search_singleflight
+from .breaker import CircuitBreaker, CircuitOpenError
+from .ratelimit import TokenBucketLimiter, rate_limit_key
+from .local_catalog import LocalCatalog, local_catalog
 from .arxiv import ArxivClient
 from .pubmed import PubmedClient
-from .scholar import ScholarClient
+from .scholar import ScholarClient, StubScholarBackend
 
-__all__ = ["SearchResult", "BaseSearchClient", "ArxivClient", "PubmedClient", "ScholarClient"]
+__all__ = [
+    "SearchResult",
+    "BaseSearchClient",
+    "SearchResultCache",
+    "search_cache",
+    "SingleFlight",
+    "search_singleflight",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "TokenBucketLimiter",
+    "rate_limit_key",
+    "LocalCatalog",
+    "local_catalog",
+    "ArxivClient",
+    "PubmedClient",
+    "ScholarClient",
+    "StubScholarBackend",
+]
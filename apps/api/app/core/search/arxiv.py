@@ -1,32 +1,51 @@
+from typing import Iterator
+
 import httpx
 import xml.etree.ElementTree as ET
-import time
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from app.core.http import HttpClientPool
 from app.core.search.base import BaseSearchClient, SearchResult
+from app.core.search.cache import SearchResultCache
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_ARXIV = "{http://arxiv.org/schemas/atom}"
+_ATOM_ENTRY = f"{_ATOM}entry"
+_ATOM_TITLE = f"{_ATOM}title"
+_ATOM_AUTHOR = f"{_ATOM}author"
+_ATOM_NAME = f"{_ATOM}name"
+_ATOM_PUBLISHED = f"{_ATOM}published"
+_ATOM_SUMMARY = f"{_ATOM}summary"
+_ATOM_LINK = f"{_ATOM}link"
+_ATOM_ID = f"{_ATOM}id"
+_ARXIV_PRIMARY_CATEGORY = f"{_ARXIV}primary_category"
+
+
+def _circuit_open(retry_state) -> bool:
+    # Stop backing off as soon as the breaker trips (other searches saw the outage too)
+    return retry_state.args[0].circuit_breaker.is_open
+
 
 class ArxivClient(BaseSearchClient):
+    SOURCE = "arxiv"
     BASE_URL = "https://export.arxiv.org/api/query"
+    PARSE_CHUNK_SIZE = 16 * 1024
 
-    def __init__(self):
+    def __init__(
+        self,
+        http_pool: HttpClientPool | None = None,
+        cache: SearchResultCache | None = None,
+    ):
         # ArXiv API Guideline: max 1 req / 3 sec is recommended
-        super().__init__(interval=3.0)
-        self._cache = {}
-        self._cache_ttl = 3600  # 1 hour
+        super().__init__(interval=3.0, http_pool=http_pool, cache=cache)
 
-    async def search(self, query: str, limit: int = 10) -> list[SearchResult]:
-        cache_key = f"{query}:{limit}"
-        now = time.time()
-        
-        # Check cache
-        if cache_key in self._cache:
-            data, timestamp = self._cache[cache_key]
-            if now - timestamp < self._cache_ttl:
-                return data
-            else:
-                del self._cache[cache_key]
-
-        await self._wait_for_rate_limit()
+    async def _search(self, query: str, limit: int = 10) -> list[SearchResult]:
+        # One token covers the whole title/all candidate sequence (as before).
+        # The circuit breaker is not held here: it times each HTTP attempt in _fetch_with_retry,
+        # so retry backoff is not one long call and failures rescued by a fallback still count.
+        async with self._rate_limiter.slot():
+            return await self._search_candidates(query, limit)
 
+    async def _search_candidates(self, query: str, limit: int) -> list[SearchResult]:
         # Prioritize title matching first to catch exact-paper queries early.
         cleaned_query = query.strip()
         candidates = []
@@ -58,14 +77,12 @@ class ArxivClient(BaseSearchClient):
         if not results:
             # if all candidates fail, let the last attempt bubble up for visibility
             results = await self._fetch_with_retry(f"all:{cleaned_query}", limit)
-        
-        # Update cache
-        self._cache[cache_key] = (results, now)
+
         return results
 
     @retry(
         retry=retry_if_exception_type(httpx.HTTPStatusError),
-        stop=stop_after_attempt(3),
+        stop=stop_after_attempt(3) | _circuit_open,
         wait=wait_exponential(multiplier=1, min=4, max=10)
     )
     async def _fetch_with_retry(self, query: str, limit: int) -> list[SearchResult]:
@@ -77,61 +94,99 @@ class ArxivClient(BaseSearchClient):
             "sortOrder": "descending"
         }
         
-        async with httpx.AsyncClient() as client:
+        client = self._http(self.BASE_URL)
+        async with self.circuit_breaker.guard():
             response = await client.get(self.BASE_URL, params=params, timeout=30.0, follow_redirects=True)
             response.raise_for_status()
-            return self._parse_response(response.text)
+        return self._parse_response(response.content)
 
-    def _parse_response(self, xml_data: str) -> list[SearchResult]:
-        root = ET.fromstring(xml_data)
-        ns = {'atom': 'http://www.w3.org/2005/Atom', 'arxiv': 'http://arxiv.org/schemas/atom'}
-        
-        results = []
-        for entry in root.findall('atom:entry', ns):
-            # Title
-            title = entry.find('atom:title', ns).text.strip().replace('\n', ' ')
-            
-            # Authors
-            authors = [a.find('atom:name', ns).text for a in entry.findall('atom:author', ns)]
-            
-            # Year (Published)
-            published = entry.find('atom:published', ns).text
-            year = int(published[:4]) if published else None
-            
-            # Abstract
-            summary = entry.find('atom:summary', ns).text.strip().replace('\n', ' ')
-            
-            # Links (PDF & DOI)
-            pdf_url = None
-            doi = None
-            for link in entry.findall('atom:link', ns):
-                if link.attrib.get('title') == 'pdf':
-                    pdf_url = link.attrib.get('href')
-                if link.attrib.get('title') == 'doi':
-                    doi = link.attrib.get('href').replace('http://dx.doi.org/', '')
-
-            # ArXiv ID
-            id_url = entry.find('atom:id', ns).text
-            arxiv_id = id_url.split('/abs/')[-1]
-            
-            # External IDs
-            external_ids = {"ArXiv": arxiv_id}
-            if doi:
-                external_ids["DOI"] = doi
-            
-            # Venue
-            primary_category = entry.find('arxiv:primary_category', ns)
-            venue = f"arXiv:{primary_category.attrib['term']}" if primary_category is not None else "arXiv"
-
-            results.append(SearchResult(
-                title=title,
-                authors=authors,
-                year=year,
-                venue=venue,
-                abstract=summary,
-                external_ids=external_ids,
-                pdf_url=pdf_url,
-                source="arxiv"
-            ))
-            
-        return results
+    def _parse_response(self, xml_data: str | bytes) -> list[SearchResult]:
+        return list(self._iter_entries(xml_data))
+
+    def _iter_entries(self, xml_data: str | bytes) -> Iterator[SearchResult]:
+        """
+        Incrementally parse an Atom feed and yield SearchResult lazily.
+        Each <entry> is read once by walking its children and cleared right
+        after, so memory stays flat regardless of max_results.
+        """
+        if isinstance(xml_data, str):
+            xml_data = xml_data.encode("utf-8")
+        parser = ET.XMLPullParser(events=("start", "end"))
+        root = None
+        # Feed in chunks so a large page is never materialized as a full tree
+        for offset in range(0, len(xml_data), self.PARSE_CHUNK_SIZE):
+            parser.feed(xml_data[offset:offset + self.PARSE_CHUNK_SIZE])
+            for event, elem in parser.read_events():
+                if event == "start":
+                    if root is None:
+                        root = elem
+                    continue
+                if elem.tag != _ATOM_ENTRY:
+                    continue
+                result = self._entry_to_result(elem)
+                # Drop the finished entry (and any feed-level siblings) from the root
+                root.clear()
+                if result is not None:
+                    yield result
+        parser.close()
+
+    @staticmethod
+    def _entry_to_result(entry: ET.Element) -> SearchResult | None:
+        title = ""
+        summary = ""
+        published = None
+        id_url = ""
+        authors: list[str] = []
+        pdf_url = None
+        doi = None
+        venue = "arXiv"
+
+        for child in entry:
+            tag = child.tag
+            if tag == _ATOM_TITLE:
+                title = _clean_text(child.text)
+            elif tag == _ATOM_AUTHOR:
+                for name in child:
+                    if name.tag == _ATOM_NAME:
+                        authors.append(name.text)
+            elif tag == _ATOM_PUBLISHED:
+                published = child.text
+            elif tag == _ATOM_SUMMARY:
+                summary = _clean_text(child.text)
+            elif tag == _ATOM_LINK:
+                link_title = child.get("title")
+                if link_title == "pdf":
+                    pdf_url = child.get("href")
+                elif link_title == "doi":
+                    doi = (child.get("href") or "").replace("http://dx.doi.org/", "")
+            elif tag == _ATOM_ID:
+                id_url = child.text or ""
+            elif tag == _ARXIV_PRIMARY_CATEGORY:
+                venue = f"arXiv:{child.get('term')}"
+
+        if not id_url:
+            # Entries without an id cannot be deduplicated; skip them
+            return None
+
+        # ArXiv ID
+        arxiv_id = id_url.split('/abs/')[-1]
+
+        # External IDs
+        external_ids = {"ArXiv": arxiv_id}
+        if doi:
+            external_ids["DOI"] = doi
+
+        return SearchResult(
+            title=title,
+            authors=authors,
+            year=int(published[:4]) if published else None,
+            venue=venue,
+            abstract=summary,
+            external_ids=external_ids,
+            pdf_url=pdf_url,
+            source="arxiv"
+        )
+
+
+def _clean_text(text: str | None) -> str:
+    return (text or "").strip().replace('\n', ' ')
@@ -1,8 +1,16 @@
-import asyncio
-import time
 from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+import httpx
 from pydantic import BaseModel
 
+from app.core.config import settings
+from app.core.http import HttpClientPool, http_pool as default_http_pool
+from app.core.search.breaker import CircuitBreaker
+from app.core.search.cache import SearchResultCache, search_cache
+from app.core.search.ratelimit import TokenBucketLimiter
+from app.core.search.singleflight import SingleFlight, search_singleflight
+
 class SearchResult(BaseModel):
     title: str
     authors: list[str]
@@ -13,26 +21,90 @@ class SearchResult(BaseModel):
     pdf_url: str | None = None
     source: str
 
+class PartialResults(list):
+    """
+    Results cut short by a deadline or an upstream error mid-page.
+    SearchResultCache keeps them only for its short empty_ttl.
+    """
+    partial = True
+
+    def __getitem__(self, index):
+        item = super().__getitem__(index)
+        # single-flight slices a larger page down to the caller's limit
+        return PartialResults(item) if isinstance(index, slice) else item
+
 class BaseSearchClient(ABC):
-    def __init__(self, interval: float = 1.0):
+    SOURCE = ""
+
+    def __init__(
+        self,
+        interval: float = 1.0,
+        requests_per_interval: int = 1,
+        http_pool: HttpClientPool | None = None,
+        cache: SearchResultCache | None = None,
+        singleflight: SingleFlight | None = None,
+        rate_limiter: TokenBucketLimiter | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+    ):
         self._interval = interval
-        self._last_request_time = 0.0
-        self._lock = asyncio.Lock()
-
-    async def _wait_for_rate_limit(self):
-        """Rate Limiter: Ensures interval between requests"""
-        async with self._lock:
-            now = time.time()
-            elapsed = now - self._last_request_time
-            if elapsed < self._interval:
-                wait_time = self._interval - elapsed
-                await asyncio.sleep(wait_time)
-            self._last_request_time = time.time()
+        self._rate_limiter = rate_limiter or TokenBucketLimiter.for_published_limit(
+            requests=requests_per_interval,
+            per=interval,
+            burst=settings.search_rate_bursts.get(self.SOURCE, 1),
+            max_in_flight=settings.search_rate_max_in_flight.get(self.SOURCE),
+        )
+        self._http_pool = http_pool or default_http_pool
+        self._cache = cache or search_cache
+        self._singleflight = singleflight or search_singleflight
+        self.circuit_breaker = circuit_breaker or CircuitBreaker.from_settings(self.SOURCE)
+
+    def _http(self, url: str) -> httpx.AsyncClient:
+        """共有プールからホスト別のHTTPクライアントを取得する"""
+        return self._http_pool.client_for(url)
+
+    @asynccontextmanager
+    async def _rate_limited(self) -> AsyncIterator[None]:
+        """
+        Rate Limiter: Acquire one token and one in-flight slot for a request.
+        Waiting callers do not hold a lock; they are queued fairly per user.
+        The circuit breaker times the request only after the slot is acquired,
+        so queueing behind the rate limit never counts as a slow upstream call.
+        """
+        async with self._rate_limiter.slot():
+            async with self.circuit_breaker.guard():
+                yield
+
+    def rate_limit_stats(self) -> dict:
+        return self._rate_limiter.stats()
 
-    @abstractmethod
     async def search(self, query: str, limit: int = 10) -> list[SearchResult]:
         """
-        Search for papers.
-        Must call await self._wait_for_rate_limit() before making request.
+        Search for papers (through the shared result cache).
+        Concurrent identical lookups share one upstream call.
+        Raises CircuitOpenError without calling upstream while the source is sick.
+        """
+        return await self._cache.get_or_load(
+            self.SOURCE,
+            query,
+            limit,
+            lambda: self._singleflight.do(
+                self.SOURCE,
+                query,
+                limit,
+                lambda: self._guarded_search(query, limit),
+            ),
+        )
+
+    async def _guarded_search(self, query: str, limit: int) -> list[SearchResult]:
+        # Reject before queueing behind the rate limiter while the source is sick
+        self.circuit_breaker.raise_if_open()
+        return await self._search(query, limit)
+
+    @abstractmethod
+    async def _search(self, query: str, limit: int = 10) -> list[SearchResult]:
+        """
+        Search for papers without cache.
+        Must wrap each upstream request in `async with self._rate_limited():`
+        (rate limiting and circuit breaker accounting).
         """
         pass
@@ -0,0 +1,184 @@
+"""
+検索ソースごとのサーキットブレーカー
+
+上流API（arXiv / NCBI など）が劣化している間は呼び出しを即座に失敗させ、
+リトライ待ちでユーザーの検索が数十秒止まるのを防ぐ。
+- closed: 通常。直近 window_seconds の上流リクエストのエラー率・低速率を集計（レート制御の待ちは含まない）
+- open: エラー率または低速率がしきい値を超えたら open_seconds の間すべて拒否
+- half_open: 経過後に試行呼び出しを1本だけ通し、成功なら closed、失敗なら再び open
+"""
+
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable
+
+from app.core.config import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """ブレーカーが open のため上流APIを呼ばずに失敗させた"""
+
+    def __init__(self, source: str, retry_after: float):
+        super().__init__(f"circuit open for {source} (retry after {retry_after:.1f}s)")
+        self.source = source
+        self.retry_after = retry_after
+
+
+@dataclass
+class _Call:
+    finished_at: float
+    ok: bool
+    latency: float
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        source: str,
+        window_seconds: float = 60.0,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 20.0,
+        slow_call_rate: float = 0.8,
+        open_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.source = source
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._calls: deque[_Call] = deque()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._counters = {"rejected": 0, "opened": 0}
+
+    @classmethod
+    def from_settings(cls, source: str) -> "CircuitBreaker":
+        return cls(
+            source,
+            window_seconds=settings.search_breaker_window_seconds,
+            min_calls=settings.search_breaker_min_calls,
+            failure_rate=settings.search_breaker_failure_rate,
+            slow_call_seconds=settings.search_breaker_slow_call_seconds,
+            slow_call_rate=settings.search_breaker_slow_call_rate,
+            open_seconds=settings.search_breaker_open_seconds,
+        )
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == OPEN
+
+    def allows_request(self) -> bool:
+        """今呼び出せば拒否されないか（half_open で試行中なら False）"""
+        state = self.state
+        return state == CLOSED or (state == HALF_OPEN and not self._probe_in_flight)
+
+    def raise_if_open(self) -> None:
+        """今呼び出すと拒否される状態なら CircuitOpenError を送出する"""
+        if not self.allows_request():
+            self._counters["rejected"] += 1
+            raise CircuitOpenError(self.source, self._retry_after())
+
+    @asynccontextmanager
+    async def guard(self) -> AsyncIterator[None]:
+        """
+        1回の上流リクエストを囲む（レート制御の枠を確保した後）。拒否時は CircuitOpenError を送出する。
+        キャンセルは成否に数えない（ヘッジ検索で負けたタスクなど）。
+        """
+        self.raise_if_open()
+        probe = self.state == HALF_OPEN
+        if probe:
+            self._probe_in_flight = True
+        started_at = self._clock()
+        try:
+            yield
+        except Exception:
+            self._record(False, self._clock() - started_at, probe)
+            raise
+        except BaseException:
+            if probe:
+                self._probe_in_flight = False
+            raise
+        else:
+            self._record(True, self._clock() - started_at, probe)
+
+    def _record(self, ok: bool, latency: float, probe: bool) -> None:
+        now = self._clock()
+        if probe:
+            self._probe_in_flight = False
+            if ok and latency < self.slow_call_seconds:
+                self._state = CLOSED
+                self._calls.clear()
+            else:
+                self._open(now)
+            self._calls.append(_Call(now, ok, latency))
+            return
+
+        self._calls.append(_Call(now, ok, latency))
+        self._prune(now)
+        if self._state != CLOSED or len(self._calls) < self.min_calls:
+            return
+        error_rate, slow_rate = self._rates()
+        if error_rate >= self.failure_rate or slow_rate >= self.slow_call_rate:
+            self._open(now)
+
+    def _open(self, now: float) -> None:
+        self._state = OPEN
+        self._opened_at = now
+        self._counters["opened"] += 1
+
+    def _prune(self, now: float) -> None:
+        while self._calls and now - self._calls[0].finished_at > self.window_seconds:
+            self._calls.popleft()
+
+    def _rates(self) -> tuple[float, float]:
+        if not self._calls:
+            return 0.0, 0.0
+        failures = sum(1 for call in self._calls if not call.ok)
+        slow = sum(1 for call in self._calls if call.latency >= self.slow_call_seconds)
+        return failures / len(self._calls), slow / len(self._calls)
+
+    def _retry_after(self) -> float:
+        if self._state != OPEN:
+            return 0.0
+        return max(0.0, self.open_seconds - (self._clock() - self._opened_at))
+
+    def health(self) -> float:
+        """0〜1 の健全度（1 - max(エラー率, 低速率)、open 中は 0）"""
+        if self.state == OPEN:
+            return 0.0
+        self._prune(self._clock())
+        return round(1.0 - max(self._rates()), 4)
+
+    def stats(self) -> dict:
+        self._prune(self._clock())
+        error_rate, slow_rate = self._rates()
+        latencies = sorted(call.latency for call in self._calls)
+        return {
+            "state": self.state,
+            "health": self.health(),
+            "calls": len(self._calls),
+            "error_rate": round(error_rate, 4),
+            "slow_rate": round(slow_rate, 4),
+            "p50_ms": int(latencies[len(latencies) // 2] * 1000) if latencies else 0,
+            "p95_ms": int(latencies[int(len(latencies) * 0.95)] * 1000) if latencies else 0,
+            "retry_after": round(self._retry_after(), 1),
+            **self._counters,
+        }
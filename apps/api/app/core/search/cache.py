@@ -0,0 +1,220 @@
+"""
+検索結果キャッシュ
+
+全検索ソース共通の結果キャッシュ層。
+- LRU によるエントリ数上限
+- ソース別 TTL
+- stale-while-revalidate（期限切れ直後は古い結果を返しつつ裏で再取得）
+- ヒット/ミス等のカウンタ
+"""
+
+import asyncio
+import logging
+import re
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    stored_at: float
+    ttl: float
+
+
+class ResultCacheBackend(ABC):
+    """キャッシュ保存先の抽象（メモリ以外の実装に差し替え可能）"""
+
+    @abstractmethod
+    def get(self, key: str) -> CacheEntry | None:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, entry: CacheEntry) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+
+class InMemoryLRUBackend(ResultCacheBackend):
+    """OrderedDict による LRU 実装"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max(1, max_entries)
+        self.evictions = 0
+        self._data: OrderedDict[str, CacheEntry] = OrderedDict()
+
+    def get(self, key: str) -> CacheEntry | None:
+        entry = self._data.get(key)
+        if entry is not None:
+            self._data.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def normalize_query(query: str) -> str:
+    """大文字小文字・空白の揺れを吸収したキャッシュ用クエリ"""
+    return re.sub(r"\s+", " ", (query or "").strip().lower())
+
+
+class SearchResultCache:
+    def __init__(
+        self,
+        backend: ResultCacheBackend | None = None,
+        source_ttls: dict[str, float] | None = None,
+        default_ttl: float = 1800.0,
+        stale_ttl: float = 600.0,
+        empty_ttl: float = 60.0,
+    ):
+        self.backend = backend if backend is not None else InMemoryLRUBackend()
+        self.source_ttls = dict(source_ttls or {})
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.empty_ttl = empty_ttl
+        self._refreshing: dict[str, asyncio.Task] = {}
+        self._counters = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0}
+
+    @classmethod
+    def from_settings(cls) -> "SearchResultCache":
+        return cls(
+            backend=InMemoryLRUBackend(max_entries=settings.search_cache_max_entries),
+            source_ttls=settings.search_cache_ttls,
+            default_ttl=settings.search_cache_default_ttl,
+            stale_ttl=settings.search_cache_stale_ttl,
+        )
+
+    @staticmethod
+    def make_key(source: str, query: str, limit: int) -> str:
+        return f"{source}:{limit}:{normalize_query(query)}"
+
+    def ttl_for(self, source: str, value: Any = None) -> float:
+        ttl = self.source_ttls.get(source.split(":")[0], self.default_ttl)
+        if self._is_degraded(value):
+            # 空結果（障害時のフォールバック含む）や途中で打ち切られた結果は短めに保持する
+            return min(ttl, self.empty_ttl)
+        return ttl
+
+    @staticmethod
+    def _is_degraded(value: Any) -> bool:
+        if isinstance(value, tuple) and len(value) == 2 and isinstance(value[1], dict):
+            # 複数ソースの統合結果 (results, meta)。いずれかのソースが失敗・スキップ・部分結果なら degraded
+            results, meta = value
+            if meta.get("degraded"):
+                return True
+            value = results
+        return isinstance(value, list) and (not value or getattr(value, "partial", False))
+
+    def get(self, source: str, query: str, limit: int) -> Any | None:
+        """期限内のエントリのみ返す（stale は返さない）"""
+        entry = self.backend.get(self.make_key(source, query, limit))
+        if entry is None or time.monotonic() - entry.stored_at >= entry.ttl:
+            return None
+        return self._copy(entry.value)
+
+    def set(self, source: str, query: str, limit: int, value: Any) -> None:
+        self.backend.set(
+            self.make_key(source, query, limit),
+            CacheEntry(value=value, stored_at=time.monotonic(), ttl=self.ttl_for(source, value)),
+        )
+
+    async def get_or_load(
+        self,
+        source: str,
+        query: str,
+        limit: int,
+        loader: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        key = self.make_key(source, query, limit)
+        entry = self.backend.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.stored_at
+            if age < entry.ttl:
+                self._counters["hits"] += 1
+                return self._copy(entry.value)
+            if age < entry.ttl + self.stale_ttl:
+                self._counters["stale_hits"] += 1
+                self._schedule_refresh(key, source, query, limit, loader)
+                return self._copy(entry.value)
+
+        self._counters["misses"] += 1
+        value = await loader()
+        self.set(source, query, limit, value)
+        return self._copy(value)
+
+    def _schedule_refresh(
+        self,
+        key: str,
+        source: str,
+        query: str,
+        limit: int,
+        loader: Callable[[], Awaitable[Any]],
+    ) -> None:
+        if key in self._refreshing:
+            return
+
+        async def _refresh():
+            try:
+                value = await loader()
+                self.set(source, query, limit, value)
+                self._counters["refreshes"] += 1
+            except Exception as exc:
+                self._counters["refresh_errors"] += 1
+                logger.warning("Search cache refresh failed (%s): %s", key, exc)
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(_refresh())
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        # 呼び出し側の append 等でキャッシュ本体が変わらないようにする
+        return list(value) if isinstance(value, list) else value
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        lookups = self._counters["hits"] + self._counters["stale_hits"] + self._counters["misses"]
+        hit_rate = (self._counters["hits"] + self._counters["stale_hits"]) / lookups if lookups else 0.0
+        return {
+            **self._counters,
+            "size": len(self.backend),
+            "evictions": getattr(self.backend, "evictions", 0),
+            "hit_rate": round(hit_rate, 4),
+        }
+
+
+# シングルトンインスタンス
+search_cache = SearchResultCache.from_settings()
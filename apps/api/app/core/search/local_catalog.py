@@ -0,0 +1,229 @@
+"""
+ローカル論文カタログ（SQLite FTS5）
+
+外部APIから受け取った検索結果と `papers` コレクションの論文を埋め込み全文索引に蓄え、
+既知の論文はミリ秒で返せるようにする。
+- キーは検索の重複判定と同じ（arxiv: / doi: / pubmed: / title:）
+- 後から来た情報で空欄（アブストラクト・PDF URL・外部ID）を補完する
+- 件数上限を超えたら、最後に登録・ヒットした時刻が古い行から削除する（LRU）
+- 外部APIから最後に受け取った時刻（fetched_at）を持ち、auto のローカル優先では新しい行だけを使う
+- SQLite の呼び出しはスレッドで実行し、イベントループを塞がない
+- FTS5 が使えない環境では無効化され、検索は常に空になる
+"""
+
+import asyncio
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+
+from app.core.config import settings
+from app.core.search.base import SearchResult
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset("a an and are as at be by for from in is of on or the to with".split())
+# スキーマを変えたら上げる（古いファイルは作り直す。カタログは検索結果から再構築できる）
+_SCHEMA_VERSION = 2
+
+
+def catalog_key(result: SearchResult) -> str:
+    """検索結果の重複判定キー（SearchService._dedupe_key と同じ優先順）"""
+    ids = result.external_ids
+    if ids.get("ArXiv"):
+        return f"arxiv:{ids['ArXiv']}".lower()
+    if ids.get("DOI"):
+        return f"doi:{ids['DOI']}".lower()
+    if ids.get("PubMed"):
+        return f"pubmed:{ids['PubMed']}".lower()
+    return f"title:{result.title.strip().lower()}:{result.year or 0}"
+
+
+class LocalCatalog:
+    def __init__(self, path: str = ":memory:", max_rows: int = 50000):
+        self.path = path
+        self.max_rows = max(1, max_rows)
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._size = 0
+        self._counters = {"searches": 0, "hits": 0, "upserts": 0, "evictions": 0}
+        try:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+                self._conn.executescript(
+                    "DROP TABLE IF EXISTS catalog; DROP TABLE IF EXISTS catalog_fts;"
+                )
+            # 全文索引の rowid = catalog.id（キーからの削除・更新を rowid で引く）
+            self._conn.executescript(
+                f"""
+                CREATE TABLE IF NOT EXISTS catalog (
+                    id INTEGER PRIMARY KEY,
+                    key TEXT NOT NULL UNIQUE,
+                    payload TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    used_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS catalog_used_at ON catalog (used_at);
+                CREATE VIRTUAL TABLE IF NOT EXISTS catalog_fts USING fts5(
+                    title, abstract, authors,
+                    tokenize = 'porter unicode61'
+                );
+                PRAGMA user_version = {_SCHEMA_VERSION};
+                """
+            )
+            self._size = self._conn.execute("SELECT COUNT(*) FROM catalog").fetchone()[0]
+        except sqlite3.Error as exc:
+            logger.warning("Local catalog disabled (SQLite FTS5 unavailable): %s", exc)
+            self.enabled = False
+
+    @classmethod
+    def from_settings(cls) -> "LocalCatalog":
+        return cls(
+            path=settings.local_catalog_path or ":memory:",
+            max_rows=settings.local_catalog_max_rows,
+        )
+
+    async def add_results(self, results: list[SearchResult]) -> None:
+        """外部APIの検索結果をまとめて登録する（既存は空欄のみ補完）"""
+        if not self.enabled or not results:
+            return
+        await asyncio.to_thread(self._add_sync, [r for r in results if r.title])
+
+    async def add_paper(self, paper: dict) -> None:
+        """`papers` コレクションの論文（snake_case）を登録する"""
+        if not self.enabled or not paper.get("title"):
+            return
+        external_ids = {}
+        if paper.get("arxiv_id"):
+            external_ids["ArXiv"] = paper["arxiv_id"]
+        if paper.get("doi"):
+            external_ids["DOI"] = paper["doi"]
+        paper_id = str(paper.get("id") or "")
+        if paper_id.startswith("pubmed:"):
+            external_ids["PubMed"] = paper_id.split(":", 1)[1]
+        result = SearchResult(
+            title=paper.get("title", ""),
+            authors=paper.get("authors") or [],
+            year=paper.get("year"),
+            venue=paper.get("venue") or "",
+            abstract=paper.get("abstract") or "",
+            external_ids=external_ids,
+            pdf_url=paper.get("pdf_url"),
+            source="library",
+        )
+        await asyncio.to_thread(self._add_sync, [result])
+
+    def _add_sync(self, results: list[SearchResult]) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            for result in results:
+                self._upsert(catalog_key(result), result, now)
+            self._evict()
+
+    def _upsert(self, key: str, result: SearchResult, now: float) -> None:
+        row = self._conn.execute("SELECT id, payload FROM catalog WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            row_id, payload = row
+            existing = SearchResult.model_validate_json(payload)
+            merged_ids = {**result.external_ids, **existing.external_ids}
+            result = existing.model_copy(
+                update={
+                    "external_ids": merged_ids,
+                    "abstract": existing.abstract or result.abstract,
+                    "pdf_url": existing.pdf_url or result.pdf_url,
+                    "year": existing.year or result.year,
+                    "authors": existing.authors or result.authors,
+                    "venue": existing.venue or result.venue,
+                }
+            )
+            if result == existing:
+                self._conn.execute(
+                    "UPDATE catalog SET fetched_at = ?, used_at = ? WHERE id = ?", (now, now, row_id)
+                )
+                return
+            self._conn.execute(
+                "UPDATE catalog SET payload = ?, fetched_at = ?, used_at = ? WHERE id = ?",
+                (result.model_dump_json(), now, now, row_id),
+            )
+            self._conn.execute("DELETE FROM catalog_fts WHERE rowid = ?", (row_id,))
+        else:
+            row_id = self._conn.execute(
+                "INSERT INTO catalog (key, payload, fetched_at, used_at) VALUES (?, ?, ?, ?)",
+                (key, result.model_dump_json(), now, now),
+            ).lastrowid
+            self._size += 1
+        self._conn.execute(
+            "INSERT INTO catalog_fts (rowid, title, abstract, authors) VALUES (?, ?, ?, ?)",
+            (row_id, result.title, result.abstract, " ".join(result.authors)),
+        )
+        self._counters["upserts"] += 1
+
+    def _evict(self) -> None:
+        """上限を超えた分を used_at の古い順に削除する"""
+        excess = self._size - self.max_rows
+        if excess <= 0:
+            return
+        ids = [
+            (row_id,)
+            for (row_id,) in self._conn.execute(
+                "SELECT id FROM catalog ORDER BY used_at LIMIT ?", (excess,)
+            )
+        ]
+        self._conn.executemany("DELETE FROM catalog_fts WHERE rowid = ?", ids)
+        self._conn.executemany("DELETE FROM catalog WHERE id = ?", ids)
+        self._size -= len(ids)
+        self._counters["evictions"] += len(ids)
+
+    @staticmethod
+    def _match_expression(query: str) -> str:
+        # 全語を含むものを探す（FTS5 の構文文字はクォートで無害化）
+        tokens = [t for t in _TOKEN_RE.findall(query.lower()) if t not in _STOPWORDS]
+        return " ".join(f'"{token}"' for token in tokens)
+
+    async def search(self, query: str, limit: int = 10, max_age: float | None = None) -> list[SearchResult]:
+        """
+        タイトル重視の BM25 順で最大 limit 件を返す。
+        max_age（秒）を指定すると、外部APIからその秒数以内に受け取った行だけを対象にする。
+        """
+        if not self.enabled or limit <= 0:
+            return []
+        expression = self._match_expression(query)
+        if not expression:
+            return []
+        self._counters["searches"] += 1
+        return await asyncio.to_thread(self._search_sync, expression, limit, max_age)
+
+    def _search_sync(self, expression: str, limit: int, max_age: float | None) -> list[SearchResult]:
+        now = time.time()
+        fetched_after = now - max_age if max_age is not None else float("-inf")
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                """
+                SELECT catalog.id, catalog.payload
+                FROM catalog_fts
+                JOIN catalog ON catalog.id = catalog_fts.rowid
+                WHERE catalog_fts MATCH ? AND catalog.fetched_at >= ?
+                ORDER BY bm25(catalog_fts, 10.0, 1.0, 0.5)
+                LIMIT ?
+                """,
+                (expression, fetched_after, limit),
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE catalog SET used_at = ? WHERE id = ?", [(now, row_id) for row_id, _ in rows]
+            )
+        if rows:
+            self._counters["hits"] += 1
+        return [SearchResult.model_validate(json.loads(payload)) for _, payload in rows]
+
+    def __len__(self) -> int:
+        return self._size if self.enabled else 0
+
+    def stats(self) -> dict:
+        return {**self._counters, "enabled": self.enabled, "size": len(self), "max_rows": self.max_rows}
+
+
+# シングルトンインスタンス
+local_catalog = LocalCatalog.from_settings()
@@ -1,35 +1,144 @@
-import httpx
+import asyncio
+import io
+import logging
+import time
 import xml.etree.ElementTree as ET
+from app.core.http import HttpClientPool
 from app.core.search.base import BaseSearchClient, SearchResult
+from app.core.search.cache import CacheEntry, InMemoryLRUBackend, SearchResultCache
 
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 class PubmedClient(BaseSearchClient):
+    SOURCE = "pubmed"
     BASE_URL_SEARCH = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
     BASE_URL_SUMMARY = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi"
+    BASE_URL_FETCH = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
     DB = "pubmed"
 
-    def __init__(self):
+    def __init__(
+        self,
+        http_pool: HttpClientPool | None = None,
+        cache: SearchResultCache | None = None,
+        abstract_cache: InMemoryLRUBackend | None = None,
+    ):
         # PubMed API Limit: 3 req/s without key, 10 req/s with key.
-        # We use 0.1s (10 req/s) if key exists, otherwise 0.34s (approx 3 req/s)
+        # The token bucket allows short bursts while staying within that limit.
         self.api_key = settings.pubmed_api_key
-        interval = 0.1 if self.api_key else 0.34
-        super().__init__(interval=interval)
+        super().__init__(
+            interval=1.0,
+            requests_per_interval=10 if self.api_key else 3,
+            http_pool=http_pool,
+            cache=cache,
+        )
+        # Abstracts never change for a PMID, so returned articles are kept until evicted.
+        # PMIDs missing from an efetch response are only remembered for a short while.
+        self._abstract_cache = abstract_cache if abstract_cache is not None else InMemoryLRUBackend(
+            max_entries=settings.pubmed_abstract_cache_size
+        )
+        self._abstract_miss_ttl = settings.pubmed_abstract_miss_ttl
+        self._efetch_batch_size = settings.pubmed_efetch_batch_size
 
-    async def search(self, query: str, limit: int = 10) -> list[SearchResult]:
-        await self._wait_for_rate_limit()
-        
+    async def _search(self, query: str, limit: int = 10) -> list[SearchResult]:
         # 1. Search for IDs (esearch)
-        ids = await self._search_ids(query, limit)
+        async with self._rate_limited():
+            ids = await self._search_ids(query, limit)
         if not ids:
             return []
-        
-        # 2. Get details (esummary)
-        # Note: We should ideally rate limit this second call too, 
-        # but our simple lock handles "search" as one unit. 
-        # If we split calls, we should call wait logic again.
-        await self._wait_for_rate_limit() 
-        return await self._get_details(ids)
+
+        # 2. Get details (esummary) and abstracts (efetch) in parallel.
+        # Each upstream call takes its own token: 3 calls for a whole page.
+        async def get_details():
+            async with self._rate_limited():
+                return await self._get_details(ids)
+
+        results, abstracts = await asyncio.gather(
+            get_details(),
+            self.fetch_abstracts(ids),
+            return_exceptions=True,
+        )
+        if isinstance(results, BaseException):
+            raise results
+        if isinstance(abstracts, BaseException):
+            # Abstracts are an enrichment; keep the esummary results on failure
+            logger.warning("PubMed efetch failed: %s", abstracts)
+            return results
+        for result in results:
+            result.abstract = abstracts.get(result.external_ids.get("PubMed", ""), "")
+        return results
+
+    async def fetch_abstracts(self, pmids: list[str]) -> dict[str, str]:
+        """
+        Fetch abstracts for PMIDs via batched efetch (cached by PMID).
+        Articles returned without an abstract map to "" so they are not refetched;
+        PMIDs absent from the response (truncated fetch) map to "" with a finite TTL.
+        """
+        abstracts: dict[str, str] = {}
+        missing: list[str] = []
+        now = time.monotonic()
+        for pmid in dict.fromkeys(pmids):
+            entry = self._abstract_cache.get(pmid)
+            if entry is not None and now - entry.stored_at < entry.ttl:
+                abstracts[pmid] = entry.value
+            else:
+                missing.append(pmid)
+        if not missing:
+            return abstracts
+
+        chunks = [
+            missing[i:i + self._efetch_batch_size]
+            for i in range(0, len(missing), self._efetch_batch_size)
+        ]
+        fetched = await asyncio.gather(*(self._efetch_chunk(chunk) for chunk in chunks))
+        now = time.monotonic()
+        for chunk, chunk_abstracts in zip(chunks, fetched):
+            for pmid in chunk:
+                returned = pmid in chunk_abstracts
+                abstract = chunk_abstracts.get(pmid, "")
+                abstracts[pmid] = abstract
+                ttl = float("inf") if returned else self._abstract_miss_ttl
+                self._abstract_cache.set(pmid, CacheEntry(value=abstract, stored_at=now, ttl=ttl))
+        return abstracts
+
+    async def _efetch_chunk(self, pmids: list[str]) -> dict[str, str]:
+        params = {
+            "db": self.DB,
+            "id": ",".join(pmids),
+            "rettype": "abstract",
+            "retmode": "xml",
+        }
+        if self.api_key:
+            params["api_key"] = self.api_key
+        client = self._http(self.BASE_URL_FETCH)
+        async with self._rate_limited():
+            response = await client.get(self.BASE_URL_FETCH, params=params, timeout=30.0)
+            response.raise_for_status()
+        return self._parse_abstracts(response.content)
+
+    @staticmethod
+    def _parse_abstracts(xml_data: bytes) -> dict[str, str]:
+        """
+        Stream-parse efetch XML into {PMID: abstract}.
+        Each PubmedArticle is cleared after use so memory stays flat for large batches.
+        """
+        abstracts: dict[str, str] = {}
+        for _, elem in ET.iterparse(io.BytesIO(xml_data), events=("end",)):
+            if elem.tag != "PubmedArticle":
+                continue
+            pmid = elem.findtext("MedlineCitation/PMID")
+            if pmid:
+                parts = []
+                for text in elem.iterfind("MedlineCitation/Article/Abstract/AbstractText"):
+                    body = "".join(text.itertext()).strip()
+                    if not body:
+                        continue
+                    label = text.get("Label")
+                    parts.append(f"{label}: {body}" if label else body)
+                abstracts[pmid.strip()] = " ".join(parts)
+            elem.clear()
+        return abstracts
 
     async def _search_ids(self, query: str, limit: int) -> list[str]:
         params = {
@@ -40,11 +149,11 @@ class PubmedClient(BaseSearchClient):
         }
         if self.api_key:
             params["api_key"] = self.api_key
-        async with httpx.AsyncClient() as client:
-            response = await client.get(self.BASE_URL_SEARCH, params=params, timeout=10.0)
-            response.raise_for_status()
-            data = response.json()
-            return data.get("esearchresult", {}).get("idlist", [])
+        client = self._http(self.BASE_URL_SEARCH)
+        response = await client.get(self.BASE_URL_SEARCH, params=params, timeout=10.0)
+        response.raise_for_status()
+        data = response.json()
+        return data.get("esearchresult", {}).get("idlist", [])
 
     async def _get_details(self, ids: list[str]) -> list[SearchResult]:
         params = {
@@ -54,51 +163,48 @@ class PubmedClient(BaseSearchClient):
         }
         if self.api_key:
             params["api_key"] = self.api_key
-        async with httpx.AsyncClient() as client:
-            response = await client.get(self.BASE_URL_SUMMARY, params=params, timeout=10.0)
-            response.raise_for_status()
-            data = response.json()
+        client = self._http(self.BASE_URL_SUMMARY)
+        response = await client.get(self.BASE_URL_SUMMARY, params=params, timeout=10.0)
+        response.raise_for_status()
+        data = response.json()
+        
+        results = []
+        uids = data.get("result", {}).get("uids", [])
+        for uid in uids:
+            item = data["result"][uid]
             
-            results = []
-            uids = data.get("result", {}).get("uids", [])
-            for uid in uids:
-                item = data["result"][uid]
-                
-                # Extract fields
-                title = item.get("title", "")
-                authors = [a.get("name") for a in item.get("authors", [])]
-                pub_date = item.get("pubdate", "")
-                year = int(pub_date.split()[0]) if pub_date else None
-                venue = item.get("source", "")
-                doi = next((id["value"] for id in item.get("elocationid", []) if id.get("etype") == "doi"), None) # Sometimes here
-                if not doi:
-                     # Check articleids
-                    for aid in item.get("articleids", []):
-                        if aid.get("idtype") == "doi":
-                            doi = aid.get("value")
-                            break
+            # Extract fields
+            title = item.get("title", "")
+            authors = [a.get("name") for a in item.get("authors", [])]
+            pub_date = item.get("pubdate", "")
+            year = int(pub_date.split()[0]) if pub_date else None
+            venue = item.get("source", "")
+            doi = next((id["value"] for id in item.get("elocationid", []) if id.get("etype") == "doi"), None) # Sometimes here
+            if not doi:
+                 # Check articleids
+                for aid in item.get("articleids", []):
+                    if aid.get("idtype") == "doi":
+                        doi = aid.get("value")
+                        break
 
-                external_ids = {"PubMed": uid}
-                if doi:
-                    external_ids["DOI"] = doi
-                
-                # Abstract (esummary JSON doesn't always contain abstract properly, might need efetch XML for full abstract)
-                # For MVP, we use title or partial info if available. 
-                # Ideally, we should use EFETCH for abstracts, but JSON output of efetch is not standard.
-                # Let's start with empty abstract or title as fallback.
-                abstract = "" 
+            external_ids = {"PubMed": uid}
+            if doi:
+                external_ids["DOI"] = doi
+            
+            # Abstract is filled from the batched efetch stage (esummary has none)
+            abstract = ""
 
-                # PDF URL (PubMed doesn't give direct PDF url easily)
-                pdf_url = None
-                
-                results.append(SearchResult(
-                    title=title,
-                    authors=authors,
-                    year=year,
-                    venue=venue,
-                    abstract=abstract,
-                    external_ids=external_ids,
-                    pdf_url=pdf_url,
-                    source="pubmed"
-                ))
-            return results
+            # PDF URL (PubMed doesn't give direct PDF url easily)
+            pdf_url = None
+            
+            results.append(SearchResult(
+                title=title,
+                authors=authors,
+                year=year,
+                venue=venue,
+                abstract=abstract,
+                external_ids=external_ids,
+                pdf_url=pdf_url,
+                source="pubmed"
+            ))
+        return results
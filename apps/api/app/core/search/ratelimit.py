@@ -0,0 +1,172 @@
+"""
+検索ソース別のレート制御
+
+トークンバケットでリクエスト間隔を制御し、同時実行数の上限と
+ユーザー単位のラウンドロビン待ち行列を組み合わせる。
+- 待機中にロックを保持しないため、待ちの長さはトークン不足分だけになる
+- 1人のユーザーの大量リクエストが他ユーザーの検索を塞がない
+- 待ち行列長・待ち時間をカウンタで公開する
+"""
+
+import asyncio
+import contextvars
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+# 公平キューのキー（通常はリクエストしたユーザーの uid）
+rate_limit_key: contextvars.ContextVar[str] = contextvars.ContextVar("rate_limit_key", default="anonymous")
+
+
+class TokenBucketLimiter:
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        max_in_flight: int | None = None,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_in_flight = max_in_flight
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._in_flight = 0
+        # キー別 FIFO。OrderedDict の先頭から1件ずつ取り出して末尾に回す
+        self._queues: OrderedDict[str, deque[tuple[asyncio.Future, float]]] = OrderedDict()
+        self._timer: asyncio.TimerHandle | None = None
+        self._timer_loop: asyncio.AbstractEventLoop | None = None
+        self._counters = {"acquired": 0, "waited": 0, "cancelled": 0}
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @classmethod
+    def for_published_limit(
+        cls,
+        requests: int,
+        per: float = 1.0,
+        burst: int = 1,
+        max_in_flight: int | None = None,
+    ) -> "TokenBucketLimiter":
+        """
+        公開レート上限（per 秒あたり requests 回）を超えないバケットを作る。
+        バースト分を先に使っても、任意の per 秒窓で requests 回以内に収まるよう
+        補充レートを (requests - burst + 1) / per に下げる。
+        持続レートが上限の半分を割らないよう、バーストは requests // 2 までに抑える。
+        """
+        burst = max(1, min(burst, requests // 2))
+        return cls(rate=(requests - burst + 1) / per, burst=burst, max_in_flight=max_in_flight)
+
+    @asynccontextmanager
+    async def slot(self, key: str | None = None) -> AsyncIterator[None]:
+        """トークンと同時実行枠を1つ確保し、ブロックを抜けたら枠を返す"""
+        await self.acquire(key)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, key: str | None = None) -> None:
+        key = key or rate_limit_key.get()
+        self._refill()
+        if not self._queues and self._can_grant():
+            self._grant()
+            return
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        enqueued_at = time.monotonic()
+        self._queues.setdefault(key, deque()).append((future, enqueued_at))
+        self._pump()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 付与と同時にキャンセルされた場合は枠を返す
+                self.release()
+            else:
+                self._counters["cancelled"] += 1
+                self._pump()
+            raise
+
+        waited = time.monotonic() - enqueued_at
+        self._counters["waited"] += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+
+    def release(self) -> None:
+        self._in_flight = max(0, self._in_flight - 1)
+        self._pump()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(float(self.burst), self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def _can_grant(self) -> bool:
+        if self.max_in_flight is not None and self._in_flight >= self.max_in_flight:
+            return False
+        return self._tokens >= 1.0
+
+    def _grant(self) -> None:
+        self._tokens -= 1.0
+        self._in_flight += 1
+        self._counters["acquired"] += 1
+
+    def _pump(self) -> None:
+        """待ち行列の先頭からキー単位のラウンドロビンで枠を割り当てる"""
+        self._refill()
+        while self._queues and self._can_grant():
+            key, queue = next(iter(self._queues.items()))
+            future, _ = queue.popleft()
+            if queue:
+                self._queues.move_to_end(key)
+            else:
+                del self._queues[key]
+            if future.done():
+                continue
+            self._grant()
+            future.set_result(None)
+
+        # 同時実行枠が空けば release から呼ばれるので、トークン不足の場合だけ再試行を予約する
+        if self._queues and self._tokens < 1.0:
+            loop = asyncio.get_running_loop()
+            if self._timer is not None and self._timer_loop is loop:
+                return
+            delay = (1.0 - self._tokens) / self.rate
+            self._timer = loop.call_later(delay, self._on_timer)
+            self._timer_loop = loop
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._pump()
+
+    def queue_depth(self) -> int:
+        return sum(
+            1
+            for queue in self._queues.values()
+            for future, _ in queue
+            if not future.done()
+        )
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        oldest = min(
+            (enqueued_at for queue in self._queues.values() for _, enqueued_at in queue),
+            default=None,
+        )
+        waited = self._counters["waited"]
+        return {
+            **self._counters,
+            "rate_per_sec": round(self.rate, 4),
+            "burst": self.burst,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth(),
+            "queued_keys": len(self._queues),
+            "oldest_wait_ms": int((now - oldest) * 1000) if oldest is not None else 0,
+            "avg_wait_ms": int(self._wait_total / waited * 1000) if waited else 0,
+            "max_wait_ms": int(self._wait_max * 1000),
+        }
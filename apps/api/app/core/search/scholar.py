@@ -1,32 +1,130 @@
-from app.core.search.base import BaseSearchClient, SearchResult
-from scholarly import scholarly
+from app.core.config import settings
+from app.core.http import HttpClientPool
+from app.core.search.base import BaseSearchClient, PartialResults, SearchResult
+from app.core.search.cache import SearchResultCache
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator
 import asyncio
-from functools import partial
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class StubScholarBackend:
+    """
+    Offline stand-in for `scholarly` (SCHOLAR_BACKEND=stub).
+    Yields synthetic publications with a per-item delay so the executor,
+    deadline and cancellation path can be load-tested without scraping.
+    """
+
+    def __init__(self, delay: float = 0.2, total: int = 50):
+        self.delay = delay
+        self.total = total
+
+    def search_pubs(self, query: str) -> Iterator[dict[str, Any]]:
+        for i in range(self.total):
+            time.sleep(self.delay)
+            yield {
+                "bib": {
+                    "title": f"{query} (stub result {i + 1})",
+                    "author": ["Stub Author"],
+                    "pub_year": str(2000 + i % 25),
+                    "venue": "Stub Venue",
+                    "abstract": f"Stub abstract for {query}.",
+                },
+                "eprint_url": None,
+            }
+
 
 class ScholarClient(BaseSearchClient):
-    def __init__(self):
-        # Google Scholar is very strict. We use a conservative 2.0s interval 
+    SOURCE = "scholar"
+
+    def __init__(
+        self,
+        http_pool: HttpClientPool | None = None,
+        cache: SearchResultCache | None = None,
+        backend: Any = None,
+    ):
+        # Google Scholar is very strict. We use a conservative 2.0s interval
         # to avoid immediate scraping bans, although scholarly might handle some of it.
-        super().__init__(interval=2.0)
+        super().__init__(interval=2.0, http_pool=http_pool, cache=cache)
+        # scholarly blocks a thread per scrape, so it gets its own bounded pool
+        # instead of the loop's default executor shared with other services.
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.scholar_max_workers,
+            thread_name_prefix="scholar",
+        )
+        self.timeout = settings.scholar_search_timeout
+        self._backend = backend
+        self._counters = {"searches": 0, "timeouts": 0, "partial_results": 0, "cancelled": 0, "errors": 0}
 
-    async def search(self, query: str, limit: int = 10) -> list[SearchResult]:
-        await self._wait_for_rate_limit()
+    @property
+    def backend(self) -> Any:
+        # scholarly is imported lazily so the stub backend works without it
+        if self._backend is None:
+            if settings.scholar_backend == "stub":
+                self._backend = StubScholarBackend(delay=settings.scholar_stub_delay)
+            else:
+                from scholarly import scholarly
+                self._backend = scholarly
+        return self._backend
 
-        # scholarly is synchronous and blocking. Run in executor.
+    async def _search(self, query: str, limit: int = 10) -> list[SearchResult]:
+        # scholarly is synchronous and blocking. Run in the dedicated executor.
         loop = asyncio.get_running_loop()
-        
-        # Wrapping generator consumption in thread
-        results = await loop.run_in_executor(None, partial(self._search_sync, query, limit))
-        return results
+        cancel_event = threading.Event()
+        results: list[SearchResult] = []
+        self._counters["searches"] += 1
+
+        async with self._rate_limited():
+            # The worker appends into `results`, so a deadline can return what
+            # has been collected so far. The deadline also covers time queued
+            # behind busy workers.
+            future = loop.run_in_executor(
+                self.executor, self._search_sync, query, limit, cancel_event, results
+            )
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                # Stop between next() calls; a hung next() only holds a Scholar worker
+                cancel_event.set()
+                self._counters["timeouts"] += 1
+                logger.warning(
+                    "Scholar search timed out after %.1fs (%d/%d results)",
+                    self.timeout, len(results), limit,
+                )
+                # Nothing collected is a failed call (counted by the circuit breaker)
+                if not results:
+                    raise
+                self._counters["partial_results"] += 1
+                return PartialResults(results)
+            except asyncio.CancelledError:
+                cancel_event.set()
+                self._counters["cancelled"] += 1
+                raise
 
-    def _search_sync(self, query: str, limit: int) -> list[SearchResult]:
-        search_query = scholarly.search_pubs(query)
-        results = []
+    def _search_sync(
+        self,
+        query: str,
+        limit: int,
+        cancel_event: threading.Event | None = None,
+        results: list[SearchResult] | None = None,
+    ) -> list[SearchResult]:
+        cancel_event = cancel_event or threading.Event()
+        results = results if results is not None else []
+        if cancel_event.is_set():
+            return results
+        search_query = self.backend.search_pubs(query)
         try:
             for _ in range(limit):
+                # Cooperative cancellation: checked before each blocking next()
+                if cancel_event.is_set():
+                    break
                 item = next(search_query)
                 bib = item.get('bib', {})
-                
+
                 # Extract
                 title = bib.get('title', '')
                 authors = bib.get('author', [])
@@ -34,10 +132,10 @@ class ScholarClient(BaseSearchClient):
                 venue = bib.get('venue', 'Google Scholar')
                 abstract = bib.get('abstract', '')
                 pdf_url = item.get('eprint_url')
-                
+
                 # External IDs (Scholar doesn't give DOI easily without extra requests)
                 external_ids = {} # might parse from url or check extra fields
-                
+
                 results.append(SearchResult(
                     title=title,
                     authors=authors,
@@ -51,6 +149,21 @@ class ScholarClient(BaseSearchClient):
         except StopIteration:
             pass
         except Exception as e:
-            print(f"Scholar Error: {e}")
-            
+            self._counters["errors"] += 1
+            logger.warning("Scholar Error: %s", e)
+            # Re-raise when the scrape produced nothing, so the caller sees the failure
+            if not results:
+                raise
+            self._counters["partial_results"] += 1
+            return PartialResults(results)
+
         return results
+
+    def stats(self) -> dict:
+        return {
+            **self._counters,
+            "max_workers": self.executor._max_workers,
+            "queued": self.executor._work_queue.qsize(),
+            "timeout_sec": self.timeout,
+            "backend": settings.scholar_backend,
+        }
@@ -0,0 +1,104 @@
+"""
+検索リクエストの single-flight 集約
+
+同一 (source, 正規化クエリ) の検索が同時に走っている場合、上流APIへの呼び出しを
+1本にまとめて結果を共有する。実行中の呼び出しの limit が要求以上であれば、
+その結果の先頭 limit 件で応答する。
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from app.core.search.cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(eq=False)
+class _Flight:
+    limit: int
+    task: asyncio.Task
+    waiters: int = field(default=0)
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight: dict[tuple[str, str], list[_Flight]] = {}
+        self._counters = {
+            "calls": 0,
+            "executed": 0,
+            "collapsed": 0,
+            "collapsed_by_larger_limit": 0,
+        }
+
+    async def do(
+        self,
+        source: str,
+        query: str,
+        limit: int,
+        loader: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        key = (source, normalize_query(query))
+        self._counters["calls"] += 1
+
+        flight = self._find_flight(key, limit)
+        if flight is not None:
+            self._counters["collapsed"] += 1
+            if flight.limit > limit:
+                self._counters["collapsed_by_larger_limit"] += 1
+        else:
+            flight = _Flight(limit=limit, task=asyncio.ensure_future(loader()))
+            self._inflight.setdefault(key, []).append(flight)
+            flight.task.add_done_callback(lambda _task: self._remove_flight(key, flight))
+            self._counters["executed"] += 1
+
+        result = await self._wait(flight)
+        if isinstance(result, list) and flight.limit > limit:
+            return result[:limit]
+        return result
+
+    def _find_flight(self, key: tuple[str, str], limit: int) -> _Flight | None:
+        # 要求 limit 以上で実行中のもののうち最小のものに相乗りする
+        candidates = [
+            f for f in self._inflight.get(key, [])
+            if f.limit >= limit and not f.task.done()
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda f: f.limit)
+
+    async def _wait(self, flight: _Flight) -> Any:
+        flight.waiters += 1
+        try:
+            # 1人の呼び出し元のキャンセルで共有タスクを止めないよう shield する
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                # 待っている呼び出し元がいなくなったら上流呼び出しも止める
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _remove_flight(self, key: tuple[str, str], flight: _Flight) -> None:
+        flights = self._inflight.get(key)
+        if not flights:
+            return
+        if flight in flights:
+            flights.remove(flight)
+        if not flights:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        calls = self._counters["calls"]
+        return {
+            **self._counters,
+            "in_flight": sum(len(flights) for flights in self._inflight.values()),
+            "collapse_rate": round(self._counters["collapsed"] / calls, 4) if calls else 0.0,
+        }
+
+
+# シングルトンインスタンス
+search_singleflight = SingleFlight()
@@ -7,11 +7,16 @@ Docs: https://api.semanticscholar.org/api-docs/graph
 import httpx
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
+from app.core.http import HttpClientPool, http_pool as default_http_pool
+
 class SemanticScholarClient:
     BASE_URL = "https://api.semanticscholar.org/graph/v1"
+    # /paper/batch accepts up to 500 IDs per request
+    BATCH_LIMIT = 500
 
-    def __init__(self, api_key: str | None = None):
+    def __init__(self, api_key: str | None = None, http_pool: HttpClientPool | None = None):
         self.api_key = api_key
+        self._http_pool = http_pool or default_http_pool
         self.headers = {}
         if self.api_key:
             self.headers["x-api-key"] = self.api_key
@@ -34,27 +39,27 @@ class SemanticScholarClient:
         if fields is None:
              fields = ["paperId", "title", "authors", "year", "venue", "abstract", "externalIds", "citationCount", "openAccessPdf"]
 
-        async with httpx.AsyncClient() as client:
-            params = {
-                "query": query,
-                "offset": offset,
-                "limit": limit,
-                "fields": ",".join(fields)
-            }
-            try:
-                response = await client.get(
-                    f"{self.BASE_URL}/paper/search",
-                    params=params,
-                    headers=self.headers,
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                # 404 (Not Found) はリトライ不要
-                if e.response.status_code == 404:
-                    return {"data": [], "total": 0}
-                raise e
+        client = self._http_pool.client_for(self.BASE_URL)
+        params = {
+            "query": query,
+            "offset": offset,
+            "limit": limit,
+            "fields": ",".join(fields)
+        }
+        try:
+            response = await client.get(
+                f"{self.BASE_URL}/paper/search",
+                params=params,
+                headers=self.headers,
+                timeout=10.0
+            )
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            # 404 (Not Found) はリトライ不要
+            if e.response.status_code == 404:
+                return {"data": [], "total": 0}
+            raise e
 
     async def get_paper(self, paper_id: str, fields: list[str] | None = None) -> dict:
         """
@@ -63,18 +68,42 @@ class SemanticScholarClient:
         if fields is None:
             fields = ["paperId", "title", "authors", "year", "venue", "abstract", "externalIds", "citationCount", "openAccessPdf"]
             
-        async with httpx.AsyncClient() as client:
-            params = {
-                "fields": ",".join(fields)
-            }
-            response = await client.get(
-                f"{self.BASE_URL}/paper/{paper_id}",
-                params=params,
+        client = self._http_pool.client_for(self.BASE_URL)
+        params = {
+            "fields": ",".join(fields)
+        }
+        response = await client.get(
+            f"{self.BASE_URL}/paper/{paper_id}",
+            params=params,
+            headers=self.headers,
+            timeout=10.0
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def get_papers_batch(self, paper_ids: list[str], fields: list[str] | None = None) -> list[dict | None]:
+        """
+        Get many papers in one POST /paper/batch call per BATCH_LIMIT IDs.
+        The result is aligned with paper_ids; unknown IDs map to None.
+        """
+        if fields is None:
+            fields = ["paperId", "externalIds", "citationCount"]
+        if not paper_ids:
+            return []
+
+        client = self._http_pool.client_for(self.BASE_URL)
+        papers: list[dict | None] = []
+        for offset in range(0, len(paper_ids), self.BATCH_LIMIT):
+            response = await client.post(
+                f"{self.BASE_URL}/paper/batch",
+                params={"fields": ",".join(fields)},
+                json={"ids": paper_ids[offset:offset + self.BATCH_LIMIT]},
                 headers=self.headers,
-                timeout=10.0
+                timeout=10.0,
             )
             response.raise_for_status()
-            return response.json()
+            papers.extend(response.json())
+        return papers
 
 from app.core.config import settings
 
@@ -0,0 +1,237 @@
+"""
+Vertex AI Vector Search（Matching Engine）の近傍検索クライアント
+
+- `MatchingEngineIndexEndpoint` のハンドルはプロセス内で1回だけ作る
+- 同時に来た1件ずつの近傍検索を max_wait 秒のウィンドウでまとめ、複数クエリの
+  `find_neighbors` 1回にして結果を呼び出し元へ振り分ける
+  （num_neighbors はバッチ内の最大値で取り、各呼び出し元の件数に切り詰める）
+- namespace 制限（restricts）は API 呼び出し単位なので、同じ制限の検索だけを同じバッチにする
+- ブロッキングな API 呼び出しは専用スレッドプールで実行する
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from google.cloud import aiplatform
+from google.cloud.aiplatform.matching_engine.matching_engine_index_endpoint import Namespace
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# namespace → 許可するトークン
+Restricts = dict[str, list[str] | set[str]]
+
+
+def _restricts_key(restricts: Restricts | None) -> tuple:
+    if not restricts:
+        return ()
+    return tuple(sorted((namespace, tuple(sorted(tokens))) for namespace, tokens in restricts.items()))
+
+
+@dataclass(eq=False)
+class _Batch:
+    items: list[tuple[list[float], int, asyncio.Future]] = field(default_factory=list)
+    timer: asyncio.TimerHandle | None = None
+
+
+@dataclass
+class Neighbor:
+    """`MatchNeighbor` と同じ属性（id / distance）を持つ近傍"""
+
+    id: str
+    distance: float
+
+
+class InMemoryIndexEndpoint:
+    """
+    オフライン用のインデックスエンドポイント。内積の降順で近傍を返し、呼び出しを記録する。
+    restricts は datapoint ごとの {namespace: トークン}。
+    """
+
+    def __init__(
+        self,
+        vectors: dict[str, list[float]] | None = None,
+        restricts: dict[str, dict[str, str]] | None = None,
+    ):
+        self.vectors = dict(vectors or {})
+        self.restricts = dict(restricts or {})
+        self.calls: list[tuple[str, int, int]] = []
+
+    def find_neighbors(
+        self,
+        deployed_index_id: str,
+        queries: list[list[float]],
+        num_neighbors: int,
+        filter: list[Namespace] | None = None,
+    ):
+        self.calls.append((deployed_index_id, len(queries), num_neighbors))
+        results = []
+        for query in queries:
+            scored = [
+                Neighbor(id=datapoint_id, distance=sum(a * b for a, b in zip(query, vector)))
+                for datapoint_id, vector in self.vectors.items()
+                if all(
+                    self.restricts.get(datapoint_id, {}).get(namespace.name) in namespace.allow_tokens
+                    for namespace in filter or []
+                )
+            ]
+            scored.sort(key=lambda neighbor: -neighbor.distance)
+            results.append(scored[:num_neighbors])
+        return results
+
+
+class VectorQueryClient:
+    def __init__(
+        self,
+        index_endpoint_name: str = "",
+        deployed_index_id: str | None = None,
+        max_batch_size: int | None = None,
+        max_wait: float | None = None,
+        max_workers: int | None = None,
+        endpoint=None,
+    ):
+        self.index_endpoint_name = index_endpoint_name
+        self.deployed_index_id = deployed_index_id or settings.vector_deployed_index_id
+        self.max_batch_size = max(1, max_batch_size or settings.vector_query_max_batch_size)
+        self.max_wait = settings.vector_query_batch_wait if max_wait is None else max_wait
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.vector_query_max_workers,
+            thread_name_prefix="vector-query",
+        )
+        self._endpoint = endpoint
+        self._endpoint_lock = threading.Lock()
+        self._pending: dict[tuple, _Batch] = {}
+        self._running: set[asyncio.Task] = set()
+        self._counters = {"requests": 0, "batches": 0, "queries": 0, "errors": 0}
+
+    @classmethod
+    def from_settings(cls) -> "VectorQueryClient":
+        endpoint_name = ""
+        if settings.vector_index_endpoint_id:
+            endpoint_name = (
+                f"projects/{settings.gcp_project_id}/locations/{settings.gcp_region}"
+                f"/indexEndpoints/{settings.vector_index_endpoint_id}"
+            )
+        return cls(index_endpoint_name=endpoint_name)
+
+    @property
+    def enabled(self) -> bool:
+        return self._endpoint is not None or bool(self.index_endpoint_name)
+
+    def _get_endpoint(self):
+        """初回呼び出し時にハンドルを作る（失敗時は次回再試行）。executor スレッドから呼ばれる"""
+        if self._endpoint is None:
+            with self._endpoint_lock:
+                if self._endpoint is None:
+                    if not self.index_endpoint_name:
+                        raise RuntimeError("vector_index_endpoint_id is not configured")
+                    index_endpoint_cls = getattr(
+                        aiplatform,
+                        "MatchingEngineIndexEndpoint",
+                        getattr(aiplatform, "IndexEndpoint", None),
+                    )
+                    if index_endpoint_cls is None:
+                        raise AttributeError("No matching index endpoint client found in aiplatform")
+                    aiplatform.init(project=settings.gcp_project_id, location=settings.gcp_region)
+                    self._endpoint = index_endpoint_cls(index_endpoint_name=self.index_endpoint_name)
+        return self._endpoint
+
+    def find_neighbors_sync(
+        self,
+        queries: list[list[float]],
+        num_neighbors: int,
+        restricts: Restricts | None = None,
+    ) -> list[list]:
+        """ブロッキングで複数クエリを1回の API 呼び出しで検索する。クエリごとの近傍リストを返す"""
+        kwargs = {}
+        if restricts:
+            kwargs["filter"] = [
+                Namespace(name=namespace, allow_tokens=sorted(tokens)) for namespace, tokens in restricts.items()
+            ]
+        response = self._get_endpoint().find_neighbors(
+            deployed_index_id=self.deployed_index_id,
+            queries=queries,
+            num_neighbors=num_neighbors,
+            **kwargs,
+        )
+        return [list(neighbors) for neighbors in response or []]
+
+    async def find_neighbors(
+        self,
+        query_vector: list[float],
+        num_neighbors: int,
+        restricts: Restricts | None = None,
+    ) -> list:
+        """
+        1クエリの近傍検索（マイクロバッチ経由）。失敗時は例外をそのまま送出する。
+        """
+        self._counters["requests"] += 1
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        key = _restricts_key(restricts)
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = _Batch()
+            self._pending[key] = batch
+            batch.timer = loop.call_later(self.max_wait, self._flush, key, batch)
+        batch.items.append((query_vector, num_neighbors, future))
+        if len(batch.items) >= self.max_batch_size:
+            self._flush(key, batch)
+
+        return await future
+
+    def _flush(self, key: tuple, batch: _Batch) -> None:
+        if self._pending.get(key) is not batch:
+            return  # 件数上限で既に送信済み
+        del self._pending[key]
+        if batch.timer is not None:
+            batch.timer.cancel()
+        restricts = {namespace: list(tokens) for namespace, tokens in key}
+        task = asyncio.ensure_future(self._run_batch(batch.items, restricts))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run_batch(
+        self,
+        items: list[tuple[list[float], int, asyncio.Future]],
+        restricts: Restricts | None = None,
+    ) -> None:
+        queries = [query for query, _, _ in items]
+        num_neighbors = max(count for _, count, _ in items)
+        self._counters["batches"] += 1
+        self._counters["queries"] += len(queries)
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(
+                self.executor, self.find_neighbors_sync, queries, num_neighbors, restricts
+            )
+            if len(results) != len(queries):
+                raise RuntimeError(f"expected {len(queries)} neighbor lists, got {len(results)}")
+        except Exception as exc:
+            logger.error(f"Vector search batch failed: {exc}")
+            self._counters["errors"] += 1
+            for _, _, future in items:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for (_, count, future), neighbors in zip(items, results):
+            if not future.done():
+                future.set_result(neighbors[:count])
+
+    def stats(self) -> dict:
+        batches = self._counters["batches"]
+        return {
+            **self._counters,
+            "avg_batch_size": round(self._counters["queries"] / batches, 2) if batches else 0.0,
+            "pending": sum(len(batch.items) for batch in self._pending.values()),
+            "endpoint_ready": self._endpoint is not None,
+        }
+
+
+# シングルトンインスタンス
+vector_query_client = VectorQueryClient.from_settings()
@@ -0,0 +1,381 @@
+"""
+ベクトルストア
+
+チャンク/論文ベクトルの登録と近傍検索の抽象。Worker のインデクサー（D-05）、関連論文（D-07）、
+ライブラリ横断質問（D-09）が共用する。
+- VertexVectorStore: Vertex AI Vector Search（登録は Index へのストリーム更新、検索は VectorQueryClient）
+- NumpyVectorStore: プロセス内の行列に保持し、NumPy で厳密な内積 top-k を返す（Vector Search 未設定時）
+restricts は Vector Search と同じく namespace ごとのトークン（paper_id / owner_uid）。
+"""
+
+import asyncio
+import json
+import logging
+import os
+import struct
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+
+import numpy as np
+from google.cloud import aiplatform
+
+from app.core.config import settings
+from app.core.vector_search import Neighbor, Restricts, VectorQueryClient, vector_query_client
+
+logger = logging.getLogger(__name__)
+
+# 追記ログの1フレーム（1回の upsert）のヘッダー: メタデータ JSON のバイト数、件数、次元数
+_LOG_HEADER = struct.Struct("<III")
+
+
+@dataclass
+class VectorRecord:
+    id: str
+    vector: list[float]
+    restricts: dict[str, str] = field(default_factory=dict)
+
+
+class VectorStore(ABC):
+    """ベクトル保存先の抽象"""
+
+    backend: str = ""
+
+    @abstractmethod
+    def upsert(self, records: list[VectorRecord]) -> None:
+        """同じ ID は上書きする（ブロッキング）"""
+        pass
+
+    @abstractmethod
+    async def query(self, vector: list[float], top_k: int, restricts: Restricts | None = None) -> list[Neighbor]:
+        """内積の降順で最大 top_k 件。restricts は namespace ごとの許可トークン（AND）"""
+        pass
+
+    @abstractmethod
+    def stats(self) -> dict:
+        pass
+
+
+class VertexVectorStore(VectorStore):
+    backend = "vertex"
+
+    def __init__(self, index_id: str = "", query_client: VectorQueryClient | None = None):
+        self.index_id = index_id
+        self.query_client = query_client or vector_query_client
+
+    def upsert(self, records: list[VectorRecord]) -> None:
+        if not self.index_id or self.index_id == "your-vector-index-id":
+            logger.warning(
+                f"VECTOR_INDEX_IDが未設定またはプレフィックス({self.index_id})のため、インデックス更新をスキップします(Mock)。"
+            )
+            return
+
+        aiplatform.init(project=settings.gcp_project_id, location=settings.gcp_region)
+        # IndexEndpoint ではなく Index そのものをストリーム更新する
+        my_index = aiplatform.MatchingEngineIndex(index_name=self.index_id)
+        my_index.upsert_datapoints(
+            datapoints=[
+                {
+                    "datapoint_id": record.id,
+                    "feature_vector": record.vector,
+                    "restricts": [
+                        {"namespace": namespace, "allow_list": [token]}
+                        for namespace, token in record.restricts.items()
+                    ],
+                }
+                for record in records
+            ]
+        )
+
+    async def query(self, vector: list[float], top_k: int, restricts: Restricts | None = None) -> list[Neighbor]:
+        return await self.query_client.find_neighbors(vector, top_k, restricts)
+
+    def stats(self) -> dict:
+        return {"backend": self.backend, **self.query_client.stats()}
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    行列は容量を倍々で確保し、行番号で上書きする。restricts は namespace ごとの整数コード列で持つ。
+    path を指定すると、登録は追記ログ（{path}.{世代}.log）に足し、ログが本体より大きくなったら
+    .npz（スナップショット）へまとめて世代を進める。他プロセス（Worker）の更新は検索時に
+    スナップショットの差し替えかログの増分だけを読み直す。書き込むプロセスは1つを想定する。
+    """
+
+    backend = "local"
+
+    def __init__(self, path: str = "", dtype: str = "float32", block_rows: int = 1024, compact_min_records: int = 4096):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.block_rows = max(1, block_rows)
+        self.compact_min_records = max(1, compact_min_records)
+        self._lock = threading.Lock()
+        self._ids: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._matrix = np.zeros((0, 0), dtype=self.dtype)
+        self._size = 0
+        self._codes: dict[str, np.ndarray] = {}
+        self._tokens: dict[str, dict[str, int]] = {}
+        self._loaded_mtime: int | None = None
+        # スナップショットの世代と、その世代のログをどこまで反映したか
+        self._generation = 0
+        self._snapshot_rows = 0
+        self._log_offset = 0
+        self._log_records = 0
+        self._counters = {"queries": 0, "upserts": 0, "log_appends": 0, "snapshots": 0}
+        with self._lock:
+            self._maybe_reload()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def upsert(self, records: list[VectorRecord]) -> None:
+        if not records:
+            return
+        with self._lock:
+            self._maybe_reload()
+            vectors = [np.asarray(record.vector, dtype=np.float32) for record in records]
+            self._apply([(record.id, vector, record.restricts) for record, vector in zip(records, vectors)])
+            self._counters["upserts"] += len(records)
+            if not self.path:
+                return
+            if self._log_records + len(records) >= max(self.compact_min_records, self._snapshot_rows):
+                self._save()
+            else:
+                self._append_log(records, np.stack(vectors))
+
+    def _apply(self, items: list[tuple[str, np.ndarray, dict[str, str]]]) -> None:
+        for record_id, vector, restricts in items:
+            if self._matrix.shape[1] == 0:
+                self._matrix = np.zeros((0, vector.shape[0]), dtype=self.dtype)
+            if vector.shape != (self._matrix.shape[1],):
+                raise ValueError(f"expected {self._matrix.shape[1]} dims, got {vector.shape}")
+
+            row = self._rows.get(record_id)
+            if row is None:
+                row = self._append(record_id)
+            self._matrix[row] = vector
+            for codes in self._codes.values():
+                codes[row] = -1
+            for namespace, token in restricts.items():
+                codes = self._namespace_codes(namespace)
+                codes[row] = self._token_code(namespace, token)
+
+    def _append(self, record_id: str) -> int:
+        row = self._size
+        if row >= self._matrix.shape[0]:
+            capacity = max(1024, self._matrix.shape[0] * 2)
+            matrix = np.zeros((capacity, self._matrix.shape[1]), dtype=self.dtype)
+            matrix[:row] = self._matrix[:row]
+            self._matrix = matrix
+            for namespace, codes in self._codes.items():
+                grown = np.full(capacity, -1, dtype=np.int32)
+                grown[:row] = codes[:row]
+                self._codes[namespace] = grown
+        self._ids.append(record_id)
+        self._rows[record_id] = row
+        self._size += 1
+        return row
+
+    def _namespace_codes(self, namespace: str) -> np.ndarray:
+        codes = self._codes.get(namespace)
+        if codes is None:
+            codes = np.full(self._matrix.shape[0], -1, dtype=np.int32)
+            self._codes[namespace] = codes
+            self._tokens[namespace] = {}
+        return codes
+
+    def _token_code(self, namespace: str, token: str) -> int:
+        tokens = self._tokens[namespace]
+        return tokens.setdefault(token, len(tokens))
+
+    async def query(self, vector: list[float], top_k: int, restricts: Restricts | None = None) -> list[Neighbor]:
+        # 行列積は GIL を離すのでスレッドで回す
+        return await asyncio.to_thread(self.query_sync, vector, top_k, restricts)
+
+    def query_sync(self, vector: list[float], top_k: int, restricts: Restricts | None = None) -> list[Neighbor]:
+        with self._lock:
+            self._maybe_reload()
+            self._counters["queries"] += 1
+            size = self._size
+            matrix = self._matrix
+            ids = self._ids
+            rows = None
+            for namespace, tokens in (restricts or {}).items():
+                allowed = [self._tokens.get(namespace, {}).get(token) for token in tokens]
+                allowed = [code for code in allowed if code is not None]
+                if not allowed:
+                    return []
+                mask = np.isin(self._codes[namespace][:size], allowed)
+                rows = mask if rows is None else rows & mask
+        if size == 0 or top_k <= 0:
+            return []
+        if vector is None or len(vector) != matrix.shape[1]:
+            raise ValueError(f"expected {matrix.shape[1]} dims, got {len(vector or [])}")
+
+        query = np.asarray(vector, dtype=np.float32)
+        if rows is not None:
+            rows = np.flatnonzero(rows)
+            if rows.size == 0:
+                return []
+            scores = self._scores(matrix, rows, query)
+        else:
+            scores = self._scores(matrix, size, query)
+
+        k = min(top_k, scores.shape[0])
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        positions = rows[top] if rows is not None else top
+        return [Neighbor(id=ids[position], distance=float(scores[i])) for i, position in zip(top, positions)]
+
+    def _scores(self, matrix: np.ndarray, rows: np.ndarray | int, query: np.ndarray) -> np.ndarray:
+        """float32 はそのまま BLAS、float16 はブロックごとに float32 へ戻して内積を取る"""
+        if isinstance(rows, int):
+            if matrix.dtype == np.float32:
+                return matrix[:rows] @ query
+            scores = np.empty(rows, dtype=np.float32)
+            for start in range(0, rows, self.block_rows):
+                end = min(start + self.block_rows, rows)
+                scores[start:end] = matrix[start:end].astype(np.float32) @ query
+            return scores
+        scores = np.empty(rows.shape[0], dtype=np.float32)
+        for start in range(0, rows.shape[0], self.block_rows):
+            block = rows[start : start + self.block_rows]
+            scores[start : start + block.shape[0]] = matrix[block].astype(np.float32, copy=False) @ query
+        return scores
+
+    @property
+    def _log_path(self) -> str:
+        return f"{self.path}.{self._generation}.log"
+
+    def _append_log(self, records: list[VectorRecord], vectors: np.ndarray) -> None:
+        """1回の upsert を1フレームとして現世代のログへ追記する（1回の write）"""
+        meta = json.dumps([[record.id, record.restricts] for record in records]).encode()
+        frame = _LOG_HEADER.pack(len(meta), vectors.shape[0], vectors.shape[1]) + meta + vectors.tobytes()
+        with open(self._log_path, "ab") as f:
+            f.write(frame)
+        self._log_offset += len(frame)
+        self._log_records += vectors.shape[0]
+        self._counters["log_appends"] += 1
+
+    def _save(self) -> None:
+        """全件を次の世代のスナップショットに書き出し、前の世代のログを消す"""
+        old_log = self._log_path
+        self._generation += 1
+        arrays = {
+            "ids": np.array(self._ids, dtype=str),
+            "vectors": self._matrix[: self._size],
+            "generation": np.array(self._generation),
+        }
+        for namespace, codes in self._codes.items():
+            arrays[f"codes:{namespace}"] = codes[: self._size]
+            arrays[f"tokens:{namespace}"] = np.array(list(self._tokens[namespace]), dtype=str)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, self.path)
+        self._loaded_mtime = os.stat(self.path).st_mtime_ns
+        self._snapshot_rows = self._size
+        self._log_offset = 0
+        self._log_records = 0
+        self._counters["snapshots"] += 1
+        try:
+            os.remove(old_log)
+        except FileNotFoundError:
+            pass
+
+    def _maybe_reload(self) -> None:
+        """他プロセスが書き出したスナップショットが新しければ読み直し、ログの増分を反映する（ロック内で呼ぶ）"""
+        if not self.path:
+            return
+        if os.path.exists(self.path) and os.stat(self.path).st_mtime_ns != self._loaded_mtime:
+            self._load_snapshot()
+        self._replay_log()
+
+    def _load_snapshot(self) -> None:
+        mtime = os.stat(self.path).st_mtime_ns
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                ids = data["ids"].tolist()
+                vectors = data["vectors"].astype(self.dtype, copy=False)
+                generation = int(data["generation"]) if "generation" in data.files else 0
+                namespaces = [key.split(":", 1)[1] for key in data.files if key.startswith("codes:")]
+                codes = {namespace: data[f"codes:{namespace}"].astype(np.int32) for namespace in namespaces}
+                tokens = {
+                    namespace: {token: i for i, token in enumerate(data[f"tokens:{namespace}"].tolist())}
+                    for namespace in namespaces
+                }
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("Vector store reload failed (%s): %s", self.path, exc)
+            return
+        self._ids = ids
+        self._rows = {record_id: row for row, record_id in enumerate(ids)}
+        self._matrix = vectors
+        self._size = len(ids)
+        self._codes = codes
+        self._tokens = tokens
+        self._loaded_mtime = mtime
+        self._generation = generation
+        self._snapshot_rows = len(ids)
+        self._log_offset = 0
+        self._log_records = 0
+
+    def _replay_log(self) -> None:
+        """前回の続きからログを読み、揃ったフレームだけを反映する（書き込み途中のフレームは次回に回す）"""
+        try:
+            with open(self._log_path, "rb") as f:
+                f.seek(self._log_offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        position = 0
+        while position + _LOG_HEADER.size <= len(data):
+            meta_size, count, dims = _LOG_HEADER.unpack_from(data, position)
+            start = position + _LOG_HEADER.size
+            end = start + meta_size + count * dims * 4
+            if end > len(data):
+                break
+            meta = json.loads(data[start : start + meta_size])
+            vectors = np.frombuffer(data, dtype=np.float32, count=count * dims, offset=start + meta_size)
+            vectors = vectors.reshape(count, dims)
+            self._apply([(record_id, vectors[i], restricts) for i, (record_id, restricts) in enumerate(meta)])
+            self._log_records += count
+            position = end
+        self._log_offset += position
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            **self._counters,
+            "vectors": self._size,
+            "dims": int(self._matrix.shape[1]),
+            "dtype": str(self.dtype),
+            "bytes": int(self._size * self._matrix.shape[1] * self.dtype.itemsize),
+            "namespaces": {namespace: len(tokens) for namespace, tokens in self._tokens.items()},
+            "path": self.path,
+            "log_records": self._log_records,
+        }
+
+
+def create_vector_store() -> VectorStore:
+    """VECTOR_STORE_BACKEND（auto: Vector Search の設定があれば vertex、なければ local）"""
+    backend = settings.vector_store_backend.strip().lower()
+    if backend == "auto":
+        configured = settings.vector_index_endpoint_id or (
+            settings.vector_index_id and settings.vector_index_id != "your-vector-index-id"
+        )
+        backend = "vertex" if configured else "local"
+    if backend == "vertex":
+        return VertexVectorStore(index_id=settings.vector_index_id)
+    if not settings.vector_store_path and not settings.run_ingest_locally:
+        # Worker（インデクサー）と API が別プロセスだと、それぞれのメモリにしか登録されない
+        logger.warning(
+            "ローカルベクトルストアの保存先(VECTOR_STORE_PATH)が未設定です。"
+            "Worker が登録したベクトルは API から見えず、関連論文・ライブラリ横断質問のベクトル検索は空になります。"
+            "Worker と共有するボリューム上のパスを指定してください。"
+        )
+    return NumpyVectorStore(path=settings.vector_store_path, dtype=settings.vector_store_dtype)
+
+
+# シングルトンインスタンス
+vector_store = create_vector_store()
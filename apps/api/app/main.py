@@ -5,10 +5,15 @@
 CORS設定、ルーターマウント、ヘルスチェックエンドポイントを含みます。
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
+from app.core.http import http_pool
+from app.core.search import ArxivClient, PubmedClient
+from app.core.semantic_scholar import SemanticScholarClient
 from app.modules.auth.router import router as auth_router
 from app.modules.agent.router import router as agent_router
 from app.modules.papers.router import router as papers_router
@@ -25,10 +30,26 @@ from app.modules.reading.router import router as reading_router
 # from app.modules.reading.router import router as reading_router
 # from app.modules.tex.router import router as tex_router
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """起動/終了時の共有リソース管理（外部HTTP接続プール）"""
+    await http_pool.startup(
+        hosts=[
+            ArxivClient.BASE_URL,
+            PubmedClient.BASE_URL_SEARCH,
+            SemanticScholarClient.BASE_URL,
+        ]
+    )
+    yield
+    await http_pool.aclose()
+
+
 app = FastAPI(
     title="論文管理サービス API",
     description="論文検索/保存/メモ/関連研究管理のためのAPI",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # CORS設定
@@ -38,6 +59,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Related-Computed-At", "X-Related-Cache"],
 )
 
 
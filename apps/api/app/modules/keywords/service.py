@@ -5,7 +5,9 @@ import logging
 from fastapi import HTTPException
 
 from app.modules.keywords.repository import KeywordRepository
+from app.modules.papers.membership import library_membership
 from app.modules.papers.repository import PaperRepository
+from app.modules.related.service import related_service
 from app.modules.keywords.schemas import (
     KeywordSuggestionItem,
     KeywordSuggestionResponse,
@@ -142,8 +144,7 @@ class KeywordService:
         if not paper:
             raise HTTPException(status_code=404, detail="paper not found")
 
-        liked_ids = await self.paper_repository.get_user_likes(owner_uid)
-        if paper_id not in liked_ids:
+        if not await library_membership.contains(owner_uid, paper_id):
             raise HTTPException(status_code=403, detail="paper is not in your library")
 
     async def suggest(self, paper_id: str) -> list[dict]:
@@ -262,6 +263,9 @@ class KeywordService:
                 "keywords": keywords,
                 "prerequisiteKeywords": prerequisite_keywords
             })
+
+            # キーワードは関連論文のスコアに効くので、事前計算リストを裏で作り直す
+            related_service.materialized.schedule([paper_id], include_neighbors=True)
             
         except Exception as e:
             logger.error(f"Failed to sync paper keywords: {e}")
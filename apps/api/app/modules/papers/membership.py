@@ -0,0 +1,137 @@
+"""
+D-03: ペーパーライブラリ - ライブラリ所属キャッシュ
+
+`users/{uid}/likes` を毎リクエスト全件読む代わりに、ユーザーごとのいいね済みID集合を
+TTL付きでプロセス内に保持する。
+キャッシュは表示・並び替え用で、権限の判定には使わない。
+- 一覧の表示（検索の is_in_library など）: 集合をキャッシュから返し、無ければ1回だけ全件読み込む
+- 1論文の表示（論文詳細の is_liked）: `cached_contains`。キャッシュ済みの集合にあれば True、
+  無ければ `likes/{paper_id}` の1件読みで判定する（否定はキャッシュで答えない）
+- アクセス検証・いいねの切り替え: `contains`。常に1件読みで判定し、結果で集合を補正する
+  - 他インスタンスでの解除がまだ集合に残っていても 403 を素通りさせない
+- ライブラリ全体を対象にする権限判定（ライブラリ横断質問）: `liked_ids(uid, fresh=True)` で読み直す
+- `PaperRepository.add_like` / `remove_like` がキャッシュ済みの集合をその場で更新する
+- 他インスタンスでの変更が表示に反映されるまでの遅れは最大 TTL（`LIBRARY_MEMBERSHIP_TTL`、既定60秒）
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.core.config import settings
+
+
+@dataclass
+class _Membership:
+    paper_ids: set[str]
+    loaded_at: float
+
+
+class LibraryMembershipService:
+    def __init__(self, repository=None, ttl: float | None = None, max_users: int | None = None):
+        self._repository = repository
+        self.ttl = settings.library_membership_ttl if ttl is None else ttl
+        self.max_users = settings.library_membership_max_users if max_users is None else max_users
+        self._entries: OrderedDict[str, _Membership] = OrderedDict()
+        self._loading: dict[str, asyncio.Task] = {}
+        # 読み込み中にいいねが変わったユーザー（読み込んだ集合は古い可能性があるので保存しない）
+        self._changed_while_loading: set[str] = set()
+        self._counters = {"hits": 0, "loads": 0, "point_reads": 0, "updates": 0}
+
+    @property
+    def repository(self):
+        if self._repository is None:
+            from app.modules.papers.repository import PaperRepository
+            self._repository = PaperRepository()
+        return self._repository
+
+    def _fresh(self, uid: str) -> _Membership | None:
+        entry = self._entries.get(uid)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.loaded_at > self.ttl:
+            del self._entries[uid]
+            return None
+        self._entries.move_to_end(uid)
+        return entry
+
+    async def liked_ids(self, uid: str, fresh: bool = False) -> frozenset[str]:
+        """
+        ユーザーのいいね済み論文ID集合（同じユーザーの同時読み込みは1回にまとめる）。
+        fresh=True はキャッシュを使わずに読み込む（権限判定用）。
+        """
+        entry = None if fresh else self._fresh(uid)
+        if entry is not None:
+            self._counters["hits"] += 1
+            return frozenset(entry.paper_ids)
+
+        task = self._loading.get(uid)
+        if task is None:
+            task = asyncio.ensure_future(self._load(uid))
+            self._loading[uid] = task
+            task.add_done_callback(lambda _task: self._loading.pop(uid, None))
+        return frozenset(await asyncio.shield(task))
+
+    async def _load(self, uid: str) -> set[str]:
+        self._counters["loads"] += 1
+        loaded_at = time.monotonic()
+        self._changed_while_loading.discard(uid)
+        paper_ids = set(await self.repository.get_user_likes(uid))
+        if uid in self._changed_while_loading:
+            self._changed_while_loading.discard(uid)
+            return paper_ids
+        self._entries[uid] = _Membership(paper_ids=paper_ids, loaded_at=loaded_at)
+        self._entries.move_to_end(uid)
+        while len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
+        return paper_ids
+
+    async def contains(self, uid: str, paper_id: str) -> bool:
+        """1論文がライブラリにあるか（権限判定用。キャッシュを使わず1件読みで判定する）"""
+        self._counters["point_reads"] += 1
+        liked = await self.repository.has_like(uid, paper_id)
+        entry = self._fresh(uid)
+        if entry is not None:
+            # 他インスタンスでの追加・解除を集合にも反映する
+            if liked:
+                entry.paper_ids.add(paper_id)
+            else:
+                entry.paper_ids.discard(paper_id)
+        return liked
+
+    async def cached_contains(self, uid: str, paper_id: str) -> bool:
+        """表示用の所属判定（キャッシュは肯定だけに使い、それ以外は全件読まずに1件読みで判定）"""
+        entry = self._fresh(uid)
+        if entry is not None and paper_id in entry.paper_ids:
+            self._counters["hits"] += 1
+            return True
+        return await self.contains(uid, paper_id)
+
+    def added(self, uid: str, paper_id: str) -> None:
+        self._mark_loading_changed(uid)
+        entry = self._entries.get(uid)
+        if entry is not None:
+            entry.paper_ids.add(paper_id)
+            self._counters["updates"] += 1
+
+    def removed(self, uid: str, paper_id: str) -> None:
+        self._mark_loading_changed(uid)
+        entry = self._entries.get(uid)
+        if entry is not None:
+            entry.paper_ids.discard(paper_id)
+            self._counters["updates"] += 1
+
+    def _mark_loading_changed(self, uid: str) -> None:
+        if uid in self._loading:
+            self._changed_while_loading.add(uid)
+
+    def invalidate(self, uid: str) -> None:
+        self._entries.pop(uid, None)
+
+    def stats(self) -> dict:
+        return {**self._counters, "users": len(self._entries)}
+
+
+# シングルトンインスタンス
+library_membership = LibraryMembershipService()
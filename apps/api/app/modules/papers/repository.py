@@ -4,11 +4,15 @@ D-03: ペーパーライブラリ - リポジトリ
 from datetime import datetime, timezone
 from google.cloud.firestore import AsyncClient, Transaction
 from app.core.firestore import get_firestore_client
+from app.core.search.local_catalog import local_catalog
+from app.modules.papers.membership import library_membership
 
 class PaperRepository:
     COLLECTION_PAPERS = "papers"
     COLLECTION_USERS = "users"
     SUB_COLLECTION_LIKES = "likes"
+    SUB_COLLECTION_RELATED = "related"
+    RELATED_LIST_DOC = "top"
 
     def _get_db(self) -> AsyncClient:
         return get_firestore_client()
@@ -46,12 +50,15 @@ class PaperRepository:
             "status": "PENDING",
             "keywords": data.get("keywords", []),
             "prerequisiteKeywords": data.get("prerequisite_keywords", []),
+            "citationCount": data.get("citation_count"),
             "createdAt": now,
             "updatedAt": now,
         }
         
         await doc_ref.set(doc_data)
-        return self._to_snake(doc_data, paper_id)
+        paper = self._to_snake(doc_data, paper_id)
+        await local_catalog.add_paper(paper)
+        return paper
 
     async def update(self, paper_id: str, update_data: dict) -> dict | None:
         """論文のフィールドを部分更新する"""
@@ -64,7 +71,9 @@ class PaperRepository:
         await doc_ref.update(update_data)
         
         updated_doc = await doc_ref.get()
-        return self._to_snake(updated_doc.to_dict(), paper_id)
+        paper = self._to_snake(updated_doc.to_dict(), paper_id)
+        await local_catalog.add_paper(paper)
+        return paper
 
     async def add_like(self, uid: str, paper_id: str):
         """ユーザーのいいねを追加"""
@@ -74,11 +83,19 @@ class PaperRepository:
             "paperId": paper_id,
             "createdAt": now
         })
+        library_membership.added(uid, paper_id)
 
     async def remove_like(self, uid: str, paper_id: str):
         """ユーザーのいいねを解除"""
         like_ref = self._get_db().collection(self.COLLECTION_USERS).document(uid).collection(self.SUB_COLLECTION_LIKES).document(paper_id)
         await like_ref.delete()
+        library_membership.removed(uid, paper_id)
+
+    async def has_like(self, uid: str, paper_id: str) -> bool:
+        """1論文のいいね有無を likes/{paper_id} の1件読みで判定"""
+        like_ref = self._get_db().collection(self.COLLECTION_USERS).document(uid).collection(self.SUB_COLLECTION_LIKES).document(paper_id)
+        doc = await like_ref.get()
+        return doc.exists
 
     async def get_user_likes(self, uid: str) -> list[str]:
         """ユーザーのいいねした論文IDリストを取得"""
@@ -103,6 +120,54 @@ class PaperRepository:
                 results.append(self._to_snake(doc.to_dict(), doc.id))
         return results
 
+    async def set_citation_counts(self, counts: dict[str, int]) -> int:
+        """既存の論文ドキュメントにだけ被引用数を書き込む（未保存の論文は作らない）"""
+        # DOI キー（doi:10.1/a）など "/" を含むIDはドキュメントIDにならない（ref の生成で ValueError になり、
+        # 同じページの他の論文まで書き込めなくなる）ので飛ばす
+        counts = {pid: count for pid, count in counts.items() if pid and "/" not in pid}
+        if not counts:
+            return 0
+        db = self._get_db()
+        refs = [db.collection(self.COLLECTION_PAPERS).document(pid) for pid in counts]
+        batch = db.batch()
+        updated = 0
+        async for doc in db.get_all(refs):
+            if doc.exists:
+                batch.update(doc.reference, {"citationCount": counts[doc.id]})
+                updated += 1
+        if updated:
+            await batch.commit()
+        return updated
+
+    def _related_list_ref(self, paper_id: str):
+        return (
+            self._get_db()
+            .collection(self.COLLECTION_PAPERS)
+            .document(paper_id)
+            .collection(self.SUB_COLLECTION_RELATED)
+            .document(self.RELATED_LIST_DOC)
+        )
+
+    async def get_related_list(self, paper_id: str) -> dict | None:
+        """事前計算した関連論文リスト（papers/{id}/related/top）を取得"""
+        doc = await self._related_list_ref(paper_id).get()
+        if not doc.exists:
+            return None
+        data = doc.to_dict() or {}
+        return {
+            "items": data.get("items", []),
+            "computed_at": data.get("computedAt"),
+            "top_k": data.get("topK", 0),
+        }
+
+    async def set_related_list(self, paper_id: str, items: list[dict], computed_at: datetime, top_k: int) -> None:
+        """関連論文リストを上書き保存"""
+        await self._related_list_ref(paper_id).set({
+            "items": items,
+            "computedAt": computed_at,
+            "topK": top_k,
+        })
+
     def _to_snake(self, data: dict, paper_id: str) -> dict:
         """Firestore camelCase -> Python snake_case"""
         return {
@@ -16,6 +16,7 @@ class PaperCreate(BaseModel):
     doi: str | None = None
     arxiv_id: str | None = None
     pdf_url: str | None = None
+    citation_count: int | None = None
     keywords: list[str] = []
     prerequisite_keywords: list[str] = []
 
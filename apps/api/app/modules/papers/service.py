@@ -3,6 +3,7 @@ D-03: ペーパーライブラリ - サービス
 """
 import re
 
+from app.modules.papers.membership import library_membership
 from app.modules.papers.repository import PaperRepository
 from app.modules.papers.schemas import PaperCreate, PaperResponse, PaperListResponse
 
@@ -37,8 +38,7 @@ class PaperService:
             paper = await self.repository.create(paper_id, paper_data.model_dump())
 
         # 2. 現在のいいね状態を確認
-        user_likes = await self.repository.get_user_likes(uid)
-        is_liked = paper_id in user_likes
+        is_liked = await library_membership.contains(uid, paper_id)
 
         if is_liked:
             # Unlike
@@ -99,8 +99,7 @@ class PaperService:
         
         is_liked = False
         if uid:
-            user_likes = await self.repository.get_user_likes(uid)
-            is_liked = paper_id in user_likes
+            is_liked = await library_membership.cached_contains(uid, paper_id)
             
         return PaperResponse(**paper, is_liked=is_liked)
 
@@ -1,16 +1,15 @@
 """D-09: 読解サポート - サービス"""
-import asyncio
 import logging
 import re
-from concurrent.futures import ThreadPoolExecutor
 from uuid import uuid4
 
-from google.cloud import aiplatform, firestore
+from google.cloud import firestore
 
-from app.core.config import settings
-from app.core.embedding import generate_embedding
+from app.core.embedding import embedding_service
 from app.core.firestore import get_firestore_client
 from app.core.gemini import gemini_client
+from app.core.vector_store import vector_store
+from app.modules.papers.membership import library_membership
 from app.modules.papers.repository import PaperRepository
 from app.modules.reading.schemas import (
     ExplainRequest,
@@ -44,33 +43,13 @@ class ReadingService:
     def __init__(self):
         self.db = get_firestore_client()
         self.paper_repository = PaperRepository()
-        self.executor = ThreadPoolExecutor(max_workers=2)
-
-        self.vector_enabled = bool(settings.vector_index_endpoint_id)
-        self.index_endpoint_name = (
-            f"projects/{settings.gcp_project_id}/locations/{settings.gcp_region}/indexEndpoints/{settings.vector_index_endpoint_id}"
-            if self.vector_enabled
-            else ""
-        )
-        self.deployed_index_id = "ai_paper_deployed_index"
-
-        if self.vector_enabled:
-            try:
-                aiplatform.init(
-                    project=settings.gcp_project_id,
-                    location=settings.gcp_region,
-                )
-            except Exception as exc:
-                logger.warning(f"Vector search init failed: {exc}")
-                self.vector_enabled = False
 
     async def _ensure_library_access(self, owner_uid: str, paper_id: str):
         paper = await self.paper_repository.get_by_id(paper_id)
         if not paper:
             raise HTTPException(status_code=404, detail="paper not found")
 
-        liked_ids = set(await self.paper_repository.get_user_likes(owner_uid))
-        if paper_id not in liked_ids:
+        if not await library_membership.contains(owner_uid, paper_id):
             raise HTTPException(status_code=403, detail="paper is not in your library")
 
     async def get_outline(self, paper_id: str, owner_uid: str) -> list[PaperOutlineItem]:
@@ -224,7 +203,8 @@ class ReadingService:
 
     async def ask_library(self, owner_uid: str, req: LibraryAskRequest) -> LibraryAskResponse:
         """ライブラリ全体のチャンクを対象にRAG回答する"""
-        user_likes = set(await self.paper_repository.get_user_likes(owner_uid))
+        # 質問対象の絞り込みは権限判定なので、キャッシュではなく読み直した一覧を使う
+        user_likes = set(await library_membership.liked_ids(owner_uid, fresh=True))
 
         if req.paper_ids:
             target_paper_ids = user_likes.intersection(req.paper_ids)
@@ -247,7 +227,7 @@ class ReadingService:
         if not question:
             raise HTTPException(status_code=400, detail="question is required")
 
-        query_vector = generate_embedding(question)
+        query_vector = await embedding_service.embed(question)
         if not query_vector:
             raise HTTPException(status_code=503, detail="embedding generation failed")
 
@@ -310,15 +290,13 @@ class ReadingService:
         target_paper_ids: set[str],
         top_k: int,
     ) -> list[dict]:
-        if not self.vector_enabled:
-            return []
-
         target_ids = list(target_paper_ids)
         fetch_count = min(top_k * 8, 100)
         try:
-            loop = asyncio.get_running_loop()
-            response = await loop.run_in_executor(
-                self.executor, self._query_neighbors_sync, query_vector, fetch_count
+            response = await vector_store.query(
+                query_vector,
+                fetch_count,
+                restricts={"paper_id": target_ids},
             )
         except Exception as exc:
             logger.error(f"Vector search failed: {exc}")
@@ -349,32 +327,11 @@ class ReadingService:
         merged.sort(key=lambda c: c["score"], reverse=True)
         return merged
 
-    def _query_neighbors_sync(self, query_vector: list[float], top_k: int):
-        index_endpoint_cls = getattr(
-            aiplatform,
-            "MatchingEngineIndexEndpoint",
-            getattr(aiplatform, "IndexEndpoint", None),
-        )
-        if index_endpoint_cls is None:
-            raise AttributeError("No matching index endpoint client found in aiplatform")
-
-        my_index_endpoint = index_endpoint_cls(
-            index_endpoint_name=self.index_endpoint_name
-        )
-        return my_index_endpoint.find_neighbors(
-            deployed_index_id=self.deployed_index_id,
-            queries=[query_vector],
-            num_neighbors=top_k,
-        )
-
     def _extract_neighbors(self, response) -> list[tuple[str, float]]:
         if not response:
             return []
 
         raw_neighbors = response
-        if isinstance(response, (list, tuple)) and response:
-            raw_neighbors = response[0]
-
         if hasattr(raw_neighbors, "neighbors"):
             raw_neighbors = raw_neighbors.neighbors
         elif isinstance(raw_neighbors, dict) and "neighbors" in raw_neighbors:
@@ -0,0 +1,29 @@
+"""
+D-07: 関連論文 - キーワードブリッジ用のフレーズ転置インデックス
+
+フレーズ → 論文（位置）の転置リストを作り、共通フレーズを持つ論文の組だけを数える。
+全ペアの集合積（O(n²)）を避け、共通フレーズ数は疎なカウンタに貯める。
+"""
+
+from bisect import bisect_right
+from collections import Counter, defaultdict
+
+
+class PhraseIndex:
+    def __init__(self, paper_ids: list[str], phrase_map: dict[str, set[str]]):
+        self.paper_ids = paper_ids
+        # フレーズ → paper_ids 内の位置（昇順）
+        self.postings: dict[str, list[int]] = defaultdict(list)
+        for position, paper_id in enumerate(paper_ids):
+            for phrase in phrase_map.get(paper_id, ()):
+                self.postings[phrase].append(position)
+
+    def overlaps(self, phrases: set[str], after: int = -1) -> Counter:
+        """phrases と共通するフレーズ数を位置ごとに返す（位置が after 以下の論文は数えない）"""
+        counts: Counter = Counter()
+        for phrase in phrases:
+            posting = self.postings.get(phrase)
+            if not posting:
+                continue
+            counts.update(posting[bisect_right(posting, after):] if after >= 0 else posting)
+        return counts
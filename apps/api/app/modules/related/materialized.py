@@ -0,0 +1,130 @@
+"""
+D-07: 関連論文 - 事前計算リスト
+
+`GET /papers/{paper_id}/related` のたびに埋め込み・ベクトル検索・Firestore 読み込みを行う代わりに、
+論文ごとの上位K件を `papers/{paper_id}/related/top` に保存しておき、そこから返す。
+- 保存済み: そのまま返す（max_age を過ぎていれば返した後に裏で再計算）
+- 未保存 / 保存件数が足りない: その場で計算して保存する
+- 取り込み完了・キーワード変更時: 対象論文と、そのリストに載っている論文を裏で再計算する
+  （新しい論文は近傍の論文のリストにも入りうるため）
+- 計算結果が空（埋め込み・ベクトル検索の失敗を含む）のときは保存しない
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+from app.core.config import settings
+from app.modules.related.schemas import RelatedPaper
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MaterializedRelated:
+    items: list[RelatedPaper]
+    computed_at: datetime
+    # hit: 保存済み / stale: 保存済みだが古い（裏で再計算中） / miss: その場で計算
+    status: str
+
+
+class RelatedListMaterializer:
+    def __init__(
+        self,
+        compute: Callable[[str, int], Awaitable[list[RelatedPaper]]],
+        repository=None,
+        top_k: int | None = None,
+        max_age: float | None = None,
+        concurrency: int | None = None,
+        neighbor_refresh: int | None = None,
+    ):
+        self.compute = compute
+        self._repository = repository
+        self.top_k = top_k or settings.related_materialized_top_k
+        self.max_age = settings.related_materialized_max_age if max_age is None else max_age
+        self.neighbor_refresh = (
+            settings.related_refresh_neighbors if neighbor_refresh is None else neighbor_refresh
+        )
+        self._semaphore = asyncio.Semaphore(concurrency or settings.related_refresh_concurrency)
+        self._queued: set[str] = set()
+        self._running: set[asyncio.Task] = set()
+        self._counters = {"hits": 0, "stale": 0, "misses": 0, "refreshes": 0, "errors": 0}
+
+    @property
+    def repository(self):
+        if self._repository is None:
+            from app.modules.papers.repository import PaperRepository
+            self._repository = PaperRepository()
+        return self._repository
+
+    async def get(self, paper_id: str, limit: int) -> MaterializedRelated:
+        """保存済みリストを返す。無い場合だけその場で計算する"""
+        stored = await self.repository.get_related_list(paper_id)
+        if stored and stored.get("computed_at") and limit <= stored.get("top_k", 0):
+            computed_at = stored["computed_at"]
+            age = (datetime.now(timezone.utc) - computed_at).total_seconds()
+            if age > self.max_age:
+                self._counters["stale"] += 1
+                self.schedule([paper_id])
+                status = "stale"
+            else:
+                self._counters["hits"] += 1
+                status = "hit"
+            items = [RelatedPaper(**item) for item in stored.get("items", [])[:limit]]
+            return MaterializedRelated(items=items, computed_at=computed_at, status=status)
+
+        self._counters["misses"] += 1
+        result = await self.refresh(paper_id, top_k=max(limit, self.top_k))
+        return MaterializedRelated(items=result.items[:limit], computed_at=result.computed_at, status="miss")
+
+    async def refresh(
+        self,
+        paper_id: str,
+        top_k: int | None = None,
+        include_neighbors: bool = False,
+    ) -> MaterializedRelated:
+        """上位K件を計算して保存する。include_neighbors ならリストに載った論文も裏で再計算する"""
+        top_k = top_k or self.top_k
+        self._counters["refreshes"] += 1
+        items = await self.compute(paper_id, top_k)
+        computed_at = datetime.now(timezone.utc)
+        if items:
+            await self.repository.set_related_list(
+                paper_id,
+                [item.model_dump(by_alias=True) for item in items],
+                computed_at,
+                top_k,
+            )
+        if include_neighbors and self.neighbor_refresh > 0:
+            self.schedule([item.paper_id for item in items[: self.neighbor_refresh]])
+        return MaterializedRelated(items=items, computed_at=computed_at, status="miss")
+
+    def schedule(self, paper_ids: list[str], include_neighbors: bool = False) -> None:
+        """裏で再計算する（同じ論文の重複登録はまとめ、同時実行数は concurrency まで）"""
+        for paper_id in paper_ids:
+            if paper_id in self._queued:
+                continue
+            self._queued.add(paper_id)
+            task = asyncio.ensure_future(self._refresh_in_background(paper_id, include_neighbors))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _refresh_in_background(self, paper_id: str, include_neighbors: bool) -> None:
+        try:
+            async with self._semaphore:
+                await self.refresh(paper_id, include_neighbors=include_neighbors)
+        except Exception as exc:
+            self._counters["errors"] += 1
+            logger.warning("related list refresh failed paper=%s: %s", paper_id, exc)
+        finally:
+            self._queued.discard(paper_id)
+
+    async def drain(self) -> None:
+        """裏の再計算がすべて終わるまで待つ（Worker など、プロセス終了前に使う）"""
+        while self._running:
+            await asyncio.gather(*list(self._running), return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {**self._counters, "queued": len(self._queued)}
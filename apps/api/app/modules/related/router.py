@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from typing import List
 from app.core.firebase_auth import get_current_user
 from app.modules.related.schemas import RelatedPaperResponse, GraphData, RelatedPaper
@@ -8,14 +8,19 @@ router = APIRouter()
 
 @router.get("/papers/{paper_id}/related", response_model=List[RelatedPaper])
 async def get_related_papers(
+    response: Response,
     paper_id: str,
     limit: int = 5,
     current_user: dict = Depends(get_current_user),
 ):
     """
     Get related papers for a given paper ID.
+    Served from the precomputed list; computed on demand only on a miss.
     """
-    return await related_service.get_related_papers(paper_id, limit)
+    result = await related_service.get_materialized(paper_id, limit)
+    response.headers["X-Related-Computed-At"] = result.computed_at.isoformat()
+    response.headers["X-Related-Cache"] = result.status
+    return result.items
 
 
 @router.get("/graph", response_model=GraphData)
@@ -0,0 +1,58 @@
+"""
+D-07: 関連論文 - 再ランクのスコア計算
+
+ベクトル類似度・キーワード Jaccard・被引用数の重み付き和を、候補全件について配列でまとめて計算する。
+final = 0.6 * vector + 0.25 * keyword + 0.15 * min(citations, 100) / 100
+並び順は final → citation → 発行年の降順（同点は候補順を保つ）。
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+VECTOR_WEIGHT = 0.6
+KEYWORD_WEIGHT = 0.25
+CITATION_WEIGHT = 0.15
+CITATION_CAP = 100
+
+
+@dataclass
+class RerankScores:
+    vector: np.ndarray
+    keyword: np.ndarray
+    citation: np.ndarray
+    final: np.ndarray
+    # final の高い順の候補インデックス
+    order: np.ndarray
+
+
+def keyword_jaccard(source: set[str], candidates: list[set[str]]) -> np.ndarray:
+    """各候補と source の Jaccard 係数。全候補の語を1本の配列にして候補ごとに共通語数を数える"""
+    sizes = np.fromiter((len(tokens) for tokens in candidates), dtype=np.int64, count=len(candidates))
+    if not source or not sizes.any():
+        return np.zeros(len(candidates))
+    owners = np.repeat(np.arange(len(candidates)), sizes)
+    shared = np.fromiter(
+        (token in source for tokens in candidates for token in tokens),
+        dtype=bool,
+        count=int(sizes.sum()),
+    )
+    intersection = np.bincount(owners[shared], minlength=len(candidates))
+    union = len(source) + sizes - intersection
+    return np.divide(intersection, union, out=np.zeros(len(candidates)), where=(sizes > 0) & (union > 0))
+
+
+def score_candidates(
+    source_keywords: set[str],
+    vector_scores: list[float],
+    keyword_sets: list[set[str]],
+    citation_counts: list[int],
+    years: list[int],
+) -> RerankScores:
+    vector = np.asarray(vector_scores, dtype=np.float64)
+    keyword = keyword_jaccard(source_keywords, keyword_sets)
+    citation = np.clip(np.asarray(citation_counts, dtype=np.float64), 0, CITATION_CAP) / CITATION_CAP
+    final = VECTOR_WEIGHT * vector + KEYWORD_WEIGHT * keyword + CITATION_WEIGHT * citation
+    # lexsort は最後のキーが第1キーで、安定ソート
+    order = np.lexsort((-np.asarray(years, dtype=np.int64), -citation, -final))
+    return RerankScores(vector=vector, keyword=keyword, citation=citation, final=final, order=order)
@@ -2,10 +2,14 @@
 Related Papers Service
 """
 from typing import List, Set
-from google.cloud import aiplatform, firestore
+from google.cloud import firestore
 from app.core.config import settings
-from app.core.embedding import generate_embedding
+from app.core.embedding import embedding_service
 from app.core.firestore import get_firestore_client
+from app.core.vector_store import vector_store
+from app.modules.related.keyword_index import PhraseIndex
+from app.modules.related.materialized import MaterializedRelated, RelatedListMaterializer
+from app.modules.related.scoring import score_candidates
 from app.modules.related.schemas import (
     GraphData,
     Node,
@@ -15,22 +19,38 @@ from app.modules.related.schemas import (
 from app.modules.papers.repository import PaperRepository
 import logging
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
 import random
 import re
 
 logger = logging.getLogger(__name__)
 
+# 再ランク候補の読み込みで取得するフィールド（get_all のフィールドマスク）
+# - スコア計算: keywords / citationCount / year（キーワードが無い候補は title + abstract で代用）
+# - レスポンス（RelatedPaper）: title / authors / venue / abstract
+# 上位 limit 件だけ後から読み直すと課金対象の読み取り件数が増えるため、1回で読む
+RERANK_FIELDS = [
+    "keywords",
+    "citationCount",
+    "citation_count",
+    "year",
+    "title",
+    "authors",
+    "venue",
+    "abstract",
+]
+
 
 class RelatedService:
     def __init__(self):
         self.db = None
         self.paper_repo = PaperRepository()
-        self.index_endpoint_name = ""
-        self.executor = ThreadPoolExecutor(max_workers=3)
         self.vector_fetch_k = 50
         self.rerank_top_k = 30
         self.keyword_bridge_max_edges_per_node = 5
+        self.materialized = RelatedListMaterializer(
+            compute=self.get_related_papers,
+            repository=self.paper_repo,
+        )
 
     def _ensure_initialized(self):
         """
@@ -40,18 +60,13 @@ class RelatedService:
         if self.db is None:
             self.db = get_firestore_client()
 
-        if not self.index_endpoint_name:
-            vector_index_endpoint_id = getattr(settings, "vector_index_endpoint_id", "")
-            if not vector_index_endpoint_id:
-                raise RuntimeError("vector_index_endpoint_id is not configured")
-            aiplatform.init(
-                project=settings.gcp_project_id,
-                location=settings.gcp_region,
-            )
-            self.index_endpoint_name = (
-                f"projects/{settings.gcp_project_id}/locations/{settings.gcp_region}"
-                f"/indexEndpoints/{vector_index_endpoint_id}"
-            )
+    async def get_materialized(self, paper_id: str, limit: int = 5) -> MaterializedRelated:
+        """
+        事前計算済みの関連論文リスト（計算時刻・hit / stale / miss 付き）。
+        保存済みが無い・件数が足りない場合だけその場で計算する。
+        """
+        self._ensure_initialized()
+        return await self.materialized.get(paper_id, limit)
 
     async def get_related_papers(self, paper_id: str, limit: int = 5) -> List[RelatedPaper]:
         """
@@ -88,28 +103,23 @@ class RelatedService:
         # In a real scenario, we should cache embeddings or retrieve stored ones.
         # But we don't store them in Firestore (only in Vector Search), so we regenerate query vector.
         # Cost optimization: Store embedding in specialized storage or Firestore (if size permits).
-        query_vector = generate_embedding(query_text)
+        query_vector = await embedding_service.embed(query_text)
         if not query_vector:
             return []
 
-        # 3. Query Vector Search
+        # 3. Query the vector store (Vertex AI Vector Search or local NumPy)
         try:
-            loop = asyncio.get_running_loop()
-            response = await loop.run_in_executor(
-                self.executor,
-                self._query_vector_search,
+            neighbors = await vector_store.query(
                 query_vector,
-                max(self.vector_fetch_k, limit),
+                max(self.vector_fetch_k, limit) + 1,
             )
         except Exception as e:
             logger.error(f"Vector search failed: {e}")
             return []
 
-        if not response:
+        if not neighbors:
             return []
 
-        neighbors = response[0]  # First query results
-
         # Build initial candidate list (vector score only)
         raw_candidates = []
         for neighbor in neighbors:
@@ -133,61 +143,47 @@ class RelatedService:
         if not raw_candidates:
             return []
 
-        # Re-rank only on top candidates for cost safety
-        rerank_candidates = raw_candidates[: self.rerank_top_k]
-        tasks = [
-            self.db.collection("papers").document(item["paper_id"]).get()
-            for item in rerank_candidates
-        ]
-        snapshots = await asyncio.gather(*tasks)
-
-        scored_candidates = []
-        for item, doc in zip(rerank_candidates, snapshots):
-            if not doc.exists:
-                continue
-
-            paper_info = doc.to_dict() or {}
-            target_keywords = self._extract_keyword_set(paper_info)
-            keyword_score = self._keyword_jaccard(source_keywords, target_keywords)
-            citation_score = self._citation_score(paper_info)
-            final_score = (
-                0.6 * item["vector_score"]
-                + 0.25 * keyword_score
-                + 0.15 * citation_score
-            )
+        return await self._rerank_candidates(source_keywords, raw_candidates, limit)
 
-            scored_candidates.append(
-                {
-                    "paper_id": doc.id,
-                    "paper_info": paper_info,
-                    "vector_score": item["vector_score"],
-                    "keyword_score": keyword_score,
-                    "citation_score": citation_score,
-                    "final_score": final_score,
-                }
-            )
+    async def _rerank_candidates(
+        self,
+        source_keywords: Set[str],
+        raw_candidates: list[dict],
+        limit: int,
+    ) -> List[RelatedPaper]:
+        """
+        Re-rank only on top candidates for cost safety.
+        Hydrate with one get_all restricted to the scoring and response fields.
+        """
+        rerank_candidates = raw_candidates[: self.rerank_top_k]
+        rerank_data = await self._get_paper_fields(
+            [item["paper_id"] for item in rerank_candidates],
+            RERANK_FIELDS,
+        )
 
-        scored_candidates.sort(
-            key=lambda x: (
-                -x["final_score"],
-                -x["citation_score"],
-                -RelatedService._safe_year(x["paper_info"].get("year")),
-            )
+        candidates = [item for item in rerank_candidates if item["paper_id"] in rerank_data]
+        scores = score_candidates(
+            source_keywords,
+            vector_scores=[item["vector_score"] for item in candidates],
+            keyword_sets=[self._extract_keyword_set(rerank_data[item["paper_id"]]) for item in candidates],
+            citation_counts=[self._citation_count(rerank_data[item["paper_id"]]) for item in candidates],
+            years=[self._safe_year(rerank_data[item["paper_id"]].get("year")) for item in candidates],
         )
 
         related_papers = []
-        for item in scored_candidates[:limit]:
-            paper_info = item["paper_info"]
+        for i in scores.order[:limit]:
+            paper_id = candidates[i]["paper_id"]
+            paper_info = rerank_data[paper_id]
             related_papers.append(
                 RelatedPaper(
-                    paperId=item["paper_id"],
+                    paperId=paper_id,
                     title=paper_info.get("title", "No Title"),
                     authors=[a.get("name") if isinstance(a, dict) else str(a) for a in paper_info.get("authors", [])],
                     year=paper_info.get("year"),
                     venue=paper_info.get("venue"),
                     abstract=paper_info.get("abstract"),
-                    similarity=float(item["final_score"]),
-                    citationCount=paper_info.get("citationCount", 0),
+                    similarity=float(scores.final[i]),
+                    citationCount=self._citation_count(paper_info),
                 )
             )
 
@@ -231,26 +227,26 @@ class RelatedService:
         }
 
     @staticmethod
-    def _keyword_jaccard(a: Set[str], b: Set[str]) -> float:
-        if not a or not b:
-            return 0.0
-        union = a | b
-        if not union:
-            return 0.0
-        return len(a & b) / len(union)
-
-    @staticmethod
-    def _citation_score(paper_data: dict) -> float:
+    def _citation_count(paper_data: dict) -> int:
         raw = paper_data.get("citationCount", paper_data.get("citation_count", 0))
         if raw is None:
-            return 0.0
+            return 0
 
         try:
-            count = int(raw)
+            return int(raw)
         except (TypeError, ValueError):
-            return 0.0
+            return 0
 
-        return min(max(count, 0), 100) / 100
+    async def _get_paper_fields(self, paper_ids: list[str], field_paths: list[str]) -> dict[str, dict]:
+        """1回の get_all で指定フィールドだけを読む（存在しない論文は含めない）"""
+        if not paper_ids:
+            return {}
+        refs = [self.db.collection("papers").document(pid) for pid in paper_ids]
+        result: dict[str, dict] = {}
+        async for doc in self.db.get_all(refs, field_paths=field_paths):
+            if doc.exists:
+                result[doc.id] = doc.to_dict() or {}
+        return result
 
     @staticmethod
     def _safe_year(value) -> int:
@@ -336,32 +332,6 @@ class RelatedService:
             return 0.0
         return min(0.9, 0.35 + 0.15 * overlap_count)
 
-    def _query_vector_search(self, query_vector: list[float], limit: int):
-        """Helper for running in executor"""
-        try:
-            index_endpoint_cls = getattr(
-                aiplatform,
-                "MatchingEngineIndexEndpoint",
-                getattr(aiplatform, "IndexEndpoint", None),
-            )
-            if index_endpoint_cls is None:
-                raise AttributeError(
-                    "No matching index endpoint client found in aiplatform"
-                )
-
-            my_index_endpoint = index_endpoint_cls(
-                index_endpoint_name=self.index_endpoint_name
-            )
-            response = my_index_endpoint.find_neighbors(
-                deployed_index_id="ai_paper_deployed_index",
-                queries=[query_vector],
-                num_neighbors=limit + 1
-            )
-            return response
-        except Exception as e:
-            logger.error(f"Sync Vector search error: {e}")
-            raise e
-
     def _resolve_graph_connection_mode(self, mode: str | None) -> str:
         configured = (mode or settings.graph_connection_mode or "keyword").strip().lower()
         if configured not in {"embedding", "keyword", "hybrid"}:
@@ -388,7 +358,7 @@ class RelatedService:
         bridge_count = 0
 
         for source_id in targets:
-            related_items = await self.get_related_papers(source_id, limit=5)
+            related_items = (await self.materialized.get(source_id, limit=5)).items
             source_is_related = source_id in project_paper_ids
 
             for related_item in related_items:
@@ -432,6 +402,7 @@ class RelatedService:
 
         owned_ids = [pid for pid in existing_paper_ids if pid not in project_paper_ids]
         related_ids = [pid for pid in existing_paper_ids if pid in project_paper_ids]
+        related_index = PhraseIndex(related_ids, phrase_map)
 
         bridge_count = 0
         for source_id in owned_ids:
@@ -439,17 +410,13 @@ class RelatedService:
             if not source_phrases:
                 continue
 
-            ranked_targets = []
-            for target_id in related_ids:
-                if source_id == target_id:
-                    continue
-                target_phrases = phrase_map.get(target_id, set())
-                if not target_phrases:
-                    continue
-                overlap_count = len(source_phrases & target_phrases)
-                if overlap_count <= 0:
-                    continue
-                ranked_targets.append((target_id, overlap_count))
+            # 共通フレーズを持つ related 論文だけを、related_ids の順で並べる
+            overlaps = related_index.overlaps(source_phrases)
+            ranked_targets = [
+                (related_ids[position], overlaps[position])
+                for position in sorted(overlaps)
+                if related_ids[position] != source_id
+            ]
 
             ranked_targets.sort(key=lambda item: -item[1])
             for target_id, overlap_count in ranked_targets[
@@ -470,6 +437,43 @@ class RelatedService:
 
         return bridge_count
 
+    def _add_project_keyword_edges(
+        self,
+        existing_ids: list[str],
+        paper_data_map: dict[str, dict],
+        edge_set: set[tuple[str, str]],
+        edges: list[Edge],
+    ) -> int:
+        phrase_map = {
+            pid: self._extract_keyword_phrases(data)
+            for pid, data in paper_data_map.items()
+        }
+        index = PhraseIndex(existing_ids, phrase_map)
+
+        bridge_count = 0
+        for i, source_id in enumerate(existing_ids):
+            source_phrases = phrase_map.get(source_id, set())
+            if not source_phrases:
+                continue
+            # 共通フレーズを持つ後続の論文（j > i）だけを訪れる
+            overlaps = index.overlaps(source_phrases, after=i)
+            for j in sorted(overlaps):
+                target_id = existing_ids[j]
+                edge_key = tuple(sorted((source_id, target_id)))
+                if edge_key in edge_set:
+                    continue
+                edges.append(
+                    Edge(
+                        source=source_id,
+                        target=target_id,
+                        value=self._keyword_bridge_score(overlaps[j]),
+                    )
+                )
+                edge_set.add(edge_key)
+                bridge_count += 1
+
+        return bridge_count
+
     async def get_project_graph(self, project_id: str) -> GraphData:
         """
         Construct a graph for a project.
@@ -531,39 +535,14 @@ class RelatedService:
             for doc in paper_docs
             if doc.exists
         }
-        phrase_map = {
-            pid: self._extract_keyword_phrases(data)
-            for pid, data in paper_data_map.items()
-        }
         edge_set = {tuple(sorted((edge.source, edge.target))) for edge in edges}
-        keyword_bridge_count = 0
-
         existing_ids = list(paper_data_map.keys())
-        for i in range(len(existing_ids)):
-            source_id = existing_ids[i]
-            source_phrases = phrase_map.get(source_id, set())
-            if not source_phrases:
-                continue
-            for j in range(i + 1, len(existing_ids)):
-                target_id = existing_ids[j]
-                target_phrases = phrase_map.get(target_id, set())
-                if not target_phrases:
-                    continue
-                overlap_count = len(source_phrases & target_phrases)
-                if overlap_count <= 0:
-                    continue
-                edge_key = tuple(sorted((source_id, target_id)))
-                if edge_key in edge_set:
-                    continue
-                edges.append(
-                    Edge(
-                        source=source_id,
-                        target=target_id,
-                        value=self._keyword_bridge_score(overlap_count),
-                    )
-                )
-                edge_set.add(edge_key)
-                keyword_bridge_count += 1
+        keyword_bridge_count = self._add_project_keyword_edges(
+            existing_ids=existing_ids,
+            paper_data_map=paper_data_map,
+            edge_set=edge_set,
+            edges=edges,
+        )
 
         logger.warning(
             "project graph keyword edges added project=%s count=%s papers=%s",
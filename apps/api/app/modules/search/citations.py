@@ -0,0 +1,135 @@
+"""
+D-04: 論文検索 - 被引用数の一括補完
+
+検索結果1ページ分の被引用数を Semantic Scholar の /paper/batch 1回で解決する。
+- 解決済みの件数は長めの TTL でキャッシュし、次回以降はリクエストなしで埋める
+- 応答を待つのは最大 wait_timeout 秒。間に合わなければ未解決のまま返し、
+  取得はバックグラウンドで続けてキャッシュと `papers` ドキュメントに反映する
+- 同じ論文を同時に解決しようとする検索同士は、実行中のバッチを共有する
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+from app.core.config import settings
+from app.core.search.cache import CacheEntry, InMemoryLRUBackend
+from app.core.semantic_scholar import SemanticScholarClient
+from app.modules.search.schemas import SearchResultItem
+
+logger = logging.getLogger(__name__)
+
+CitationWriter = Callable[[dict[str, int]], Awaitable[None]]
+
+
+def s2_paper_id(item: SearchResultItem) -> str | None:
+    """Semantic Scholar が受け付ける外部ID形式（ARXIV: / DOI: / PMID:）"""
+    if item.arxiv_id:
+        return f"ARXIV:{item.arxiv_id}"
+    if item.doi:
+        return f"DOI:{item.doi}"
+    if item.external_id.startswith("pubmed:"):
+        return f"PMID:{item.external_id.split(':', 1)[1]}"
+    return None
+
+
+class CitationEnricher:
+    def __init__(
+        self,
+        client: SemanticScholarClient | None = None,
+        cache: InMemoryLRUBackend | None = None,
+        writer: CitationWriter | None = None,
+        ttl: float | None = None,
+        wait_timeout: float | None = None,
+    ):
+        self.client = client or SemanticScholarClient()
+        self.writer = writer
+        self.ttl = settings.citation_cache_ttl if ttl is None else ttl
+        self.wait_timeout = settings.citation_enrich_timeout if wait_timeout is None else wait_timeout
+        self._cache = cache or InMemoryLRUBackend(max_entries=settings.citation_cache_size)
+        self._pending: dict[str, asyncio.Task] = {}
+        self._background: set[asyncio.Task] = set()
+        self._counters = {"requests": 0, "cache_hits": 0, "resolved": 0, "timeouts": 0, "errors": 0}
+
+    def cached_count(self, s2_id: str) -> tuple[bool, int | None]:
+        """(キャッシュにあるか, 被引用数)。S2 に存在しない論文は None をキャッシュする"""
+        entry = self._cache.get(s2_id)
+        if entry is None:
+            return False, None
+        if time.monotonic() - entry.stored_at > entry.ttl:
+            self._cache.delete(s2_id)
+            return False, None
+        return True, entry.value
+
+    async def enrich(self, items: list[SearchResultItem]) -> list[SearchResultItem]:
+        """items の citation_count をその場で埋める（待ち時間は最大 wait_timeout 秒）"""
+        wanted: dict[str, list[SearchResultItem]] = {}
+        for item in items:
+            s2_id = s2_paper_id(item)
+            if s2_id is None:
+                continue
+            found, count = self.cached_count(s2_id)
+            if found:
+                self._counters["cache_hits"] += 1
+                item.citation_count = count
+            else:
+                wanted.setdefault(s2_id, []).append(item)
+        if not wanted:
+            return items
+
+        tasks = self._resolve(list(wanted), {s2_id: group[0].external_id for s2_id, group in wanted.items()})
+        done, _ = await asyncio.wait(tasks, timeout=self.wait_timeout)
+        if len(done) < len(tasks):
+            self._counters["timeouts"] += 1
+
+        for s2_id, group in wanted.items():
+            found, count = self.cached_count(s2_id)
+            if found:
+                for item in group:
+                    item.citation_count = count
+        return items
+
+    def _resolve(self, s2_ids: list[str], paper_ids: dict[str, str]) -> set[asyncio.Task]:
+        """未解決IDのバッチを起動する（実行中のIDはそのタスクを共有）"""
+        tasks = {self._pending[s2_id] for s2_id in s2_ids if s2_id in self._pending}
+        missing = [s2_id for s2_id in s2_ids if s2_id not in self._pending]
+        if missing:
+            task = asyncio.create_task(self._fetch_batch(missing, paper_ids))
+            for s2_id in missing:
+                self._pending[s2_id] = task
+            # 呼び出し元が待ちを打ち切っても取得は最後まで続ける
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+            tasks.add(task)
+        return tasks
+
+    async def _fetch_batch(self, s2_ids: list[str], paper_ids: dict[str, str]) -> None:
+        try:
+            self._counters["requests"] += 1
+            papers = await self.client.get_papers_batch(s2_ids, fields=["citationCount"])
+        except Exception as exc:
+            self._counters["errors"] += 1
+            logger.warning("Citation enrichment failed (%d ids): %s", len(s2_ids), exc)
+            return
+        finally:
+            for s2_id in s2_ids:
+                self._pending.pop(s2_id, None)
+
+        now = time.monotonic()
+        counts: dict[str, int] = {}
+        for s2_id, paper in zip(s2_ids, papers):
+            count = paper.get("citationCount") if paper else None
+            self._cache.set(s2_id, CacheEntry(value=count, stored_at=now, ttl=self.ttl))
+            if count is not None:
+                counts[paper_ids[s2_id]] = count
+        self._counters["resolved"] += len(counts)
+
+        if counts and self.writer is not None:
+            try:
+                await self.writer(counts)
+            except Exception as exc:
+                logger.warning("Failed to store citation counts: %s", exc)
+
+    def stats(self) -> dict:
+        return {**self._counters, "cached": len(self._cache), "pending": len(self._pending)}
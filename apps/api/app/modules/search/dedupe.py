@@ -0,0 +1,212 @@
+"""
+D-04: 論文検索 - 近似重複の統合
+
+外部IDを持たない Scholar の結果などで、同じ論文がソース違いで重複するのを防ぐ。
+- 正規化タイトルの文字 n-gram から MinHash 署名を NumPy で一括計算
+- LSH（バンド分割）で候補ペアだけを比較するので、件数に対してほぼ線形
+- 候補ペアは shingle 集合の Jaccard（厳密値）で確認し、第一著者・出版年の整合も確認
+- 語の追加・欠落（サブタイトル欠落、"(preprint)" など）は threshold、語の置き換え（"survey on" / "survey of"）は
+  substitution_threshold（ほぼ一致）を要求し、数字・ローマ数字・否定語が違うタイトル（"Part I" / "Part II"）は統合しない
+- グループの統合は、両グループの全メンバーの組が条件を満たすときだけ行う（連鎖的な統合を防ぐ）
+- 重複グループは1件に統合し、アブストラクト・PDF URL・外部IDを補完する
+"""
+
+import re
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+from app.core.search import SearchResult
+
+_MERSENNE_PRIME = (1 << 31) - 1
+# 別の論文を区別しうるトークン（巻・部・版の番号、否定）
+_ROMAN_NUMERAL = re.compile(r"^(?=[ivx]+$)x{0,3}(ix|iv|v?i{0,3})$")
+_NEGATIONS = {"no", "not", "non", "without"}
+
+
+class NearDuplicateDetector:
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 4,
+        threshold: float = 0.6,
+        substitution_threshold: float = 0.9,
+        seed: int = 1,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.substitution_threshold = substitution_threshold
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    @staticmethod
+    def normalize_title(title: str) -> str:
+        normalized = re.sub(r"[^a-z0-9]+", " ", (title or "").lower())
+        return re.sub(r"\s+", " ", normalized).strip()
+
+    def _shingles(self, text: str) -> set[int]:
+        if len(text) <= self.shingle_size:
+            return {zlib.crc32(text.encode("utf-8"))} if text else set()
+        return {
+            zlib.crc32(text[i:i + self.shingle_size].encode("utf-8"))
+            for i in range(len(text) - self.shingle_size + 1)
+        }
+
+    def signatures(self, titles: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        全タイトルの MinHash 署名 (len(titles), num_perm) を一括計算する。
+        2つ目の戻り値は署名が有効（空タイトルでない）かどうか。
+        """
+        return self._signatures([self._shingles(self.normalize_title(title)) for title in titles])
+
+    def _signatures(self, shingle_sets: list[set[int]]) -> tuple[np.ndarray, np.ndarray]:
+        valid = np.array([bool(s) for s in shingle_sets], dtype=bool)
+        signatures = np.full((len(shingle_sets), self.num_perm), _MERSENNE_PRIME, dtype=np.uint64)
+        if not valid.any():
+            return signatures, valid
+
+        lengths = [len(s) for s in shingle_sets if s]
+        hashes = np.fromiter(
+            (h for s in shingle_sets if s for h in s),
+            dtype=np.uint64,
+            count=sum(lengths),
+        )
+        # (総 shingle 数, num_perm) の置換ハッシュを計算し、タイトルごとに最小値を取る
+        permuted = (hashes[:, None] * self._a + self._b) % _MERSENNE_PRIME
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        signatures[valid] = np.minimum.reduceat(permuted, offsets, axis=0)
+        return signatures, valid
+
+    def find_groups(self, results: list[SearchResult]) -> list[list[int]]:
+        """重複とみなした結果のインデックスをグループ化して返す（入力順、単独も含む）"""
+        n = len(results)
+        parent = list(range(n))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        normalized = [self.normalize_title(r.title) for r in results]
+        shingle_sets = [self._shingles(title) for title in normalized]
+        group_members: dict[int, list[int]] = {i: [i] for i in range(n)}
+
+        def duplicates(i: int, j: int) -> bool:
+            return self._titles_match(normalized[i], normalized[j], shingle_sets[i], shingle_sets[j]) and (
+                self._compatible(results[i], results[j])
+            )
+
+        signatures, valid = self._signatures(shingle_sets)
+        buckets: dict[tuple[int, bytes], list[int]] = defaultdict(list)
+        for i in np.flatnonzero(valid):
+            for band in range(self.bands):
+                start = band * self.rows
+                buckets[(band, signatures[i, start:start + self.rows].tobytes())].append(int(i))
+
+        checked: set[tuple[int, int]] = set()
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            for pos, i in enumerate(members):
+                for j in members[pos + 1:]:
+                    if (i, j) in checked:
+                        continue
+                    checked.add((i, j))
+                    root_i, root_j = find(i), find(j)
+                    if root_i == root_j:
+                        continue
+                    # 候補ペアだけでなく、統合後に同じグループになる全ての組が重複の条件を満たすこと
+                    if all(duplicates(a, b) for a in group_members[root_i] for b in group_members[root_j]):
+                        root, child = min(root_i, root_j), max(root_i, root_j)
+                        parent[child] = root
+                        group_members[root].extend(group_members.pop(child))
+
+        groups: dict[int, list[int]] = defaultdict(list)
+        for i in range(n):
+            groups[find(i)].append(i)
+        return sorted(groups.values(), key=lambda group: group[0])
+
+    def _titles_match(self, left: str, right: str, left_shingles: set[int], right_shingles: set[int]) -> bool:
+        if left == right:
+            return bool(left)
+        if not left_shingles or not right_shingles:
+            return False
+        left_tokens, right_tokens = set(left.split()), set(right.split())
+        # 番号・否定が違うタイトルは別論文（"Part I" / "Part II"、"Study 1" / "Study 2"）
+        if any(self._is_distinguishing(token) for token in left_tokens ^ right_tokens):
+            return False
+        similarity = len(left_shingles & right_shingles) / len(left_shingles | right_shingles)
+        if left_tokens - right_tokens and right_tokens - left_tokens:
+            # 両側に固有の語がある（置き換え）のは別タイトルのことが多いので、ほぼ一致だけを認める
+            return similarity >= self.substitution_threshold
+        return similarity >= self.threshold
+
+    @staticmethod
+    def _is_distinguishing(token: str) -> bool:
+        return any(ch.isdigit() for ch in token) or bool(_ROMAN_NUMERAL.match(token)) or token in _NEGATIONS
+
+    @staticmethod
+    def _author_tokens(authors: list[str]) -> set[str]:
+        if not authors or not authors[0]:
+            return set()
+        return {token for token in re.findall(r"[a-z]+", authors[0].lower()) if len(token) > 1}
+
+    def _compatible(self, left: SearchResult, right: SearchResult) -> bool:
+        # 同種の外部IDが食い違う場合は別論文（"Part I" / "Part II" など）
+        for id_type in ("ArXiv", "DOI", "PubMed"):
+            left_id = left.external_ids.get(id_type)
+            right_id = right.external_ids.get(id_type)
+            if left_id and right_id and left_id.lower() != right_id.lower():
+                return False
+        # 出版年は preprint と出版版で1年ずれることがある
+        if left.year and right.year and abs(left.year - right.year) > 1:
+            return False
+        # 第一著者は表記揺れ（"Vaswani A" / "Ashish Vaswani"）を考慮し、姓名トークンの共通で判定
+        left_authors = self._author_tokens(left.authors)
+        right_authors = self._author_tokens(right.authors)
+        if left_authors and right_authors and not left_authors & right_authors:
+            return False
+        return True
+
+    def merge(self, results: list[SearchResult]) -> tuple[list[SearchResult], int]:
+        """
+        近似重複を統合した結果と統合件数を返す。
+        代表は各グループの先頭（入力順）で、元のオブジェクトは変更しない。
+        """
+        merged: list[SearchResult] = []
+        merged_count = 0
+        for group in self.find_groups(results):
+            if len(group) == 1:
+                merged.append(results[group[0]])
+                continue
+            merged_count += len(group) - 1
+            merged.append(merge_results([results[i] for i in group]))
+        return merged, merged_count
+
+
+def merge_results(group: list[SearchResult]) -> SearchResult:
+    """代表（先頭）に他の結果のメタデータを補完したコピーを作る"""
+    primary = group[0]
+    external_ids = dict(primary.external_ids)
+    for other in group[1:]:
+        for key, value in other.external_ids.items():
+            external_ids.setdefault(key, value)
+    return primary.model_copy(
+        update={
+            "external_ids": external_ids,
+            "abstract": max((r.abstract for r in group), key=len),
+            "pdf_url": next((r.pdf_url for r in group if r.pdf_url), None),
+            "year": primary.year or next((r.year for r in group if r.year), None),
+            "authors": max((r.authors for r in group), key=len),
+            "venue": primary.venue or next((r.venue for r in group if r.venue), ""),
+        }
+    )
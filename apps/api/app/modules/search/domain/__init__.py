@@ -0,0 +1,13 @@
+from app.modules.search.domain.classifier import (
+    DEFAULT_SOURCE_ORDERS,
+    DOMAIN_PROFILES,
+    DomainClassifier,
+)
+from app.modules.search.domain.yield_table import SourceYieldTable
+
+__all__ = [
+    "DEFAULT_SOURCE_ORDERS",
+    "DOMAIN_PROFILES",
+    "DomainClassifier",
+    "SourceYieldTable",
+]
@@ -0,0 +1,135 @@
+"""
+D-04: 論文検索 - クエリのドメイン判定
+
+キーワード・フレーズ辞書からクエリの分野（pubmed / cs / math / physics）を推定し、
+優先する検索ソース順を決める。
+フレーズは1本の結合正規表現、単語は辞書引きで、クエリ1回の走査で採点する。
+"""
+
+import re
+
+# 分野ごとの判定語彙（single: 単語一致で+1 / phrases: 部分一致で+2）
+DOMAIN_PROFILES: dict[str, dict[str, set[str]]] = {
+    "pubmed": {
+        "single": {
+            "clinical", "patient", "trial", "cancer", "protein", "proteins",
+            "gene", "genes", "genome", "genomics", "genetic", "cell", "cells",
+            "disease", "medicine", "medical", "drug", "molecule", "mutation",
+            "immune", "immunology", "microbiome", "hospital", "therapy",
+            "epidemiology", "pathology", "biology", "biological", "symptom",
+            "symptoms", "cohort", "randomized", "placebo", "oncology",
+            "cardiology", "diabetes", "psychiatry", "neuronal", "antibody",
+            "antibodies", "vaccine", "vaccination", "biomarker",
+        },
+        "phrases": {
+            "clinical trial", "randomized controlled trial", "deep learning",
+            "drug discovery", "protein structure", "protein interactions",
+        },
+    },
+    "cs": {
+        "single": {
+            "transformer", "attention", "learning", "neural", "llm", "gpt",
+            "bert", "nlp", "vision", "cv", "reinforcement", "algorithm",
+            "model", "models", "embedding", "language", "dataset", "datasets",
+            "graph", "network", "networks", "token", "tokens", "prompt",
+            "prompting", "pretraining", "finetuning", "fine", "tuning",
+        },
+        "phrases": {
+            "attention is all you need", "large language model", "graph neural network",
+            "vision transformer", "diffusion model", "pretraining",
+            "self attention", "machine translation", "retrieval augmented",
+        },
+    },
+    "math": {
+        "single": {
+            "math", "mathematics", "algebra", "topology", "geometry",
+            "analysis", "probability", "statistics", "optimization", "proof",
+            "theorem", "proofs", "graph", "tensor", "equation", "equations",
+            "linear", "differential", "manifold", "combinatorics", "number",
+            "theory", "inference", "regression", "clustering", "sampling",
+            "gaussian", "stochastic", "bayes", "bayesian",
+        },
+        "phrases": {
+            "machine learning theory", "information theory", "convex optimization",
+            "probability theory", "graph theory", "markov chain",
+            "fourier transform", "manifold learning", "differential equation",
+        },
+    },
+    "physics": {
+        "single": {
+            "quantum", "physics", "particle", "particles", "field", "forces",
+            "condensed", "matter", "material", "materials", "matter", "spin",
+            "optics", "cosmology", "astrophysics", "relativity", "superconductivity",
+            "electromagnetism", "photon", "photonics",
+        },
+        "phrases": {
+            "quantum mechanics", "quantum field", "general relativity",
+            "gravitational waves", "dark matter", "dark energy", "condensed matter",
+        },
+    },
+}
+
+# 分野ごとの既定ソース順
+DEFAULT_SOURCE_ORDERS: dict[str, list[str]] = {
+    "pubmed": ["pubmed", "arxiv", "scholar"],
+    "cs": ["arxiv", "scholar", "pubmed"],
+    "math": ["arxiv", "scholar", "pubmed"],
+    "physics": ["arxiv", "scholar", "pubmed"],
+    "general": ["scholar", "arxiv", "pubmed"],
+}
+
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+
+class DomainClassifier:
+    def __init__(self, profiles: dict[str, dict[str, set[str]]] | None = None):
+        self.profiles = profiles if profiles is not None else DOMAIN_PROFILES
+        self.domains = list(self.profiles)
+
+        # 単語 → 該当分野の一覧
+        self._token_domains: dict[str, tuple[str, ...]] = {}
+        for domain, data in self.profiles.items():
+            for token in data["single"]:
+                self._token_domains[token] = self._token_domains.get(token, ()) + (domain,)
+
+        # フレーズ → 該当分野の一覧。先読みで全開始位置を調べ、重なり合う一致も拾う
+        self._phrase_domains: dict[str, tuple[str, ...]] = {}
+        for domain, data in self.profiles.items():
+            for phrase in data["phrases"]:
+                self._phrase_domains[phrase] = self._phrase_domains.get(phrase, ()) + (domain,)
+        phrases = sorted(self._phrase_domains, key=len, reverse=True)
+        self._phrase_re = re.compile(
+            "(?=(" + "|".join(re.escape(phrase) for phrase in phrases) + "))"
+        ) if phrases else None
+        # 同じ位置から始まる短いフレーズ（接頭辞関係）は別途確認する
+        self._prefix_phrases: dict[str, list[str]] = {
+            phrase: [other for other in phrases if other != phrase and phrase.startswith(other)]
+            for phrase in phrases
+        }
+
+    def score(self, query: str) -> dict[str, int]:
+        normalized = query.lower()
+        scores = dict.fromkeys(self.domains, 0)
+
+        if self._phrase_re is not None:
+            matched: set[str] = set()
+            for match in self._phrase_re.finditer(normalized):
+                phrase = match.group(1)
+                matched.add(phrase)
+                matched.update(self._prefix_phrases[phrase])
+            for phrase in matched:
+                for domain in self._phrase_domains[phrase]:
+                    scores[domain] += 2
+
+        for token in set(_TOKEN_RE.findall(normalized)):
+            for domain in self._token_domains.get(token, ()):
+                scores[domain] += 1
+        return scores
+
+    def classify(self, query: str) -> str:
+        """最高得点の分野（同点は辞書順の先勝ち、0点は general）"""
+        scores = self.score(query)
+        top_domain = max(self.domains, key=lambda domain: scores[domain], default="general")
+        if not self.domains or scores[top_domain] == 0:
+            return "general"
+        return top_domain
@@ -0,0 +1,78 @@
+"""
+D-04: 論文検索 - 分野別ソース収量テーブル
+
+過去の検索で各ソースが分野ごとにどれだけ結果を返したかを記録し、
+auto モードのソース順を並べ替える。
+既定順を事前分布として与え、件数が少ないうちは既定順がそのまま使われる。
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass
+class _YieldStats:
+    attempts: int = 0
+    fill_total: float = 0.0
+    satisfied: int = 0
+
+
+class SourceYieldTable:
+    def __init__(self, prior_weight: float = 5.0, prior_fills: tuple[float, ...] = (0.6, 0.4, 0.2)):
+        self.prior_weight = prior_weight
+        self.prior_fills = prior_fills
+        self._stats: dict[tuple[str, str], _YieldStats] = {}
+        self._first_choice = {"searches": 0, "satisfied": 0}
+        self._first_choice_by_domain: dict[str, dict[str, int]] = {}
+
+    def record(self, domain: str, source: str, returned: int, limit: int) -> None:
+        """1ソースの検索結果件数を記録する（fill = 返却件数 / limit、上限1）"""
+        if limit <= 0:
+            return
+        stats = self._stats.setdefault((domain, source), _YieldStats())
+        stats.attempts += 1
+        stats.fill_total += min(returned / limit, 1.0)
+        if returned >= limit:
+            stats.satisfied += 1
+
+    def record_first_choice(self, domain: str, satisfied: bool) -> None:
+        """auto 検索で最初に選んだソースだけで limit を満たせたか"""
+        by_domain = self._first_choice_by_domain.setdefault(domain, {"searches": 0, "satisfied": 0})
+        for counter in (self._first_choice, by_domain):
+            counter["searches"] += 1
+            if satisfied:
+                counter["satisfied"] += 1
+
+    def expected_fill(self, domain: str, source: str, rank: int) -> float:
+        prior = self.prior_fills[min(rank, len(self.prior_fills) - 1)]
+        stats = self._stats.get((domain, source))
+        if stats is None:
+            return prior
+        return (prior * self.prior_weight + stats.fill_total) / (self.prior_weight + stats.attempts)
+
+    def order(self, domain: str, default_order: list[str]) -> list[str]:
+        """期待充足率の高い順（同率は既定順）に並べ替える"""
+        scored = [
+            (self.expected_fill(domain, source, rank), -rank, source)
+            for rank, source in enumerate(default_order)
+        ]
+        return [source for _, _, source in sorted(scored, reverse=True)]
+
+    def stats(self) -> dict:
+        def rate(counter: dict[str, int]) -> float:
+            return round(counter["satisfied"] / counter["searches"], 4) if counter["searches"] else 0.0
+
+        return {
+            "first_choice": {**self._first_choice, "rate": rate(self._first_choice)},
+            "first_choice_by_domain": {
+                domain: {**counter, "rate": rate(counter)}
+                for domain, counter in self._first_choice_by_domain.items()
+            },
+            "sources": {
+                f"{domain}:{source}": {
+                    "attempts": stats.attempts,
+                    "avg_fill": round(stats.fill_total / stats.attempts, 4),
+                    "satisfied": stats.satisfied,
+                }
+                for (domain, source), stats in self._stats.items()
+            },
+        }
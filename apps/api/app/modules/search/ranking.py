@@ -0,0 +1,71 @@
+"""
+D-04: 論文検索 - 関連度スコアリング（BM25）
+
+統合後の候補（数十〜数百件）に対して、タイトル+アブストラクトの
+小さな語彙行列を作り、BM25 スコアを NumPy で一括計算する。
+タイトルはアブストラクトより重く数える（BM25F の簡易版）。
+"""
+
+import re
+from collections import Counter
+
+import numpy as np
+
+from app.core.search import SearchResult
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# 英語の機能語は語彙行列から除く
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from in is of on or the to with via using based towards".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return [token for token in _TOKEN_RE.findall((text or "").lower()) if token not in _STOPWORDS]
+
+
+class BM25Ranker:
+    def __init__(self, k1: float = 1.2, b: float = 0.75, title_weight: float = 2.0):
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+
+    def term_matrix(
+        self,
+        query_terms: list[str],
+        results: list[SearchResult],
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        (候補数, クエリ語数) の重み付き語頻度行列と、各候補の文書長を返す。
+        BM25 はクエリ語以外の列を使わないため、語彙はクエリ語に限定する。
+        """
+        tf_rows: list[list[float]] = []
+        lengths: list[float] = []
+        for result in results:
+            row = [0.0] * len(query_terms)
+            length = 0.0
+            for weight, text in ((self.title_weight, result.title), (1.0, result.abstract)):
+                # Counter は C 実装なので、機能語の除外は数え終わってから行う
+                counts = Counter(_TOKEN_RE.findall((text or "").lower()))
+                stop_count = sum(counts[word] for word in _STOPWORDS & counts.keys())
+                length += weight * (sum(counts.values()) - stop_count)
+                for index, term in enumerate(query_terms):
+                    row[index] += weight * counts.get(term, 0)
+            tf_rows.append(row)
+            lengths.append(length)
+        return np.array(tf_rows, dtype=np.float64), np.array(lengths, dtype=np.float64)
+
+    def score(self, query: str, results: list[SearchResult]) -> np.ndarray:
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        if not results or not query_terms:
+            return np.zeros(len(results), dtype=np.float64)
+
+        tf, lengths = self.term_matrix(query_terms, results)
+        n_docs = len(results)
+        df = np.count_nonzero(tf, axis=0)
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+        avg_length = lengths.mean() or 1.0
+        norm = self.k1 * (1.0 - self.b + self.b * lengths / avg_length)
+        weighted = tf * (self.k1 + 1.0) / (tf + norm[:, None])
+        return weighted @ idf
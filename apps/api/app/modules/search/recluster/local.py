@@ -0,0 +1,204 @@
+"""
+D-04: 論文検索再整理 - ローカルクラスタリング
+
+LLM を使わずに CPU だけで検索結果をグループ化する。
+- タイトル+アブストラクトの TF-IDF（タイトルは2倍、L2正規化）
+- 球面 k-means（コサイン類似度、k-means++ 初期化、乱数は固定）
+- 重心に最も近い論文をハブに、ハブに近いものを children、残りを related に置く
+- 重心の上位語（クエリ語を除く）をラベルにする
+60件で数十ミリ秒以内に返るので、LLM 障害時のフォールバックや先行表示に使う。
+"""
+
+from collections import Counter
+
+import numpy as np
+
+from app.modules.search.ranking import tokenize
+from app.modules.search.schemas import ClusterPaperItem, SearchCluster, SearchResultItem
+
+
+class LocalClusterEngine:
+    def __init__(
+        self,
+        title_weight: float = 2.0,
+        max_iter: int = 20,
+        child_similarity: float = 0.3,
+        min_similarity: float = 0.05,
+        label_terms: int = 2,
+        seed: int = 0,
+    ):
+        self.title_weight = title_weight
+        self.max_iter = max_iter
+        self.child_similarity = child_similarity
+        self.min_similarity = min_similarity
+        self.label_terms = label_terms
+        self.seed = seed
+
+    def tfidf(self, results: list[SearchResultItem]) -> tuple[np.ndarray, list[str]]:
+        """(件数, 語彙数) の L2 正規化済み TF-IDF 行列と語彙を返す（1件にしか出ない語は除く）"""
+        counts: list[Counter] = []
+        for item in results:
+            counter = Counter(tokenize(item.abstract))
+            for token in tokenize(item.title):
+                counter[token] += self.title_weight
+            counts.append(counter)
+
+        df = Counter(token for counter in counts for token in counter)
+        vocabulary = sorted(token for token, freq in df.items() if freq >= 2)
+        if not vocabulary:
+            return np.zeros((len(results), 0)), []
+        index = {token: i for i, token in enumerate(vocabulary)}
+
+        tf = np.zeros((len(results), len(vocabulary)))
+        for row, counter in enumerate(counts):
+            for token, count in counter.items():
+                column = index.get(token)
+                if column is not None:
+                    tf[row, column] = count
+        n_docs = len(results)
+        idf = np.log((1 + n_docs) / (1 + np.array([df[token] for token in vocabulary]))) + 1.0
+        matrix = np.log1p(tf) * idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0), vocabulary
+
+    def kmeans(self, matrix: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """球面 k-means。各行のクラスタ番号と、正規化した重心 (k, 語彙数) を返す"""
+        rng = np.random.default_rng(self.seed)
+        n = matrix.shape[0]
+        # k-means++: 既存の重心から遠い（類似度が低い）行ほど選ばれやすくする
+        centers = [int(rng.integers(n))]
+        closest = matrix @ matrix[centers[0]]
+        for _ in range(1, k):
+            distance = np.clip(1.0 - closest, 0.0, None)
+            total = distance.sum()
+            if total <= 0:
+                break
+            center = int(rng.choice(n, p=distance / total))
+            centers.append(center)
+            closest = np.maximum(closest, matrix @ matrix[center])
+        centroids = matrix[centers].copy()
+
+        labels = np.full(n, -1)
+        for _ in range(self.max_iter):
+            new_labels = np.argmax(matrix @ centroids.T, axis=1)
+            if np.array_equal(new_labels, labels):
+                break
+            labels = new_labels
+            for cluster in range(len(centroids)):
+                members = matrix[labels == cluster]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    norm = np.linalg.norm(centroid)
+                    centroids[cluster] = centroid / norm if norm > 0 else centroid
+        return labels, centroids
+
+    def cluster(
+        self,
+        query: str,
+        results: list[SearchResultItem],
+        group_target: int = 4,
+        include_related: bool = True,
+    ) -> tuple[list[SearchCluster], list[ClusterPaperItem]]:
+        """(クラスタ, 分類できなかった論文) を返す。クラスタは件数の多い順"""
+        if not results:
+            return [], []
+        matrix, vocabulary = self.tfidf(results)
+        has_terms = matrix.any(axis=1) if vocabulary else np.zeros(len(results), dtype=bool)
+        rows = np.flatnonzero(has_terms)
+        uncertain = [self._paper(results[i], 0.0) for i in np.flatnonzero(~has_terms)]
+        if len(rows) == 0:
+            hub, *rest = results
+            return [self._single_cluster(hub, rest)], []
+
+        k = max(1, min(group_target, len(rows)))
+        labels, centroids = self.kmeans(matrix[rows], k)
+        similarities = matrix[rows] @ centroids.T
+        query_terms = set(tokenize(query))
+
+        clusters: list[SearchCluster] = []
+        for cluster in range(len(centroids)):
+            member_rows = np.flatnonzero(labels == cluster)
+            if len(member_rows) == 0:
+                continue
+            scores = similarities[member_rows, cluster]
+            confident = member_rows[scores >= self.min_similarity]
+            for local in member_rows[scores < self.min_similarity]:
+                uncertain.append(self._paper(results[rows[local]], float(similarities[local, cluster])))
+            if len(confident) == 0:
+                continue
+
+            # ハブ = 重心に最も近い論文（同率は検索順位の高いもの）
+            hub_local = confident[np.argmax(similarities[confident, cluster])]
+            hub_vector = matrix[rows[hub_local]]
+            terms = self._top_terms(centroids[cluster], vocabulary, query_terms)
+            children: list[ClusterPaperItem] = []
+            related: list[ClusterPaperItem] = []
+            for local in confident:
+                if local == hub_local:
+                    continue
+                item = results[rows[local]]
+                to_hub = float(matrix[rows[local]] @ hub_vector)
+                shared = self._top_terms(matrix[rows[local]] * hub_vector, vocabulary, query_terms, limit=1)
+                note = f"{shared[0]}に関する研究" if shared else None
+                if to_hub >= self.child_similarity or not include_related:
+                    children.append(self._paper(item, to_hub, "類似", note))
+                else:
+                    related.append(self._paper(item, to_hub, "関連", note))
+
+            label = " / ".join(terms) if terms else "その他"
+            clusters.append(
+                SearchCluster(
+                    cluster_id=f"local-{cluster + 1}",
+                    label=label,
+                    summary=f"「{label}」に関する{len(confident)}件の論文",
+                    hub_paper=self._paper(results[rows[hub_local]], float(similarities[hub_local, cluster])),
+                    children=sorted(children, key=lambda paper: -paper.score),
+                    related=sorted(related, key=lambda paper: -paper.score),
+                )
+            )
+
+        clusters.sort(key=lambda c: -(1 + len(c.children) + len(c.related)))
+        return clusters, uncertain
+
+    def _top_terms(
+        self,
+        weights: np.ndarray,
+        vocabulary: list[str],
+        exclude: set[str],
+        limit: int | None = None,
+    ) -> list[str]:
+        limit = self.label_terms if limit is None else limit
+        terms: list[str] = []
+        for column in np.argsort(-weights):
+            if weights[column] <= 0 or len(terms) >= limit:
+                break
+            if vocabulary[column] not in exclude:
+                terms.append(vocabulary[column])
+        return terms
+
+    def _single_cluster(self, hub: SearchResultItem, rest: list[SearchResultItem]) -> SearchCluster:
+        return SearchCluster(
+            cluster_id="local-1",
+            label="検索結果",
+            summary=f"{1 + len(rest)}件の論文",
+            hub_paper=self._paper(hub, 1.0),
+            children=[],
+            related=[self._paper(item, 0.0, "関連") for item in rest],
+        )
+
+    @staticmethod
+    def _paper(
+        item: SearchResultItem,
+        score: float,
+        relation_type: str | None = None,
+        relation_note: str | None = None,
+    ) -> ClusterPaperItem:
+        return ClusterPaperItem(
+            paper_id=item.external_id,
+            title=item.title,
+            year=item.year,
+            source=item.source,
+            score=round(min(max(score, 0.0), 1.0), 4),
+            relation_type=relation_type,
+            relation_note=relation_note,
+        )
@@ -2,10 +2,14 @@
 D-04: 論文検索再整理 - サービス
 """
 
+import hashlib
 import json
 import logging
 import time
 
+from app.core.config import settings
+from app.core.search.cache import CacheEntry, InMemoryLRUBackend, normalize_query
+from app.modules.search.recluster.local import LocalClusterEngine
 from app.modules.search.schemas import (
     ReclusterSearchResponse,
     SearchResultItem,
@@ -13,10 +17,29 @@ from app.modules.search.schemas import (
 
 logger = logging.getLogger(__name__)
 
+# 文字数からのトークン数概算（英語で約4文字/トークン）
+_CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + _CHARS_PER_TOKEN - 1) // _CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """概算トークン数が max_tokens に収まるよう単語境界で切り詰める"""
+    max_chars = max_tokens * _CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind(" ", 0, max_chars)
+    return text[: cut if cut > 0 else max_chars].rstrip() + "…"
+
 
 class ReclusterSearchService:
     def __init__(self, gemini_client):
         self.gemini = gemini_client
+        self.local_engine = LocalClusterEngine()
+        self._cache = InMemoryLRUBackend(max_entries=settings.recluster_cache_size)
+        self._cache_ttl = settings.recluster_cache_ttl
 
     async def recluster_from_results(
         self,
@@ -24,7 +47,12 @@ class ReclusterSearchService:
         results: list[SearchResultItem],
         group_target: int = 4,
         include_related: bool = True,
+        engine: str = "llm",
     ) -> ReclusterSearchResponse:
+        """
+        engine: "llm"（Gemini） / "local"（TF-IDF + k-means、LLM の結果待ちの間の先行表示にも使える）
+        LLM が使えない・失敗した場合は local の結果を fallback_used=true で返す。
+        """
         started_at = time.perf_counter()
         if not results:
             return ReclusterSearchResponse(
@@ -35,38 +63,79 @@ class ReclusterSearchService:
                     "fetched": 0,
                     "latency_ms": int((time.perf_counter() - started_at) * 1000),
                     "model": getattr(self.gemini, "model_name", "unknown"),
+                    "engine": engine,
                     "fallback_used": False,
                 },
             )
 
+        if engine == "local":
+            return self._build_local_response(
+                query=query,
+                results=results,
+                group_target=group_target,
+                include_related=include_related,
+                started_at=started_at,
+                fallback_used=False,
+            )
+
         if not self.gemini.model:
             return self._build_fallback_response(
                 query=query,
                 results=results,
                 started_at=started_at,
+                group_target=group_target,
+                include_related=include_related,
             )
 
+        cache_key = self.cache_key(query, results, group_target, include_related)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            cached.meta = {
+                **cached.meta,
+                "latency_ms": int((time.perf_counter() - started_at) * 1000),
+                "cache_hit": True,
+            }
+            return cached
+
         prompt = self._build_recluster_prompt(
             query=query,
             candidates=results,
             group_target=group_target,
             include_related=include_related,
         )
+        prompt_meta = {
+            "prompt_chars": len(prompt),
+            "prompt_tokens_est": estimate_tokens(prompt),
+            "prompt_build_ms": round((time.perf_counter() - started_at) * 1000, 2),
+        }
 
         try:
+            llm_started_at = time.perf_counter()
             response = await self.gemini.model.generate_content_async(
                 prompt,
                 generation_config={"response_mime_type": "application/json"},
             )
+            prompt_meta["llm_latency_ms"] = int((time.perf_counter() - llm_started_at) * 1000)
+            usage = getattr(response, "usage_metadata", None)
+            if usage is not None:
+                prompt_meta["prompt_tokens"] = getattr(usage, "prompt_token_count", None)
+                prompt_meta["output_tokens"] = getattr(usage, "candidates_token_count", None)
             parsed = json.loads(response.text)
             validated = ReclusterSearchResponse(**parsed)
             validated.meta = {
                 **validated.meta,
+                **prompt_meta,
                 "fetched": len(results),
                 "latency_ms": int((time.perf_counter() - started_at) * 1000),
                 "model": getattr(self.gemini, "model_name", "unknown"),
+                "engine": "llm",
                 "fallback_used": False,
+                "cache_hit": False,
             }
+            self._cache.set(
+                cache_key,
+                CacheEntry(value=validated.model_copy(deep=True), stored_at=time.monotonic(), ttl=self._cache_ttl),
+            )
             return validated
         except Exception as exc:
             logger.warning("Recluster generation failed: %s", exc)
@@ -74,28 +143,62 @@ class ReclusterSearchService:
                 query=query,
                 results=results,
                 started_at=started_at,
+                group_target=group_target,
+                include_related=include_related,
             )
 
-    def _build_recluster_prompt(
-        self,
+    @staticmethod
+    def cache_key(
         query: str,
-        candidates: list[SearchResultItem],
+        results: list[SearchResultItem],
         group_target: int,
         include_related: bool,
     ) -> str:
+        """(正規化クエリ, 論文IDの並び, group_target, include_related) のハッシュ"""
+        payload = json.dumps(
+            [normalize_query(query), [item.external_id for item in results], group_target, include_related],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _cache_get(self, key: str) -> ReclusterSearchResponse | None:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.stored_at > entry.ttl:
+            self._cache.delete(key)
+            return None
+        return entry.value.model_copy(deep=True)
+
+    @staticmethod
+    def compact_candidates(candidates: list[SearchResultItem], token_budget: int) -> list[dict]:
+        """
+        プロンプト用に候補を縮める。空のフィールドは省き、アブストラクトは
+        全体で token_budget（概算）に収まるよう1件あたりの上限で切り詰める。
+        """
+        per_paper = max(settings.recluster_abstract_min_tokens, token_budget // max(1, len(candidates)))
         papers = []
         for item in candidates:
-            papers.append(
-                {
-                    "paper_id": item.external_id,
-                    "title": item.title,
-                    "year": item.year,
-                    "source": item.source,
-                    "abstract": item.abstract,
-                }
-            )
+            paper = {"paper_id": item.external_id, "title": item.title}
+            if item.year:
+                paper["year"] = item.year
+            if item.source:
+                paper["source"] = item.source
+            abstract = " ".join((item.abstract or "").split())
+            if abstract:
+                paper["abstract"] = truncate_to_tokens(abstract, per_paper)
+            papers.append(paper)
+        return papers
 
-        payload = json.dumps(papers, ensure_ascii=False)
+    def _build_recluster_prompt(
+        self,
+        query: str,
+        candidates: list[SearchResultItem],
+        group_target: int,
+        include_related: bool,
+    ) -> str:
+        papers = self.compact_candidates(candidates, settings.recluster_abstract_token_budget)
+        payload = json.dumps(papers, ensure_ascii=False, separators=(",", ":"))
         return f"""
 You are an academic search organizer.
 Reorganize papers for query: "{query}".
@@ -151,7 +254,21 @@ Candidate papers:
         query: str,
         results: list[SearchResultItem],
         started_at: float,
+        group_target: int = 4,
+        include_related: bool = True,
     ) -> ReclusterSearchResponse:
+        try:
+            return self._build_local_response(
+                query=query,
+                results=results,
+                group_target=group_target,
+                include_related=include_related,
+                started_at=started_at,
+                fallback_used=True,
+            )
+        except Exception as exc:
+            logger.warning("Local recluster failed: %s", exc)
+
         hub = results[0]
         return ReclusterSearchResponse(
             query=query,
@@ -177,6 +294,35 @@ Candidate papers:
                 "fetched": len(results),
                 "latency_ms": int((time.perf_counter() - started_at) * 1000),
                 "model": getattr(self.gemini, "model_name", "unknown"),
+                "engine": "top_hit",
                 "fallback_used": True,
             },
         )
+
+    def _build_local_response(
+        self,
+        query: str,
+        results: list[SearchResultItem],
+        group_target: int,
+        include_related: bool,
+        started_at: float,
+        fallback_used: bool,
+    ) -> ReclusterSearchResponse:
+        clusters, uncertain_items = self.local_engine.cluster(
+            query=query,
+            results=results,
+            group_target=group_target,
+            include_related=include_related,
+        )
+        return ReclusterSearchResponse(
+            query=query,
+            clusters=clusters,
+            uncertain_items=uncertain_items,
+            meta={
+                "fetched": len(results),
+                "latency_ms": int((time.perf_counter() - started_at) * 1000),
+                "model": "tfidf-kmeans",
+                "engine": "local",
+                "fallback_used": fallback_used,
+            },
+        )
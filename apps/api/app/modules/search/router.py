@@ -1,12 +1,17 @@
 """
 D-04: 論文検索 - ルーター
 """
+import json
+from typing import Literal
+
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 
 from app.core.firebase_auth import get_current_user
 from app.modules.search.schemas import (
     ReclusterSearchRequest,
     ReclusterSearchResponse,
+    SearchDiagnosticsResponse,
     SearchResultListResponse,
 )
 from app.modules.search.service import search_service
@@ -16,15 +21,60 @@ router = APIRouter()
 @router.get("/papers", response_model=SearchResultListResponse)
 async def search_papers(
     q: str = Query(..., min_length=1, description="検索キーワード"),
-    source: str = Query("auto", description="検索ソース (auto, all, arxiv, pubmed, scholar, gemini)"),
+    source: str = Query("auto", description="検索ソース (auto, all, local, arxiv, pubmed, scholar, gemini)"),
     limit: int = 20,
     offset: int = 0,
+    rank_mode: Literal["title", "bm25"] = Query("title", description="並び順 (title: タイトル一致, bm25: タイトル+アブストラクト)"),
     current_user: dict = Depends(get_current_user),
 ):
     """
     外部論文DBを検索する。
     """
-    return await search_service.search_papers(query=q, limit=limit, offset=offset, source=source, uid=current_user["uid"])
+    return await search_service.search_papers(
+        query=q,
+        limit=limit,
+        offset=offset,
+        source=source,
+        uid=current_user["uid"],
+        rank_mode=rank_mode,
+    )
+
+
+@router.get("/papers/stream")
+async def search_papers_stream(
+    q: str = Query(..., min_length=1, description="検索キーワード"),
+    source: str = Query("auto", description="検索ソース (auto, all, local, arxiv, pubmed, scholar, gemini)"),
+    limit: int = 20,
+    format: Literal["ndjson", "sse"] = Query("ndjson", description="ストリーム形式"),
+    rank_mode: Literal["title", "bm25"] = Query("title", description="並び順 (title: タイトル一致, bm25: タイトル+アブストラクト)"),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    外部論文DBを検索し、ソースごとの結果を到着順にストリームで返す。
+    フレーム種別: batch → delta（順位更新）→ ... → final（統合結果）
+    """
+    frames = search_service.stream_search_papers(
+        query=q,
+        limit=limit,
+        source=source,
+        uid=current_user["uid"],
+        rank_mode=rank_mode,
+    )
+
+    async def encode():
+        async for frame in frames:
+            payload = json.dumps(frame, ensure_ascii=False, default=str)
+            if format == "sse":
+                yield f"event: {frame['type']}\ndata: {payload}\n\n"
+            else:
+                yield payload + "\n"
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        encode(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.post("/papers/recluster", response_model=ReclusterSearchResponse)
@@ -33,7 +83,7 @@ async def search_papers_recluster(
     current_user: dict = Depends(get_current_user),
 ):
     """
-    検索結果をLLMで再整理して返す。
+    検索結果をLLM（engine=local ならローカルの TF-IDF クラスタリング）で再整理して返す。
     """
     return await search_service.search_papers_reclustered(
         query=payload.query,
@@ -41,5 +91,16 @@ async def search_papers_recluster(
         top_k=payload.top_k,
         group_target=payload.group_target,
         include_related=payload.include_related,
+        engine=payload.engine,
         uid=current_user["uid"],
     )
+
+
+@router.get("/diagnostics", response_model=SearchDiagnosticsResponse)
+async def search_diagnostics(
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    検索基盤の内部状態（キャッシュ統計など）を返す。
+    """
+    return search_service.get_diagnostics()
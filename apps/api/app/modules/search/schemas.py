@@ -31,6 +31,7 @@ class SearchResultListResponse(BaseModel):
     total: int
     offset: int
     limit: int
+    meta: dict[str, Any] = Field(default_factory=dict)
 
 
 class ReclusterSearchRequest(BaseModel):
@@ -41,6 +42,10 @@ class ReclusterSearchRequest(BaseModel):
     top_k: int = Field(default=60, ge=1, le=100)
     group_target: int = Field(default=4, ge=1, le=10)
     include_related: bool = True
+    engine: Literal["llm", "local"] = Field(
+        default="llm",
+        description="llm: Gemini で再整理 / local: TF-IDF + k-means（LLM なし、数十ms）",
+    )
 
 
 class ClusterPaperItem(BaseModel):
@@ -67,3 +72,15 @@ class ReclusterSearchResponse(BaseModel):
     clusters: list[SearchCluster] = Field(default_factory=list)
     uncertain_items: list[ClusterPaperItem] = Field(default_factory=list)
     meta: dict[str, Any] = Field(default_factory=dict)
+
+
+class SearchDiagnosticsResponse(BaseModel):
+    cache: dict[str, Any] = Field(default_factory=dict)
+    singleflight: dict[str, Any] = Field(default_factory=dict)
+    rate_limits: dict[str, Any] = Field(default_factory=dict)
+    scholar: dict[str, Any] = Field(default_factory=dict)
+    source_yields: dict[str, Any] = Field(default_factory=dict)
+    local_catalog: dict[str, Any] = Field(default_factory=dict)
+    circuit_breakers: dict[str, Any] = Field(default_factory=dict)
+    citations: dict[str, Any] = Field(default_factory=dict)
+    embedding: dict[str, Any] = Field(default_factory=dict)
@@ -3,21 +3,40 @@ D-04: 論文検索 - サービス
 """
 from app.core.semantic_scholar import SemanticScholarClient
 from app.core.gemini import gemini_client
+from app.core.embedding import embedding_service
 from app.core.config import settings
+from app.modules.search.citations import CitationEnricher
+from app.modules.search.dedupe import NearDuplicateDetector
+from app.modules.search.domain import DEFAULT_SOURCE_ORDERS, DomainClassifier, SourceYieldTable
+from app.modules.search.ranking import BM25Ranker
 from app.modules.search.recluster import ReclusterSearchService
 from app.modules.search.schemas import (
     ReclusterSearchResponse,
+    SearchDiagnosticsResponse,
     SearchResultItem,
     SearchResultListResponse,
 )
 from fastapi import HTTPException
 import logging
 import asyncio
+import math
 import re
-
-from app.core.search import ArxivClient, PubmedClient, ScholarClient, SearchResult
+import time
+
+from app.core.search import (
+    ArxivClient,
+    BaseSearchClient,
+    PubmedClient,
+    ScholarClient,
+    SearchResult,
+    local_catalog,
+    rate_limit_key,
+    search_cache,
+    search_singleflight,
+)
 import uuid
 import traceback
+from typing import AsyncIterator
 
 logger = logging.getLogger(__name__)
 
@@ -26,68 +45,15 @@ class SearchService:
         self.arxiv = ArxivClient()
         self.pubmed = PubmedClient()
         self.scholar = ScholarClient()
+        self.catalog = local_catalog
         self.gemini = gemini_client
         self.recluster_service = ReclusterSearchService(self.gemini)
 
-        self._domain_profiles = {
-            "pubmed": {
-                "single": {
-                    "clinical", "patient", "trial", "cancer", "protein", "proteins",
-                    "gene", "genes", "genome", "genomics", "genetic", "cell", "cells",
-                    "disease", "medicine", "medical", "drug", "molecule", "mutation",
-                    "immune", "immunology", "microbiome", "hospital", "therapy",
-                    "epidemiology", "pathology", "biology", "biological", "symptom",
-                    "symptoms", "cohort", "randomized", "placebo", "oncology",
-                    "cardiology", "diabetes", "psychiatry", "neuronal", "antibody",
-                    "antibodies", "vaccine", "vaccination", "biomarker",
-                },
-                "phrases": {
-                    "clinical trial", "randomized controlled trial", "deep learning",
-                    "drug discovery", "protein structure", "protein interactions",
-                },
-            },
-            "cs": {
-                "single": {
-                    "transformer", "attention", "learning", "neural", "llm", "gpt",
-                    "bert", "nlp", "vision", "cv", "reinforcement", "algorithm",
-                    "model", "models", "embedding", "language", "dataset", "datasets",
-                    "graph", "network", "networks", "token", "tokens", "prompt",
-                    "prompting", "pretraining", "finetuning", "fine", "tuning",
-                },
-                "phrases": {
-                    "attention is all you need", "large language model", "graph neural network",
-                    "vision transformer", "diffusion model", "pretraining",
-                    "self attention", "machine translation", "retrieval augmented",
-                },
-            },
-            "math": {
-                "single": {
-                    "math", "mathematics", "algebra", "topology", "geometry",
-                    "analysis", "probability", "statistics", "optimization", "proof",
-                    "theorem", "proofs", "graph", "tensor", "equation", "equations",
-                    "linear", "differential", "manifold", "combinatorics", "number",
-                    "theory", "inference", "regression", "clustering", "sampling",
-                    "gaussian", "stochastic", "bayes", "bayesian",
-                },
-                "phrases": {
-                    "machine learning theory", "information theory", "convex optimization",
-                    "probability theory", "graph theory", "markov chain",
-                    "fourier transform", "manifold learning", "differential equation",
-                },
-            },
-            "physics": {
-                "single": {
-                    "quantum", "physics", "particle", "particles", "field", "forces",
-                    "condensed", "matter", "material", "materials", "matter", "spin",
-                    "optics", "cosmology", "astrophysics", "relativity", "superconductivity",
-                    "electromagnetism", "photon", "photonics",
-                },
-                "phrases": {
-                    "quantum mechanics", "quantum field", "general relativity",
-                    "gravitational waves", "dark matter", "dark energy", "condensed matter",
-                },
-            },
-        }
+        self.domain_classifier = DomainClassifier()
+        self.source_yields = SourceYieldTable()
+        self.near_duplicates = NearDuplicateDetector()
+        self.bm25 = BM25Ranker()
+        self.citations = CitationEnricher(writer=self._store_citation_counts)
 
     async def search_papers(
         self,
@@ -96,124 +62,446 @@ class SearchService:
         offset: int = 0,
         source: str = "auto",
         uid: str | None = None,
+        rank_mode: str = "title",
     ) -> SearchResultListResponse:
         """
         論文を検索する。source引数で検索対象を指定可能。
-        valid sources: "auto", "all", "arxiv", "pubmed", "scholar", "gemini"
+        valid sources: "auto", "all", "local", "arxiv", "pubmed", "scholar", "gemini"
+        rank_mode: "title"（タイトル一致） / "bm25"（タイトル+アブストラクトの BM25）
         """
-        results: list[SearchResult] = []
-        
+        # 外部APIのレート制御待ちをユーザー単位で公平に並べる
+        rate_limit_key.set(uid or "anonymous")
         try:
-            if source == "all":
-                per_source_limit = min(limit, max(1, (limit + 2) // 3))
-                search_tasks = {
-                    "arxiv": self.arxiv.search(query, per_source_limit),
-                    "pubmed": self.pubmed.search(query, per_source_limit),
-                    "scholar": self.scholar.search(query, per_source_limit),
-                }
-                task_results = await asyncio.gather(*search_tasks.values(), return_exceptions=True)
-                for source_name, result_or_exc in zip(search_tasks.keys(), task_results):
-                    if isinstance(result_or_exc, Exception):
-                        logger.warning("Search API Warning (%s): %s", source_name, result_or_exc)
-                        continue
-                    results.extend(result_or_exc)
-            elif source == "auto":
-                preferred_order = self._infer_sources_by_domain(query)
-                used_sources: set[str] = set()
-                for source_name in preferred_order:
-                    used_sources.add(source_name)
-                    part_results = await self._safe_search(source_name, query, limit)
-                    results.extend(part_results)
-
-                    # 1次のソースで十分結果が出ている場合はそれを採用
-                    if len(results) >= limit:
-                        break
-
-                # 足りなければ残りのソースで補完
-                for fallback_source in ("arxiv", "pubmed", "scholar"):
-                    if len(results) >= limit:
-                        break
-                    if fallback_source in used_sources:
-                        continue
-                    part_results = await self._safe_search(fallback_source, query, limit - len(results))
-                    results.extend(part_results)
-
-            elif source == "arxiv":
-                results = await self._safe_search("arxiv", query, limit)
-            elif source == "pubmed":
-                results = await self._safe_search("pubmed", query, limit)
-            elif source == "scholar":
-                results = await self._safe_search("scholar", query, limit)
-            elif source == "gemini":
-                # Gemini logic (Legacy/Fallback)
-                raw_data = await self._safe_search("gemini", query, limit)
-                if isinstance(raw_data, list):
-                    raw_data = {"data": raw_data}
-                for p in raw_data.get("data", []):
-                    results.append(SearchResult(
-                        title=p.get("title", ""),
-                        authors=[a.get("name") for a in p.get("authors", [])],
-                        year=p.get("year"),
-                        venue=p.get("venue", ""),
-                        abstract=p.get("abstract", ""),
-                        external_ids=p.get("externalIds", {}),
-                        pdf_url=p.get("openAccessPdf", {}).get("url") if p.get("openAccessPdf") else None,
-                        source="gemini"
-                    ))
+            if source in {"auto", "all"}:
+                # 複数ソース統合モードは統合結果ごとキャッシュ・同時実行集約する
+                merged_source = f"merged:{source}"
+                results, meta = await search_cache.get_or_load(
+                    merged_source,
+                    query,
+                    limit,
+                    lambda: search_singleflight.do(
+                        merged_source,
+                        query,
+                        limit,
+                        lambda: self._fetch_results(query, limit, source),
+                    ),
+                )
             else:
-                # Default fallback: auto
-                results = await self._safe_search("arxiv", query, limit)
-                
+                results, meta = await self._fetch_results(query, limit, source)
         except Exception as e:
             print(f"Search API Error ({source}): {e}")
             traceback.print_exc()
             raise HTTPException(status_code=500, detail=f"Search API Error ({source}): {str(e)}")
 
         # ユーザーのライブラリ（いいね済みID一覧）を取得
-        liked_ids: set[str] = set()
-        if uid:
-            try:
-                from app.modules.papers.repository import PaperRepository
-                paper_repo = PaperRepository()
-                liked_ids = set(await paper_repo.get_user_likes(uid))
-            except Exception:
-                pass  # ライブラリ取得に失敗しても検索結果は返す
+        liked_ids = await self._get_liked_ids(uid)
 
         # Convert to Response Schema
-        results = self._dedupe_and_rank_results(results, query)
+        results = self._dedupe_and_rank_results(results, query, rank_mode)
         results = results[:limit]
 
         items = []
         for r in results:
             items.append(self._convert_to_item(r, liked_ids))
+        if settings.citation_enrich_enabled:
+            await self.citations.enrich(items)
 
         return SearchResultListResponse(
             results=items,
             total=len(items),
             offset=offset,
-            limit=limit
+            limit=limit,
+            meta={**meta, "rank_mode": rank_mode, "contribution": self._count_contribution(items)},
         )
 
+    async def stream_search_papers(
+        self,
+        query: str,
+        limit: int = 20,
+        source: str = "auto",
+        uid: str | None = None,
+        rank_mode: str = "title",
+    ) -> AsyncIterator[dict]:
+        """
+        ソースごとの結果を到着順にフレームとして返す。
+        - batch: 新規に追加された結果（重複除去済み）
+        - delta: 統合後の上位 limit 件の順位（external_id 列）と追加/重複件数
+        - final: search_papers と同形式の統合レスポンス
+        """
+        started_at = time.perf_counter()
+        rate_limit_key.set(uid or "anonymous")
+        if source == "all":
+            per_source_limit = min(limit, max(1, (limit + 2) // 3))
+            available, _ = self._split_by_breaker(["arxiv", "pubmed", "scholar"])
+            plan = [(name, per_source_limit) for name in available]
+        elif source == "auto":
+            domain, order = self._plan_auto_sources(query)
+            available, _ = self._split_by_breaker(order)
+            plan = [(name, limit) for name in available]
+            if settings.search_local_first:
+                # カタログは即座に返るので、最初のフレームになる
+                plan.insert(0, ("local", limit))
+        elif source in {"local", "arxiv", "pubmed", "scholar"}:
+            plan = [(source, limit)]
+        else:
+            # gemini など非ストリーム対象は通常検索の結果を1フレームで返す
+            response = await self.search_papers(
+                query=query, limit=limit, source=source, uid=uid, rank_mode=rank_mode
+            )
+            yield {"type": "final", **response.model_dump()}
+            return
+
+        liked_task = asyncio.create_task(self._get_liked_ids(uid))
+        tasks = [
+            asyncio.create_task(self._tagged_search(name, query, part_limit))
+            for name, part_limit in plan
+        ]
+        merged: list[SearchResult] = []
+        items_by_key: dict[str, SearchResultItem] = {}
+
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                source_name, part_results, completed = await next_done
+                liked_ids = await liked_task
+                if source_name != "local":
+                    await self.catalog.add_results(part_results)
+                if source == "auto" and source_name != "local" and completed:
+                    self._record_source_yield(domain, order, source_name, len(part_results), limit)
+
+                added: list[SearchResultItem] = []
+                duplicates = 0
+                for r in part_results:
+                    key = self._dedupe_key(r)
+                    if key in items_by_key:
+                        duplicates += 1
+                        continue
+                    item = self._convert_to_item(r, liked_ids)
+                    items_by_key[key] = item
+                    merged.append(r)
+                    added.append(item)
+
+                elapsed_ms = int((time.perf_counter() - started_at) * 1000)
+                yield {
+                    "type": "batch",
+                    "source": source_name,
+                    "items": [item.model_dump() for item in added],
+                    "latency_ms": elapsed_ms,
+                }
+
+                ranked = self._dedupe_and_rank_results(merged, query, rank_mode)[:limit]
+                yield {
+                    "type": "delta",
+                    "source": source_name,
+                    "order": [items_by_key[self._dedupe_key(r)].external_id for r in ranked],
+                    "added": [item.external_id for item in added],
+                    "duplicates": duplicates,
+                    "latency_ms": elapsed_ms,
+                }
+        finally:
+            for task in tasks:
+                task.cancel()
+            liked_task.cancel()
+
+        ranked = self._dedupe_and_rank_results(merged, query, rank_mode)[:limit]
+        items = [items_by_key[self._dedupe_key(r)] for r in ranked]
+        if settings.citation_enrich_enabled:
+            await self.citations.enrich(items)
+        yield {
+            "type": "final",
+            **SearchResultListResponse(
+                results=items,
+                total=len(items),
+                offset=0,
+                limit=limit,
+                meta={
+                    "strategy": f"stream:{source}",
+                    "rank_mode": rank_mode,
+                    "latency_ms": int((time.perf_counter() - started_at) * 1000),
+                    "contribution": self._count_contribution(items),
+                },
+            ).model_dump(),
+        }
+
+    async def _tagged_search(
+        self,
+        source: str,
+        query: str,
+        limit: int,
+    ) -> tuple[str, list[SearchResult], bool]:
+        return (source, *await self._try_search(source, query, limit))
+
+    async def _store_citation_counts(self, counts: dict[str, int]) -> None:
+        from app.modules.papers.repository import PaperRepository
+        await PaperRepository().set_citation_counts(counts)
+
+    async def _get_liked_ids(self, uid: str | None) -> set[str]:
+        if not uid:
+            return set()
+        try:
+            from app.modules.papers.membership import library_membership
+            return await library_membership.liked_ids(uid)
+        except Exception:
+            return set()  # ライブラリ取得に失敗しても検索結果は返す
+
+    @staticmethod
+    def _count_contribution(items: list[SearchResultItem]) -> dict[str, int]:
+        """最終結果に対するソース別の寄与件数"""
+        contribution: dict[str, int] = {}
+        for item in items:
+            contribution[item.source] = contribution.get(item.source, 0) + 1
+        return contribution
+
+    async def _fetch_results(
+        self,
+        query: str,
+        limit: int,
+        source: str,
+    ) -> tuple[list[SearchResult], dict]:
+        """ソース指定に応じて外部APIから結果を取得する（キャッシュなし）"""
+        results: list[SearchResult] = []
+        meta: dict = {"strategy": source}
+
+        local_results: list[SearchResult] = []
+        if source == "auto" and settings.search_local_first:
+            # ローカルカタログで十分な件数が取れれば外部APIは呼ばない
+            local_results = await self.catalog.search(query, limit, max_age=settings.search_local_max_age)
+            if len(local_results) >= math.ceil(limit * settings.search_local_min_ratio):
+                return local_results, {"strategy": "local", "local_hits": len(local_results)}
+
+        if source == "all":
+            per_source_limit = min(limit, max(1, (limit + 2) // 3))
+            available, skipped = self._split_by_breaker(["arxiv", "pubmed", "scholar"])
+            meta["skipped"] = skipped
+            degraded = bool(skipped)
+            search_tasks = {
+                source_name: self._upstream_clients()[source_name].search(query, per_source_limit)
+                for source_name in available
+            }
+            task_results = await asyncio.gather(*search_tasks.values(), return_exceptions=True)
+            for source_name, result_or_exc in zip(search_tasks.keys(), task_results):
+                if isinstance(result_or_exc, Exception):
+                    logger.warning("Search API Warning (%s): %s", source_name, result_or_exc)
+                    degraded = True
+                    continue
+                degraded = degraded or getattr(result_or_exc, "partial", False)
+                results.extend(result_or_exc)
+            meta["degraded"] = degraded
+        elif source == "auto" and settings.search_auto_strategy == "hedged":
+            results, meta = await self._search_auto_hedged(query, limit)
+        elif source == "auto":
+            domain, preferred_order = self._plan_auto_sources(query)
+            available, skipped = self._split_by_breaker(preferred_order)
+            meta.update(strategy="sequential", domain=domain, order=preferred_order, skipped=skipped)
+            # 障害中のソースは補完にも使わない
+            used_sources: set[str] = set(skipped)
+            degraded = bool(skipped)
+            for source_name in available:
+                used_sources.add(source_name)
+                part_results, completed = await self._try_search(source_name, query, limit)
+                if completed:
+                    self._record_source_yield(domain, preferred_order, source_name, len(part_results), limit)
+                degraded = degraded or not completed
+                results.extend(part_results)
+
+                # 1次のソースで十分結果が出ている場合はそれを採用
+                if len(results) >= limit:
+                    break
+
+            # 足りなければ残りのソースで補完
+            for fallback_source in ("arxiv", "pubmed", "scholar"):
+                if len(results) >= limit:
+                    break
+                if fallback_source in used_sources:
+                    continue
+                part_results, completed = await self._try_search(fallback_source, query, limit - len(results))
+                degraded = degraded or not completed
+                results.extend(part_results)
+            meta["degraded"] = degraded
+
+        elif source == "local":
+            results = await self._safe_search("local", query, limit)
+        elif source == "arxiv":
+            results = await self._safe_search("arxiv", query, limit)
+        elif source == "pubmed":
+            results = await self._safe_search("pubmed", query, limit)
+        elif source == "scholar":
+            results = await self._safe_search("scholar", query, limit)
+        elif source == "gemini":
+            # Gemini logic (Legacy/Fallback)
+            raw_data = await self._safe_search("gemini", query, limit)
+            if isinstance(raw_data, list):
+                raw_data = {"data": raw_data}
+            for p in raw_data.get("data", []):
+                results.append(SearchResult(
+                    title=p.get("title", ""),
+                    authors=[a.get("name") for a in p.get("authors", [])],
+                    year=p.get("year"),
+                    venue=p.get("venue", ""),
+                    abstract=p.get("abstract", ""),
+                    external_ids=p.get("externalIds", {}),
+                    pdf_url=p.get("openAccessPdf", {}).get("url") if p.get("openAccessPdf") else None,
+                    source="gemini"
+                ))
+        else:
+            # Default fallback: auto
+            results = await self._safe_search("arxiv", query, limit)
+
+        if source != "local":
+            await self.catalog.add_results(results)
+        if source == "auto" and settings.search_local_first:
+            # ローカルの結果を先頭に置き、重複時はカタログ側（補完済み）を代表にする
+            results = local_results + results
+            meta["local_hits"] = len(local_results)
+
+        return results, meta
+
+    async def _search_auto_hedged(
+        self,
+        query: str,
+        limit: int,
+    ) -> tuple[list[SearchResult], dict]:
+        """
+        auto モードのヘッジ付き並列検索。
+        - 優先ソースを即時起動
+        - ヘッジ遅延経過、または優先ソースが limit 未満で返った時点で残りのソースも起動
+        - 重複除去後に limit 件そろったら未完了のタスクをキャンセル
+        """
+        domain, preferred_order = self._plan_auto_sources(query)
+        launch_order, skipped = self._split_by_breaker(preferred_order)
+        started_at = time.perf_counter()
+        tasks: dict[asyncio.Task, str] = {}
+        source_meta: dict[str, dict] = {
+            name: {"status": "not_started", "returned": 0, "added": 0}
+            for name in preferred_order
+        }
+        for name in skipped:
+            source_meta[name]["status"] = "circuit_open"
+
+        def launch(source_name: str) -> None:
+            task = asyncio.create_task(self._try_search(source_name, query, limit))
+            tasks[task] = source_name
+            source_meta[source_name].update(
+                status="running",
+                started_ms=int((time.perf_counter() - started_at) * 1000),
+            )
+
+        if launch_order:
+            launch(launch_order[0])
+        secondaries_started = False
+        pending: set[asyncio.Task] = set(tasks)
+        results: list[SearchResult] = []
+        seen: set[str] = set()
+
+        try:
+            while pending:
+                timeout = None
+                if not secondaries_started:
+                    elapsed = time.perf_counter() - started_at
+                    timeout = max(0.0, settings.search_hedge_delay - elapsed)
+
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+
+                for task in done:
+                    source_name = tasks[task]
+                    if task.cancelled():
+                        source_meta[source_name]["status"] = "cancelled"
+                        continue
+                    part_results, completed = task.result()
+                    if completed:
+                        self._record_source_yield(domain, preferred_order, source_name, len(part_results), limit)
+                    source_meta[source_name].update(
+                        status="ok" if completed else "error",
+                        returned=len(part_results),
+                        latency_ms=int((time.perf_counter() - started_at) * 1000),
+                    )
+                    for r in part_results:
+                        key = self._dedupe_key(r)
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                        results.append(r)
+                        source_meta[source_name]["added"] += 1
+
+                if len(results) >= limit:
+                    break
+
+                # ヘッジ遅延経過 or 優先ソースの結果不足 → 残りのソースを起動
+                if not secondaries_started:
+                    secondaries_started = True
+                    for source_name in launch_order[1:]:
+                        launch(source_name)
+                    pending = {task for task in tasks if not task.done()}
+        finally:
+            for task in pending:
+                task.cancel()
+                source_meta[tasks[task]]["status"] = "cancelled"
+
+        return results, {
+            "strategy": "hedged",
+            "hedge_delay_ms": int(settings.search_hedge_delay * 1000),
+            "domain": domain,
+            "order": preferred_order,
+            "sources": source_meta,
+            # 失敗・スキップ・部分結果のソースがあれば統合キャッシュに短い TTL で入れる
+            "degraded": any(state["status"] in {"circuit_open", "error"} for state in source_meta.values()),
+        }
+
+    def _upstream_clients(self) -> dict[str, BaseSearchClient]:
+        return {"arxiv": self.arxiv, "pubmed": self.pubmed, "scholar": self.scholar}
+
+    def _split_by_breaker(self, sources: list[str]) -> tuple[list[str], list[str]]:
+        """サーキットブレーカーが呼び出しを許すソースと、障害中でスキップするソースに分ける"""
+        clients = self._upstream_clients()
+        available: list[str] = []
+        skipped: list[str] = []
+        for source_name in sources:
+            client = clients.get(source_name)
+            if client is None or client.circuit_breaker.allows_request():
+                available.append(source_name)
+            else:
+                skipped.append(source_name)
+        return available, skipped
+
     async def _safe_search(
         self,
         source: str,
         query: str,
         limit: int,
     ) -> list[SearchResult] | dict:
+        results, _ = await self._try_search(source, query, limit)
+        return results
+
+    async def _try_search(
+        self,
+        source: str,
+        query: str,
+        limit: int,
+    ) -> tuple[list[SearchResult] | dict, bool]:
+        """
+        (結果, 正常に完了したか) を返す。
+        例外・ブレーカー拒否・期限切れの部分結果は False（ソース別の歩留まりに記録しない）。
+        """
         try:
-            if source == "arxiv":
-                return await self.arxiv.search(query, limit)
-            if source == "pubmed":
-                return await self.pubmed.search(query, limit)
-            if source == "scholar":
-                return await self.scholar.search(query, limit)
-            if source == "gemini":
-                return await self.gemini.search_papers(query, limit=limit)
-
-            return []
+            if source == "local":
+                results = await self.catalog.search(query, limit)
+            elif source == "arxiv":
+                results = await self.arxiv.search(query, limit)
+            elif source == "pubmed":
+                results = await self.pubmed.search(query, limit)
+            elif source == "scholar":
+                results = await self.scholar.search(query, limit)
+            elif source == "gemini":
+                results = await self.gemini.search_papers(query, limit=limit)
+            else:
+                results = []
         except Exception as exc:
             logger.warning("Search API Warning (%s): %s", source, exc)
-            return []
+            return [], False
+        return results, not getattr(results, "partial", False)
 
     async def search_papers_reclustered(
         self,
@@ -222,6 +510,7 @@ class SearchService:
         top_k: int = 60,
         group_target: int = 4,
         include_related: bool = True,
+        engine: str = "llm",
         uid: str | None = None,
     ) -> ReclusterSearchResponse:
         base = await self.search_papers(
@@ -236,6 +525,27 @@ class SearchService:
             results=base.results,
             group_target=group_target,
             include_related=include_related,
+            engine=engine,
+        )
+
+    def get_diagnostics(self) -> SearchDiagnosticsResponse:
+        return SearchDiagnosticsResponse(
+            cache=search_cache.stats(),
+            singleflight=search_singleflight.stats(),
+            rate_limits={
+                "arxiv": self.arxiv.rate_limit_stats(),
+                "pubmed": self.pubmed.rate_limit_stats(),
+                "scholar": self.scholar.rate_limit_stats(),
+            },
+            scholar=self.scholar.stats(),
+            source_yields=self.source_yields.stats(),
+            local_catalog=self.catalog.stats(),
+            citations=self.citations.stats(),
+            embedding=embedding_service.stats(),
+            circuit_breakers={
+                source_name: client.circuit_breaker.stats()
+                for source_name, client in self._upstream_clients().items()
+            },
         )
 
     def _infer_sources_by_domain(self, query: str) -> list[str]:
@@ -244,34 +554,25 @@ class SearchService:
         - Bio/medicine: PubMed first
         - CS/math/physics: ArXiv first
         - others: Scholar first as general fallback
+        The default order is then adjusted by observed per-domain source yields.
         """
-        normalized = query.lower()
-        tokens = set(re.findall(r"[a-z]+", normalized))
-        scores: dict[str, int] = {}
-
-        for domain, data in self._domain_profiles.items():
-            score = 0
-            for phrase in data["phrases"]:
-                if phrase in normalized:
-                    score += 2
-            for token in data["single"]:
-                if token in tokens:
-                    score += 1
-            scores[domain] = score
+        return self._plan_auto_sources(query)[1]
 
-        ordered = sorted(scores.items(), key=lambda pair: pair[1], reverse=True)
-        top_domain, top_score = ordered[0]
+    def _plan_auto_sources(self, query: str) -> tuple[str, list[str]]:
+        domain = self.domain_classifier.classify(query)
+        return domain, self.source_yields.order(domain, DEFAULT_SOURCE_ORDERS[domain])
 
-        if top_score == 0:
-            return ["scholar", "arxiv", "pubmed"]
-
-        if top_domain == "pubmed":
-            return ["pubmed", "arxiv", "scholar"]
-
-        if top_domain in {"cs", "math", "physics"}:
-            return ["arxiv", "scholar", "pubmed"]
-
-        return ["scholar", "arxiv", "pubmed"]
+    def _record_source_yield(
+        self,
+        domain: str,
+        order: list[str],
+        source: str,
+        returned: int,
+        limit: int,
+    ) -> None:
+        self.source_yields.record(domain, source, returned, limit)
+        if order and source == order[0]:
+            self.source_yields.record_first_choice(domain, returned >= limit)
 
     def _convert_to_item(self, result: SearchResult, liked_ids: set[str] | None = None) -> SearchResultItem:
         # ID handling
@@ -286,7 +587,9 @@ class SearchService:
             paper_id = f"pubmed:{result.external_ids['PubMed']}"
             
         if not paper_id:
-            paper_id = str(uuid.uuid4())
+            # 外部IDの無い結果（Scholar など）はタイトル+年から決まる ID にする。
+            # 同じ結果に毎回同じ ID を振り、再整理キャッシュのキーや画面上の参照を安定させる
+            paper_id = str(uuid.uuid5(uuid.NAMESPACE_URL, self._dedupe_key(result)))
 
         # ライブラリに含まれているか判定
         is_in_library = paper_id in liked_ids if liked_ids else False
@@ -302,7 +605,7 @@ class SearchService:
             doi=result.external_ids.get("DOI"),
             arxiv_id=result.external_ids.get("ArXiv"),
             pdf_url=result.pdf_url,
-            citation_count=0,
+            citation_count=None,  # CitationEnricher が一括で埋める
             is_in_library=is_in_library
         )
 
@@ -333,47 +636,64 @@ class SearchService:
         overlap_ratio = len(query_tokens & title_tokens) / len(query_tokens)
         return int(overlap_ratio * 1000)
 
+    def _dedupe_key(self, result: SearchResult) -> str:
+        """外部ID優先の重複判定キー（なければ タイトル+年）"""
+        arxiv_id = result.external_ids.get("ArXiv")
+        doi = result.external_ids.get("DOI")
+        pubmed_id = result.external_ids.get("PubMed")
+
+        if arxiv_id:
+            return f"arxiv:{arxiv_id}".lower()
+        if doi:
+            return f"doi:{doi}".lower()
+        if pubmed_id:
+            return f"pubmed:{pubmed_id}".lower()
+        return f"title:{result.title.strip().lower()}:{result.year or 0}"
+
     def _dedupe_and_rank_results(
         self,
         results: list[SearchResult],
         query: str,
+        rank_mode: str = "title",
     ) -> list[SearchResult]:
         """
         Duplicate result 제거 및 정렬:
         - 외부ID 우선 dedupe, fallback는 제목+연도로 처리
+        - 近似重複（タイトル MinHash + 第一著者）を統合してメタデータを補完
         - タイトル一致スコア + 연도 + 제목 알파벳 순
+        - rank_mode="bm25" の場合は BM25 スコアを最優先キーにする
         """
         seen: set[str] = set()
-        deduped: list[tuple[SearchResult, int, int, str]] = []
+        unique: list[SearchResult] = []
 
         for r in results:
-            normalized = ""
-            arxiv_id = r.external_ids.get("ArXiv")
-            doi = r.external_ids.get("DOI")
-            pubmed_id = r.external_ids.get("PubMed")
-
-            if arxiv_id:
-                normalized = f"arxiv:{arxiv_id}".lower()
-            elif doi:
-                normalized = f"doi:{doi}".lower()
-            elif pubmed_id:
-                normalized = f"pubmed:{pubmed_id}".lower()
-            else:
-                normalized = f"title:{r.title.strip().lower()}:{r.year or 0}"
+            normalized = self._dedupe_key(r)
 
             if normalized and normalized not in seen:
                 seen.add(normalized)
-                deduped.append(
-                    (
-                        r,
-                        self._title_match_score(r.title, query),
-                        r.year or 0,
-                        r.title.lower(),
-                    )
-                )
-
-        deduped.sort(key=lambda item: (item[1], item[2], item[3]), reverse=True)
-        return [r for r, _score, _year, _title in deduped]
+                unique.append(r)
+
+        if settings.search_fuzzy_dedupe and len(unique) > 1:
+            unique, _merged = self.near_duplicates.merge(unique)
+
+        if rank_mode == "bm25":
+            relevance = self.bm25.score(query, unique).tolist()
+        else:
+            relevance = [0.0] * len(unique)
+
+        deduped: list[tuple[SearchResult, float, int, int, str]] = [
+            (
+                r,
+                relevance[i],
+                self._title_match_score(r.title, query),
+                r.year or 0,
+                r.title.lower(),
+            )
+            for i, r in enumerate(unique)
+        ]
+
+        deduped.sort(key=lambda item: (item[1], item[2], item[3], item[4]), reverse=True)
+        return [r for r, _relevance, _score, _year, _title in deduped]
 
 
 search_service = SearchService()
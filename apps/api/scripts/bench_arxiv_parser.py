@@ -0,0 +1,128 @@
+"""
+arXiv Atom パーサーのベンチマーク
+
+10 / 100 / 1000 件のフィードに対して、従来の ElementTree 全体構築 + find 方式と
+XMLPullParser による逐次パース方式のスループットとピークメモリを比較する。
+フィードは `--feed` で実レスポンスを指定するか、スタブの1件を複製して生成する。
+
+    python scripts/bench_arxiv_parser.py --repeat 20
+    python scripts/bench_arxiv_parser.py --feed recorded_arxiv.xml
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../"))
+
+from app.core.search.arxiv import ArxivClient
+from app.core.search.base import SearchResult
+from scripts.stub_server import ARXIV_FEED
+
+_ENTRY_RE = re.compile(r"<entry>.*?</entry>", re.S)
+
+
+def _build_feed(template: str, size: int) -> bytes:
+    """テンプレートの entry を複製して size 件のフィードを作る"""
+    entries = _ENTRY_RE.findall(template)
+    head = template[: template.index("<entry>")]
+    tail = template[template.rindex("</entry>") + len("</entry>"):]
+    body = []
+    for i in range(size):
+        entry = entries[i % len(entries)]
+        # 重複除去で潰れないよう ID をずらす
+        body.append(entry.replace("</id>", f"-{i}</id>", 1))
+    return (head + "".join(body) + tail).encode("utf-8")
+
+
+def _parse_with_tree(xml_data: bytes) -> list[SearchResult]:
+    """従来実装（ET.fromstring + 名前空間付き find）"""
+    root = ET.fromstring(xml_data)
+    ns = {"atom": "http://www.w3.org/2005/Atom", "arxiv": "http://arxiv.org/schemas/atom"}
+    results = []
+    for entry in root.findall("atom:entry", ns):
+        title = entry.find("atom:title", ns).text.strip().replace("\n", " ")
+        authors = [a.find("atom:name", ns).text for a in entry.findall("atom:author", ns)]
+        published = entry.find("atom:published", ns).text
+        summary = entry.find("atom:summary", ns).text.strip().replace("\n", " ")
+        pdf_url = None
+        doi = None
+        for link in entry.findall("atom:link", ns):
+            if link.attrib.get("title") == "pdf":
+                pdf_url = link.attrib.get("href")
+            if link.attrib.get("title") == "doi":
+                doi = link.attrib.get("href").replace("http://dx.doi.org/", "")
+        arxiv_id = entry.find("atom:id", ns).text.split("/abs/")[-1]
+        external_ids = {"ArXiv": arxiv_id}
+        if doi:
+            external_ids["DOI"] = doi
+        primary_category = entry.find("arxiv:primary_category", ns)
+        venue = f"arXiv:{primary_category.attrib['term']}" if primary_category is not None else "arXiv"
+        results.append(SearchResult(
+            title=title,
+            authors=authors,
+            year=int(published[:4]) if published else None,
+            venue=venue,
+            abstract=summary,
+            external_ids=external_ids,
+            pdf_url=pdf_url,
+            source="arxiv",
+        ))
+    return results
+
+
+def _throughput(parse, xml_data: bytes, repeat: int) -> tuple[float, int]:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        count = len(list(parse(xml_data)))
+    return count * repeat / (time.perf_counter() - started), count
+
+
+def _peak_kib(consume) -> float:
+    tracemalloc.start()
+    consume()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def _drain(iterator) -> None:
+    for _ in iterator:
+        pass
+
+
+def main(repeat: int, sizes: list[int], feed_path: str | None):
+    template = ARXIV_FEED
+    if feed_path:
+        with open(feed_path, encoding="utf-8") as f:
+            template = f.read()
+
+    client = ArxivClient()
+    print(f"{'entries':>8} {'parser':<6} {'entries/s':>12} {'peak KiB (list)':>16} {'peak KiB (lazy)':>16}")
+    for size in sizes:
+        xml_data = _build_feed(template, size)
+
+        throughput, count = _throughput(_parse_with_tree, xml_data, repeat)
+        assert count == size
+        peak = _peak_kib(lambda: _parse_with_tree(xml_data))
+        print(f"{size:>8} {'tree':<6} {throughput:>12.0f} {peak:>16.1f} {'-':>16}")
+
+        throughput, count = _throughput(client._iter_entries, xml_data, repeat)
+        assert count == size
+        peak = _peak_kib(lambda: client._parse_response(xml_data))
+        # 結果を保持せずに消費した場合（ストリーム処理時）のピーク
+        lazy_peak = _peak_kib(lambda: _drain(client._iter_entries(xml_data)))
+        print(f"{size:>8} {'iter':<6} {throughput:>12.0f} {peak:>16.1f} {lazy_peak:>16.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--feed", help="記録済み arXiv API レスポンス（Atom XML）")
+    args = parser.parse_args()
+    main(args.repeat, args.sizes, args.feed)
@@ -0,0 +1,118 @@
+"""
+近似重複統合のベンチマーク
+
+同じ論文をソース違い・表記揺れ（大文字小文字、記号、サブタイトル欠落、著者表記）で
+複製した合成データに対し、MinHash/LSH 版と全ペア比較（正確な Jaccard）版の
+所要時間と検出精度を比較する。
+
+    python scripts/bench_dedupe.py --sizes 100 300 1000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../"))
+
+from app.core.search import SearchResult
+from app.modules.search.dedupe import NearDuplicateDetector
+
+_WORDS = (
+    "graph neural network attention transformer protein structure quantum learning "
+    "diffusion model retrieval language clinical trial bayesian inference sparse "
+    "efficient scalable robust adversarial federated contrastive representation "
+    "molecular dynamics reinforcement policy optimization convex stochastic gradient"
+).split()
+
+
+def _variant(title: str, rng: random.Random) -> str:
+    choice = rng.randrange(4)
+    if choice == 0:
+        return title.upper()
+    if choice == 1:
+        return title.replace(" ", " - ", 1) + "."
+    if choice == 2 and ":" in title:
+        return title.split(":")[0]
+    return title.lower() + " (preprint)"
+
+
+def _build_results(size: int, seed: int = 7) -> tuple[list[SearchResult], set[tuple[int, int]]]:
+    """約3割を別ソースの重複とした size 件の結果と、正解の重複ペア集合"""
+    rng = random.Random(seed)
+    results: list[SearchResult] = []
+    origin: list[int] = []
+    papers = max(1, int(size * 0.7))
+    for paper in range(papers):
+        words = rng.sample(_WORDS, 6)
+        title = " ".join(words[:4]).title() + ": " + " ".join(words[4:])
+        surname = f"Author{paper}"
+        results.append(SearchResult(
+            title=title, authors=[f"Alex {surname}"], year=2015 + paper % 10,
+            external_ids={"ArXiv": f"{paper:04d}.00001"}, source="arxiv",
+        ))
+        origin.append(paper)
+    while len(results) < size:
+        paper = rng.randrange(papers)
+        base = results[paper]
+        results.append(SearchResult(
+            title=_variant(base.title, rng), authors=[f"{base.authors[0].split()[-1]} A"],
+            year=base.year, abstract="longer abstract " * 5, source="scholar",
+        ))
+        origin.append(paper)
+    truth = {
+        (i, j)
+        for i in range(size) for j in range(i + 1, size)
+        if origin[i] == origin[j]
+    }
+    return results, truth
+
+
+def _pairs(groups: list[list[int]]) -> set[tuple[int, int]]:
+    return {(group[a], group[b]) for group in groups for a in range(len(group)) for b in range(a + 1, len(group))}
+
+
+def _exact_groups(detector: NearDuplicateDetector, results: list[SearchResult]) -> list[list[int]]:
+    """全ペアの正確な Jaccard（O(n^2)）による比較対象"""
+    shingles = [detector._shingles(detector.normalize_title(r.title)) for r in results]
+    parent = list(range(len(results)))
+
+    def find(i):
+        while parent[i] != i:
+            i = parent[i]
+        return i
+
+    for i in range(len(results)):
+        for j in range(i + 1, len(results)):
+            union = shingles[i] | shingles[j]
+            if not union:
+                continue
+            if len(shingles[i] & shingles[j]) / len(union) >= detector.threshold and detector._compatible(results[i], results[j]):
+                parent[find(j)] = find(i)
+    groups: dict[int, list[int]] = {}
+    for i in range(len(results)):
+        groups.setdefault(find(i), []).append(i)
+    return list(groups.values())
+
+
+def main(sizes: list[int]):
+    detector = NearDuplicateDetector()
+    print(f"{'size':>6} {'method':<8} {'ms':>9} {'precision':>10} {'recall':>8}")
+    for size in sizes:
+        results, truth = _build_results(size)
+        for label, run in (("minhash", detector.find_groups), ("pairwise", lambda rs: _exact_groups(detector, rs))):
+            started = time.perf_counter()
+            groups = run(results)
+            elapsed = (time.perf_counter() - started) * 1000
+            found = _pairs(groups)
+            precision = len(found & truth) / len(found) if found else 1.0
+            recall = len(found & truth) / len(truth) if truth else 1.0
+            print(f"{size:>6} {label:<8} {elapsed:>9.1f} {precision:>10.3f} {recall:>8.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 100, 300, 1000])
+    args = parser.parse_args()
+    main(args.sizes)
@@ -0,0 +1,100 @@
+"""
+ドメイン判定のベンチマーク
+
+クエリコーパスに対して、従来の逐次部分一致（フレーズごとの `in` 走査 + 単語集合）と
+`DomainClassifier`（結合正規表現 + 単語辞書）の判定結果の一致とスループットを比較する。
+`--live` を付けると実APIで auto 検索を行い、第1候補ソースだけで limit を満たせた割合を出す。
+
+    python scripts/bench_domain_classifier.py --repeat 200
+    python scripts/bench_domain_classifier.py --live --limit 10
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../"))
+
+from app.modules.search.domain import DOMAIN_PROFILES, DomainClassifier
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "data", "search_queries.txt")
+
+
+def _load_corpus(path: str) -> list[str]:
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def _classify_legacy(query: str) -> str:
+    """従来実装（SearchService._infer_sources_by_domain の採点部分）"""
+    normalized = query.lower()
+    tokens = set(re.findall(r"[a-z]+", normalized))
+    scores: dict[str, int] = {}
+    for domain, data in DOMAIN_PROFILES.items():
+        score = 0
+        for phrase in data["phrases"]:
+            if phrase in normalized:
+                score += 2
+        for token in data["single"]:
+            if token in tokens:
+                score += 1
+        scores[domain] = score
+    top_domain, top_score = sorted(scores.items(), key=lambda pair: pair[1], reverse=True)[0]
+    return top_domain if top_score else "general"
+
+
+def _throughput(classify, queries: list[str], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            classify(query)
+    return len(queries) * repeat / (time.perf_counter() - started)
+
+
+async def _live_report(queries: list[str], limit: int) -> None:
+    from app.modules.search.service import search_service
+
+    for query in queries:
+        _, meta = await search_service._fetch_results(query, limit, "auto")
+        print(f"{meta.get('domain', '-'):<8} {meta.get('order', [])} {query}")
+    stats = search_service.source_yields.stats()
+    first = stats["first_choice"]
+    print(f"\nfirst-choice satisfied limit={limit}: {first['satisfied']}/{first['searches']} ({first['rate']:.1%})")
+    for domain, counter in stats["first_choice_by_domain"].items():
+        print(f"  {domain:<8} {counter['satisfied']}/{counter['searches']} ({counter['rate']:.1%})")
+
+
+def main(corpus: str, repeat: int, live: bool, limit: int) -> None:
+    queries = _load_corpus(corpus)
+    classifier = DomainClassifier()
+
+    mismatches = [q for q in queries if _classify_legacy(q) != classifier.classify(q)]
+    distribution: dict[str, int] = {}
+    for query in queries:
+        domain = classifier.classify(query)
+        distribution[domain] = distribution.get(domain, 0) + 1
+
+    legacy = _throughput(_classify_legacy, queries, repeat)
+    compiled = _throughput(classifier.classify, queries, repeat)
+    print(f"queries: {len(queries)}  domains: {distribution}")
+    print(f"agreement with legacy: {len(queries) - len(mismatches)}/{len(queries)}")
+    for query in mismatches:
+        print(f"  mismatch: {query!r} legacy={_classify_legacy(query)} new={classifier.classify(query)}")
+    print(f"legacy   {legacy:>10.0f} queries/s ({1e6 / legacy:.1f}us/query)")
+    print(f"compiled {compiled:>10.0f} queries/s ({1e6 / compiled:.1f}us/query)  x{compiled / legacy:.1f}")
+
+    if live:
+        asyncio.run(_live_report(queries, limit))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--live", action="store_true", help="実APIで auto 検索し第1候補の充足率を出す")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+    main(args.corpus, args.repeat, args.live, args.limit)
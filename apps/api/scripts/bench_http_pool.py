@@ -0,0 +1,79 @@
+"""
+HTTP接続プールのベンチマーク
+
+ローカルのスタブサーバーに対して、PubMed の esearch→esummary/efetch 検索を
+「呼び出し毎に AsyncClient を生成（従来）」と「共有プール」で比較する。
+
+    python scripts/bench_http_pool.py --iterations 200 --handshake-ms 20
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../"))
+
+import httpx
+
+from app.core.http import HttpClientPool
+from app.core.search.pubmed import PubmedClient
+from app.core.search.ratelimit import TokenBucketLimiter
+from scripts.stub_server import StubServer
+
+
+async def _fresh_client_search(base_url: str) -> None:
+    # 従来実装相当: リクエスト毎に新しい AsyncClient を生成する
+    async with httpx.AsyncClient() as client:
+        response = await client.get(f"{base_url}/esearch.fcgi", params={"term": "stub"})
+        response.raise_for_status()
+    async with httpx.AsyncClient() as client:
+        response = await client.get(f"{base_url}/esummary.fcgi", params={"id": "31452104"})
+        response.raise_for_status()
+    async with httpx.AsyncClient() as client:
+        response = await client.get(f"{base_url}/efetch.fcgi", params={"id": "31452104"})
+        response.raise_for_status()
+
+
+async def _measure(label: str, iterations: int, call) -> list[float]:
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await call()
+        latencies.append((time.perf_counter() - started) * 1000)
+    p50 = statistics.median(latencies)
+    p95 = sorted(latencies)[int(len(latencies) * 0.95) - 1]
+    print(f"{label:<12} mean={statistics.mean(latencies):7.2f}ms p50={p50:7.2f}ms p95={p95:7.2f}ms")
+    return latencies
+
+
+async def main(iterations: int, handshake_ms: float):
+    with StubServer(handshake_delay=handshake_ms / 1000) as stub:
+        base_url = f"{stub.base_url}/entrez/eutils"
+
+        pool = HttpClientPool()
+        client = PubmedClient(http_pool=pool)
+        # レート制御とキャッシュを外して接続コストだけを比較する
+        client._rate_limiter = TokenBucketLimiter(rate=1e9, burst=1000)
+        client._abstract_cache.max_entries = 0
+        client.BASE_URL_SEARCH = f"{base_url}/esearch.fcgi"
+        client.BASE_URL_SUMMARY = f"{base_url}/esummary.fcgi"
+        client.BASE_URL_FETCH = f"{base_url}/efetch.fcgi"
+
+        print(f"--- PubMed search x{iterations} (handshake {handshake_ms}ms) ---")
+        fresh = await _measure("fresh", iterations, lambda: _fresh_client_search(base_url))
+        pooled = await _measure("pooled", iterations, lambda: client._search("stub", 1))
+        await pool.aclose()
+
+        saved = statistics.mean(fresh) - statistics.mean(pooled)
+        print(f"latency drop: {saved:.2f}ms/search ({saved / statistics.mean(fresh) * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--handshake-ms", type=float, default=10.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.handshake_ms))
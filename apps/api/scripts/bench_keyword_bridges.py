@@ -0,0 +1,195 @@
+"""
+キーワードブリッジ（グラフのキーワード共通エッジ）構築のベンチマーク
+
+従来（全ペアのフレーズ集合積）と、現行（フレーズ → 論文の転置インデックス + 疎なカウンタ）を、
+合成ライブラリ（既定: 100 / 1,000 / 10,000 件）で比べる。Firestore は使わない。
+- project: get_project_graph のプロジェクト内ペア（i < j）
+- global: get_global_graph の owned × related（--related-ratio が related の割合）
+- overlap: project の共通フレーズ数の集計だけ（Edge の生成を含まない）。visited は集合積 / 転置リストで訪れたペア数
+
+Edge（pydantic）の生成はどちらも同じで出力エッジ数に比例するため、エッジが多いと差は縮む。
+
+フレーズは語彙（論文数 × --vocab-per-paper 種類）から Zipf 分布で選ぶ。よく出るフレーズほど多くのペアを作る。
+
+    python scripts/bench_keyword_bridges.py --size 100 --size 1000 --size 10000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../"))
+
+from app.modules.related.keyword_index import PhraseIndex
+from app.modules.related.schemas import Edge
+from app.modules.related.service import RelatedService
+
+
+def _library(rng: random.Random, size: int, args) -> dict[str, dict]:
+    vocabulary = [f"phrase {i}" for i in range(max(50, size * args.vocab_per_paper))]
+    weights = [1 / (rank + 1) ** args.zipf for rank in range(len(vocabulary))]
+    papers = {}
+    for i in range(size):
+        phrases = rng.choices(vocabulary, weights=weights, k=args.phrases)
+        split = len(phrases) * 2 // 3
+        papers[f"p{i}"] = {"keywords": phrases[:split], "prerequisiteKeywords": phrases[split:]}
+    return papers
+
+
+def legacy_project_edges(service: RelatedService, existing_ids, paper_data_map, edge_set, edges) -> int:
+    """変更前の get_project_graph（全ペアの集合積）"""
+    phrase_map = {pid: service._extract_keyword_phrases(data) for pid, data in paper_data_map.items()}
+    count = 0
+    for i in range(len(existing_ids)):
+        source_id = existing_ids[i]
+        source_phrases = phrase_map.get(source_id, set())
+        if not source_phrases:
+            continue
+        for j in range(i + 1, len(existing_ids)):
+            target_id = existing_ids[j]
+            target_phrases = phrase_map.get(target_id, set())
+            if not target_phrases:
+                continue
+            overlap_count = len(source_phrases & target_phrases)
+            if overlap_count <= 0:
+                continue
+            edge_key = tuple(sorted((source_id, target_id)))
+            if edge_key in edge_set:
+                continue
+            edges.append(Edge(source=source_id, target=target_id, value=service._keyword_bridge_score(overlap_count)))
+            edge_set.add(edge_key)
+            count += 1
+    return count
+
+
+def legacy_global_edges(service: RelatedService, existing_paper_ids, project_paper_ids, paper_data_map, edge_set, edges) -> int:
+    """変更前の _add_keyword_bridge_edges（owned × related の集合積）"""
+    phrase_map = {pid: service._extract_keyword_phrases(data) for pid, data in paper_data_map.items()}
+    owned_ids = [pid for pid in existing_paper_ids if pid not in project_paper_ids]
+    related_ids = [pid for pid in existing_paper_ids if pid in project_paper_ids]
+    count = 0
+    for source_id in owned_ids:
+        source_phrases = phrase_map.get(source_id, set())
+        if not source_phrases:
+            continue
+        ranked_targets = []
+        for target_id in related_ids:
+            if source_id == target_id:
+                continue
+            target_phrases = phrase_map.get(target_id, set())
+            if not target_phrases:
+                continue
+            overlap_count = len(source_phrases & target_phrases)
+            if overlap_count <= 0:
+                continue
+            ranked_targets.append((target_id, overlap_count))
+        ranked_targets.sort(key=lambda item: -item[1])
+        for target_id, overlap_count in ranked_targets[: service.keyword_bridge_max_edges_per_node]:
+            edge_key = tuple(sorted((source_id, target_id)))
+            if edge_key in edge_set:
+                continue
+            edges.append(Edge(source=source_id, target=target_id, value=service._keyword_bridge_score(overlap_count)))
+            edge_set.add(edge_key)
+            count += 1
+    return count
+
+
+def legacy_overlaps(phrase_map: dict[str, set[str]], ids: list[str]) -> tuple[dict, int]:
+    counts, visited = {}, 0
+    for i in range(len(ids)):
+        source = phrase_map[ids[i]]
+        for j in range(i + 1, len(ids)):
+            visited += 1
+            overlap = len(source & phrase_map[ids[j]])
+            if overlap:
+                counts[(i, j)] = overlap
+    return counts, visited
+
+
+def index_overlaps(phrase_map: dict[str, set[str]], ids: list[str]) -> tuple[dict, int]:
+    index = PhraseIndex(ids, phrase_map)
+    counts, visited = {}, 0
+    for i, paper_id in enumerate(ids):
+        overlaps = index.overlaps(phrase_map[paper_id], after=i)
+        visited += sum(overlaps.values())
+        counts.update(((i, j), overlap) for j, overlap in overlaps.items())
+    return counts, visited
+
+
+def _run(build) -> tuple[float, list[Edge]]:
+    edges: list[Edge] = []
+    started = time.perf_counter()
+    build(set(), edges)
+    return (time.perf_counter() - started) * 1000, edges
+
+
+def main(args):
+    service = RelatedService()
+    overlap_rows = []
+    print(f"{'papers':>7} {'graph':>7} {'pairs':>11} {'edges':>9} {'before ms':>10} {'after ms':>9} {'speedup':>8} {'same':>5}")
+    for size in args.size:
+        rng = random.Random(size)
+        papers = _library(rng, size, args)
+        ids = list(papers)
+        project_ids = set(rng.sample(ids, max(1, int(size * args.related_ratio))))
+        owned = size - len(project_ids)
+
+        cases = {
+            "project": (
+                size * (size - 1) // 2,
+                lambda es, e: legacy_project_edges(service, ids, papers, es, e),
+                lambda es, e: service._add_project_keyword_edges(ids, papers, es, e),
+            ),
+            "global": (
+                owned * len(project_ids),
+                lambda es, e: legacy_global_edges(service, ids, project_ids, papers, es, e),
+                lambda es, e: service._add_keyword_bridge_edges(ids, project_ids, papers, es, e),
+            ),
+        }
+        phrase_map = {pid: service._extract_keyword_phrases(data) for pid, data in papers.items()}
+        started = time.perf_counter()
+        after_counts, after_visited = index_overlaps(phrase_map, ids)
+        after_ms = (time.perf_counter() - started) * 1000
+        overlap_rows.append((size, after_visited, after_ms, None, None, None))
+        if size * (size - 1) // 2 <= args.max_legacy_pairs:
+            started = time.perf_counter()
+            before_counts, before_visited = legacy_overlaps(phrase_map, ids)
+            before_ms = (time.perf_counter() - started) * 1000
+            overlap_rows[-1] = (size, after_visited, after_ms, before_visited, before_ms, before_counts == after_counts)
+
+        for name, (pairs, before, after) in cases.items():
+            after_ms, after_edges = _run(after)
+            if pairs > args.max_legacy_pairs:
+                print(f"{size:>7} {name:>7} {pairs:>11,} {len(after_edges):>9,} {'-':>10} {after_ms:>9.1f} {'-':>8} {'-':>5}")
+                continue
+            before_ms, before_edges = _run(before)
+            same = [e.model_dump() for e in before_edges] == [e.model_dump() for e in after_edges]
+            print(
+                f"{size:>7} {name:>7} {pairs:>11,} {len(after_edges):>9,} {before_ms:>10.1f} {after_ms:>9.1f} "
+                f"{before_ms / after_ms:>7.1f}x {str(same):>5}"
+            )
+
+    print(f"\n{'papers':>7} {'overlap':>7} {'visited before':>15} {'visited after':>14} {'before ms':>10} {'after ms':>9} {'same':>5}")
+    for size, after_visited, after_ms, before_visited, before_ms, same in overlap_rows:
+        if before_ms is None:
+            print(f"{size:>7} {'':>7} {'-':>15} {after_visited:>14,} {'-':>10} {after_ms:>9.1f} {'-':>5}")
+        else:
+            print(
+                f"{size:>7} {'':>7} {before_visited:>15,} {after_visited:>14,} {before_ms:>10.1f} {after_ms:>9.1f} {str(same):>5}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, action="append")
+    parser.add_argument("--phrases", type=int, default=12)
+    parser.add_argument("--vocab-per-paper", type=int, default=3)
+    parser.add_argument("--zipf", type=float, default=0.5)
+    parser.add_argument("--related-ratio", type=float, default=0.2)
+    # 従来方式はこのペア数を超えると計測しない
+    parser.add_argument("--max-legacy-pairs", type=int, default=60_000_000)
+    args = parser.parse_args()
+    args.size = args.size or [100, 1000, 10000]
+    main(args)
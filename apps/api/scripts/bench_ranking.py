@@ -0,0 +1,74 @@
+"""
+検索結果ランキングのベンチマーク
+
+20 / 60 / 200 件の候補に対して、従来のタイトル一致ランキング（rank_mode=title）と
+BM25（rank_mode=bm25）の `_dedupe_and_rank_results` 全体の所要時間、
+および BM25 スコア計算単体（bm25-only）の所要時間を測る。
+候補はすべて別論文（外部IDが異なる）として生成する。
+
+    python scripts/bench_ranking.py --repeat 200
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../"))
+
+from app.core.search import SearchResult
+from app.modules.search.service import search_service
+
+_WORDS = (
+    "graph neural network attention transformer protein structure quantum learning "
+    "diffusion model retrieval language clinical trial bayesian inference sparse "
+    "efficient scalable robust adversarial federated contrastive representation "
+    "molecular dynamics reinforcement policy optimization convex stochastic gradient "
+    "benchmark dataset evaluation theory analysis method approach framework system"
+).split()
+
+
+def _build_candidates(size: int, seed: int = 11) -> list[SearchResult]:
+    rng = random.Random(seed)
+    return [
+        SearchResult(
+            title=" ".join(rng.choices(_WORDS, k=8)),
+            authors=[f"Author {i}"],
+            year=2010 + i % 15,
+            abstract=" ".join(rng.choices(_WORDS, k=180)),
+            external_ids={"DOI": f"10.0/{i}"},
+            source="arxiv",
+        )
+        for i in range(size)
+    ]
+
+
+def main(repeat: int, sizes: list[int], query: str):
+    print(f"query: {query!r}")
+    print(f"{'candidates':>10} {'mode':<10} {'p50 ms':>8} {'p95 ms':>8}")
+    for size in sizes:
+        candidates = _build_candidates(size)
+        runs = {
+            "title": lambda: search_service._dedupe_and_rank_results(candidates, query, "title"),
+            "bm25": lambda: search_service._dedupe_and_rank_results(candidates, query, "bm25"),
+            "bm25-only": lambda: search_service.bm25.score(query, candidates),
+        }
+        for mode, run in runs.items():
+            latencies = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                run()
+                latencies.append((time.perf_counter() - started) * 1000)
+            p95 = sorted(latencies)[int(len(latencies) * 0.95) - 1]
+            print(f"{size:>10} {mode:<10} {statistics.median(latencies):>8.2f} {p95:>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 60, 200])
+    parser.add_argument("--query", default="graph neural network for molecular dynamics")
+    args = parser.parse_args()
+    main(args.repeat, args.sizes, args.query)
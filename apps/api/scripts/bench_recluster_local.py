@@ -0,0 +1,93 @@
+"""
+ローカル再整理（TF-IDF + k-means）のベンチマーク
+
+4トピックから生成した 20 / 60 / 100 件の検索結果を `LocalClusterEngine` でクラスタリングし、
+所要時間と純度（各クラスタの多数派トピックに属する論文の割合）を測る。
+
+    python scripts/bench_recluster_local.py --repeat 100
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../"))
+
+from app.modules.search.recluster.local import LocalClusterEngine
+from app.modules.search.schemas import SearchResultItem
+
+_TOPICS = {
+    "gnn": "graph neural message passing node edge molecule property prediction",
+    "diffusion": "diffusion denoising score generative image sampling noise schedule",
+    "rl": "reinforcement policy reward agent exploration value actor critic",
+    "nlp": "language transformer token pretraining translation text corpus tokenizer",
+}
+_SHARED = "model learning method approach results performance dataset training evaluation".split()
+
+
+def _build_items(size: int, seed: int = 7) -> tuple[list[SearchResultItem], dict[str, str]]:
+    rng = random.Random(seed)
+    topics = list(_TOPICS)
+    items: list[SearchResultItem] = []
+    truth: dict[str, str] = {}
+    for i in range(size):
+        topic = topics[i % len(topics)]
+        words = _TOPICS[topic].split()
+        paper_id = f"p{i}"
+        truth[paper_id] = topic
+        items.append(
+            SearchResultItem(
+                external_id=paper_id,
+                source="arxiv",
+                title=" ".join(rng.choices(words, k=5) + rng.choices(_SHARED, k=2)),
+                authors=[],
+                year=2015 + i % 10,
+                venue="",
+                abstract=" ".join(rng.choices(words, k=60) + rng.choices(_SHARED, k=60)),
+                doi=None,
+                arxiv_id=None,
+                pdf_url=None,
+                citation_count=None,
+            )
+        )
+    return items, truth
+
+
+def _purity(clusters, truth: dict[str, str]) -> float:
+    total = majority = 0
+    for cluster in clusters:
+        ids = [cluster.hub_paper.paper_id] + [p.paper_id for p in cluster.children + cluster.related]
+        counts = Counter(truth[paper_id] for paper_id in ids)
+        majority += counts.most_common(1)[0][1]
+        total += len(ids)
+    return majority / total if total else 0.0
+
+
+def main(repeat: int, sizes: list[int], group_target: int):
+    engine = LocalClusterEngine()
+    print(f"{'items':>6} {'clusters':>8} {'purity':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for size in sizes:
+        items, truth = _build_items(size)
+        latencies = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            clusters, _ = engine.cluster("machine learning", items, group_target=group_target)
+            latencies.append((time.perf_counter() - started) * 1000)
+        p95 = sorted(latencies)[int(len(latencies) * 0.95) - 1]
+        print(
+            f"{size:>6} {len(clusters):>8} {_purity(clusters, truth):>7.2f} "
+            f"{statistics.median(latencies):>8.2f} {p95:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 60, 100])
+    parser.add_argument("--group-target", type=int, default=4)
+    args = parser.parse_args()
+    main(args.repeat, args.sizes, args.group_target)
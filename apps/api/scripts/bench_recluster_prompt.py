@@ -0,0 +1,87 @@
+"""
+検索再整理プロンプトの圧縮効果
+
+60件（アブストラクト約250語、一部は年・アブストラクト欠損）の候補について、
+圧縮前（全アブストラクト・空欄も出力）と圧縮後の `_build_recluster_prompt` の
+文字数・概算トークン数・組み立て時間を比較する。
+
+    python scripts/bench_recluster_prompt.py --items 60
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../"))
+
+from app.modules.search.recluster.service import ReclusterSearchService, estimate_tokens
+from app.modules.search.schemas import SearchResultItem
+
+_WORDS = (
+    "graph neural network attention transformer protein structure quantum learning "
+    "diffusion model retrieval language clinical trial bayesian inference sparse "
+    "efficient scalable robust adversarial federated contrastive representation"
+).split()
+
+
+def _build_items(size: int, seed: int = 3) -> list[SearchResultItem]:
+    rng = random.Random(seed)
+    return [
+        SearchResultItem(
+            external_id=f"p{i}",
+            source="arxiv",
+            title=" ".join(rng.choices(_WORDS, k=8)),
+            authors=[],
+            year=None if i % 7 == 0 else 2010 + i % 15,
+            venue="",
+            abstract="" if i % 11 == 0 else " ".join(rng.choices(_WORDS, k=250)),
+            doi=None,
+            arxiv_id=None,
+            pdf_url=None,
+            citation_count=None,
+        )
+        for i in range(size)
+    ]
+
+
+def _legacy_payload(items: list[SearchResultItem]) -> str:
+    # 圧縮前の候補JSON（全フィールド・全文アブストラクト）
+    return json.dumps(
+        [
+            {"paper_id": i.external_id, "title": i.title, "year": i.year, "source": i.source, "abstract": i.abstract}
+            for i in items
+        ],
+        ensure_ascii=False,
+    )
+
+
+def main(items_count: int, repeat: int):
+    service = ReclusterSearchService(gemini_client=None)
+    items = _build_items(items_count)
+    compact_prompt = service._build_recluster_prompt("graph neural network", items, 4, True)
+    compact_payload = compact_prompt[compact_prompt.index("Candidate papers:"):]
+    legacy_prompt = compact_prompt.replace(compact_payload, "Candidate papers:\n" + _legacy_payload(items) + "\n")
+
+    build_ms = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        service._build_recluster_prompt("graph neural network", items, 4, True)
+        build_ms.append((time.perf_counter() - started) * 1000)
+
+    print(f"{'prompt':<8} {'chars':>8} {'tokens~':>8}")
+    for name, prompt in (("legacy", legacy_prompt), ("compact", compact_prompt)):
+        print(f"{name:<8} {len(prompt):>8} {estimate_tokens(prompt):>8}")
+    saved = 1 - len(compact_prompt) / len(legacy_prompt)
+    print(f"saved: {saved:.1%}  build p50: {statistics.median(build_ms):.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    main(args.items, args.repeat)
@@ -0,0 +1,265 @@
+"""
+関連論文の再ランク（候補の読み込み + スコア計算）のベンチマーク
+
+従来（候補30件を document().get() で個別に全フィールド読み込み、1件ずつスコア計算）と、
+現行（スコア計算・レスポンス用のフィールドマスク付き get_all 1回 + 配列でのスコア計算）を比べる。
+
+Firestore は使わず、読み込みはインメモリの擬似クライアントで再現する。
+- 読み込みバイト数: 返したフィールドの JSON サイズ（実際のワイヤサイズの近似）
+- 所要時間: 擬似クライアントの遅延モデル（RPC ごとの往復 --rtt-ms + クライアント側 CPU --rpc-cpu-ms、
+  1件あたりのデコード --doc-cpu-ms + バイト数 / --decode-mbps）を含む実時間
+遅延モデルは仮定なので、実環境では Cloud Trace で確認すること。
+
+    python scripts/bench_related_hydration.py --limit 5 --limit 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../"))
+
+from app.modules.related.schemas import RelatedPaper
+from app.modules.related.scoring import score_candidates
+from app.modules.related.service import RelatedService
+
+_WORDS = (
+    "graph neural network transformer attention diffusion model protein molecule reinforcement policy "
+    "language retrieval embedding contrastive representation benchmark dataset optimization sparse"
+).split()
+
+
+class _Latency:
+    def __init__(self, rtt_ms: float, rpc_cpu_ms: float, doc_cpu_ms: float, decode_mbps: float):
+        self.rtt = rtt_ms / 1000
+        self.rpc_cpu = rpc_cpu_ms / 1000
+        self.doc_cpu = doc_cpu_ms / 1000
+        self.decode_bps = decode_mbps * 1e6
+
+    @staticmethod
+    def _busy(seconds: float) -> None:
+        # クライアント側の処理はイベントループを占有するので sleep ではなく CPU を使う
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            pass
+
+    async def rpc(self, docs: int, size: int) -> None:
+        self._busy(self.rpc_cpu)
+        await asyncio.sleep(self.rtt)
+        self._busy(docs * self.doc_cpu + size / self.decode_bps)
+
+
+class _Snapshot:
+    def __init__(self, doc_id: str, data: dict | None):
+        self.id = doc_id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return self._data
+
+
+class _DocumentRef:
+    def __init__(self, db: "FakeFirestore", doc_id: str):
+        self.db = db
+        self.id = doc_id
+
+    async def get(self):
+        data = self.db.docs.get(self.id)
+        size = self.db.measure(data)
+        await self.db.latency.rpc(1, size)
+        return _Snapshot(self.id, data)
+
+
+class _Collection:
+    def __init__(self, db: "FakeFirestore"):
+        self.db = db
+
+    def document(self, doc_id: str) -> _DocumentRef:
+        return _DocumentRef(self.db, doc_id)
+
+
+class FakeFirestore:
+    def __init__(self, docs: dict[str, dict], latency: _Latency):
+        self.docs = docs
+        self.latency = latency
+        self.rpcs = 0
+        self.reads = 0
+        self.bytes = 0
+
+    def measure(self, data: dict | None) -> int:
+        self.rpcs += 1
+        if data is None:
+            return 0
+        size = len(json.dumps(data, ensure_ascii=False, default=str).encode("utf-8"))
+        self.reads += 1
+        self.bytes += size
+        return size
+
+    def collection(self, name: str) -> _Collection:
+        return _Collection(self)
+
+    async def get_all(self, refs, field_paths=None):
+        self.rpcs += 1
+        snapshots = []
+        size = 0
+        for ref in refs:
+            data = self.docs.get(ref.id)
+            if data is not None and field_paths is not None:
+                data = {key: data[key] for key in field_paths if key in data}
+            if data is not None:
+                self.reads += 1
+                doc_size = len(json.dumps(data, ensure_ascii=False, default=str).encode("utf-8"))
+                size += doc_size
+            snapshots.append(_Snapshot(ref.id, data))
+        self.bytes += size
+        await self.latency.rpc(len(refs), size)
+        for snapshot in snapshots:
+            yield snapshot
+
+
+def _paper(rng: random.Random, paper_id: str, with_keywords: bool) -> dict:
+    abstract = " ".join(rng.choices(_WORDS, k=220))
+    return {
+        "id": paper_id,
+        "title": " ".join(rng.choices(_WORDS, k=10)).title(),
+        "authors": [f"Author {rng.randint(1, 999)}" for _ in range(rng.randint(2, 8))],
+        "year": rng.randint(2012, 2025),
+        "venue": "NeurIPS",
+        "abstract": abstract,
+        "doi": f"10.0000/{paper_id}",
+        "arxivId": f"2401.{rng.randint(10000, 99999)}",
+        "pdfUrl": f"https://arxiv.org/pdf/{paper_id}",
+        "status": "READY",
+        "keywords": [" ".join(rng.choices(_WORDS, k=2)) for _ in range(8)] if with_keywords else [],
+        "prerequisiteKeywords": [" ".join(rng.choices(_WORDS, k=2)) for _ in range(4)] if with_keywords else [],
+        "citationCount": rng.randint(0, 500),
+        "createdAt": "2025-01-01T00:00:00+00:00",
+        "updatedAt": "2025-01-01T00:00:00+00:00",
+        "startedAt": "2025-01-01T00:00:00+00:00",
+        "lastRequestId": f"req-{paper_id}",
+    }
+
+
+async def legacy_rerank(service: RelatedService, source_keywords, raw_candidates, limit) -> list[RelatedPaper]:
+    """変更前の実装（個別 get + 全フィールド + 1件ずつのスコア計算）"""
+    rerank_candidates = raw_candidates[: service.rerank_top_k]
+    snapshots = await asyncio.gather(
+        *(service.db.collection("papers").document(item["paper_id"]).get() for item in rerank_candidates)
+    )
+    scored = []
+    for item, doc in zip(rerank_candidates, snapshots):
+        if not doc.exists:
+            continue
+        info = doc.to_dict() or {}
+        target = service._extract_keyword_set(info)
+        union = source_keywords | target
+        keyword_score = len(source_keywords & target) / len(union) if source_keywords and target else 0.0
+        citation_score = min(max(service._citation_count(info), 0), 100) / 100
+        final = 0.6 * item["vector_score"] + 0.25 * keyword_score + 0.15 * citation_score
+        scored.append((doc.id, info, citation_score, final))
+    scored.sort(key=lambda x: (-x[3], -x[2], -service._safe_year(x[1].get("year"))))
+    return [
+        RelatedPaper(
+            paperId=paper_id,
+            title=info.get("title", ""),
+            authors=[str(a) for a in info.get("authors", [])],
+            year=info.get("year"),
+            venue=info.get("venue"),
+            abstract=info.get("abstract"),
+            similarity=final,
+            citationCount=service._citation_count(info),
+        )
+        for paper_id, info, _, final in scored[:limit]
+    ]
+
+
+async def main(args):
+    rng = random.Random(0)
+    latency = _Latency(args.rtt_ms, args.rpc_cpu_ms, args.doc_cpu_ms, args.decode_mbps)
+    docs = {
+        f"p{i}": _paper(rng, f"p{i}", with_keywords=rng.random() >= args.no_keyword_ratio)
+        for i in range(200)
+    }
+    service = RelatedService()
+    source_keywords = service._extract_keyword_set(docs["p0"])
+
+    print(f"{'limit':>5} {'path':>8} {'rpcs':>5} {'reads':>6} {'KB':>7} {'p50 ms':>8} {'p95 ms':>8} {'same top':>9}")
+    candidate_sets = [
+        [{"paper_id": pid, "vector_score": rng.uniform(0.5, 0.95)} for pid in rng.sample(list(docs)[1:], 30)]
+        for _ in range(args.repeat)
+    ]
+    for limit in args.limit:
+        results = {}
+        for name, rerank in (("before", legacy_rerank), ("after", None)):
+            latencies, stats = [], None
+            for candidates in candidate_sets:
+                db = FakeFirestore(docs, latency)
+                service.db = db
+                started = time.perf_counter()
+                if rerank is None:
+                    papers = await service._rerank_candidates(source_keywords, candidates, limit)
+                else:
+                    papers = await rerank(service, source_keywords, candidates, limit)
+                latencies.append((time.perf_counter() - started) * 1000)
+                stats = (db.rpcs, db.reads, db.bytes)
+                results.setdefault(name, []).append([p.paper_id for p in papers])
+            p95 = sorted(latencies)[max(0, int(len(latencies) * 0.95) - 1)]
+            same = "" if name == "before" else str(results["before"] == results["after"])
+            print(
+                f"{limit:>5} {name:>8} {stats[0]:>5} {stats[1]:>6} {stats[2] / 1024:>7.1f} "
+                f"{statistics.median(latencies):>8.2f} {p95:>8.2f} {same:>9}"
+            )
+
+    _bench_scorer(service, docs, source_keywords, rng)
+
+
+def _bench_scorer(service: RelatedService, docs: dict[str, dict], source_keywords, rng: random.Random) -> None:
+    """スコア計算だけの比較（キーワード集合の抽出は両方とも含まない）"""
+    print(f"\n{'candidates':>10} {'loop us':>9} {'array us':>9}")
+    for size in (30, 300):
+        infos = [docs[pid] for pid in rng.choices(list(docs), k=size)]
+        keyword_sets = [service._extract_keyword_set(info) for info in infos]
+        vectors = [rng.uniform(0.5, 0.95) for _ in infos]
+        citations = [service._citation_count(info) for info in infos]
+        years = [service._safe_year(info.get("year")) for info in infos]
+
+        def loop():
+            scored = []
+            for target, vector, count, year in zip(keyword_sets, vectors, citations, years):
+                union = source_keywords | target
+                keyword = len(source_keywords & target) / len(union) if source_keywords and target else 0.0
+                citation = min(max(count, 0), 100) / 100
+                scored.append((0.6 * vector + 0.25 * keyword + 0.15 * citation, citation, year))
+            return sorted(range(len(scored)), key=lambda i: (-scored[i][0], -scored[i][1], -scored[i][2]))
+
+        def array():
+            return score_candidates(source_keywords, vectors, keyword_sets, citations, years).order
+
+        timings = []
+        for fn in (loop, array):
+            started = time.perf_counter()
+            for _ in range(500):
+                fn()
+            timings.append((time.perf_counter() - started) / 500 * 1e6)
+        assert list(loop()) == [int(i) for i in array()]
+        print(f"{size:>10} {timings[0]:>9.1f} {timings[1]:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--limit", type=int, action="append")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--no-keyword-ratio", type=float, default=0.1)
+    parser.add_argument("--rtt-ms", type=float, default=4.0)
+    parser.add_argument("--rpc-cpu-ms", type=float, default=0.8)
+    parser.add_argument("--doc-cpu-ms", type=float, default=0.05)
+    parser.add_argument("--decode-mbps", type=float, default=50.0)
+    args = parser.parse_args()
+    args.limit = args.limit or [5, 20]
+    asyncio.run(main(args))
@@ -0,0 +1,84 @@
+"""
+ローカルベクトルストア（NumPy）のベンチマーク
+
+正規化した乱数ベクトル（既定 768 次元 = text-embedding-004）を 10k / 100k / 1M 件登録し、
+制限なし / paper_id 制限（約1%）の top-k 検索の所要時間を測る。1M 件の float32 は約3GB 必要。
+
+    python scripts/bench_vector_store.py --sizes 10000 100000 --dtypes float32 float16
+    python scripts/bench_vector_store.py --sizes 1000000 --dtypes float16
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../"))
+
+from app.core.vector_store import NumpyVectorStore, VectorRecord
+
+
+def _build(size: int, dims: int, dtype: str, papers: int, block: int = 10000) -> tuple[NumpyVectorStore, float]:
+    rng = np.random.default_rng(0)
+    store = NumpyVectorStore(dtype=dtype)
+    started = time.perf_counter()
+    for start in range(0, size, block):
+        vectors = rng.standard_normal((min(block, size - start), dims), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        store.upsert(
+            [
+                VectorRecord(
+                    id=f"c{start + i}",
+                    vector=vector,
+                    restricts={"paper_id": f"p{(start + i) % papers}", "owner_uid": f"u{(start + i) % 7}"},
+                )
+                for i, vector in enumerate(vectors)
+            ]
+        )
+    return store, time.perf_counter() - started
+
+
+def _measure(store: NumpyVectorStore, queries: np.ndarray, top_k: int, restricts=None) -> tuple[float, float]:
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        store.query_sync(query, top_k, restricts)
+        latencies.append((time.perf_counter() - started) * 1000)
+    p95 = sorted(latencies)[max(0, int(len(latencies) * 0.95) - 1)]
+    return statistics.median(latencies), p95
+
+
+def main(sizes: list[int], dims: int, dtypes: list[str], repeat: int, top_k: int):
+    rng = np.random.default_rng(1)
+    queries = rng.standard_normal((repeat, dims), dtype=np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    print(
+        f"{'vectors':>8} {'dtype':>8} {'MB':>7} {'build s':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'1% p50':>8} {'1% p95':>8}"
+    )
+    for size in sizes:
+        for dtype in dtypes:
+            papers = max(1, size // 20)  # 1論文あたり約20チャンク
+            store, build_seconds = _build(size, dims, dtype, papers)
+            restricts = {"paper_id": [f"p{i}" for i in range(0, papers, 100)] or ["p0"]}
+            p50, p95 = _measure(store, queries, top_k)
+            r50, r95 = _measure(store, queries, top_k, restricts)
+            print(
+                f"{size:>8} {dtype:>8} {store.stats()['bytes'] / 1e6:>7.0f} {build_seconds:>8.1f} "
+                f"{p50:>8.2f} {p95:>8.2f} {r50:>8.2f} {r95:>8.2f}"
+            )
+            del store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--dims", type=int, default=768)
+    parser.add_argument("--dtypes", nargs="+", default=["float32", "float16"])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=50)
+    args = parser.parse_args()
+    main(args.sizes, args.dims, args.dtypes, args.repeat, args.top_k)
@@ -0,0 +1,54 @@
+"""
+関連論文の事前計算リスト（papers/{id}/related/top）を一括で作り直すバックフィル
+
+READY の論文ごとに上位K件を計算して保存する。既存リストが max_age 内なら飛ばす（--force で全件）。
+
+    python scripts/refresh_related_lists.py --concurrency 4
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../"))
+
+from app.modules.related.service import related_service
+
+
+async def refresh_all(concurrency: int, force: bool) -> None:
+    related_service._ensure_initialized()
+    materialized = related_service.materialized
+    semaphore = asyncio.Semaphore(concurrency)
+    counts = {"refreshed": 0, "skipped": 0, "empty": 0, "failed": 0}
+
+    async def refresh(paper_id: str) -> None:
+        async with semaphore:
+            if not force:
+                stored = await materialized.repository.get_related_list(paper_id)
+                if stored and stored.get("computed_at"):
+                    age = (datetime.now(timezone.utc) - stored["computed_at"]).total_seconds()
+                    if age <= materialized.max_age:
+                        counts["skipped"] += 1
+                        return
+            try:
+                result = await materialized.refresh(paper_id)
+                counts["refreshed" if result.items else "empty"] += 1
+            except Exception as exc:
+                counts["failed"] += 1
+                print(f"  failed: {paper_id}: {exc}")
+
+    query = related_service.db.collection("papers").where("status", "==", "READY")
+    paper_ids = [doc.id async for doc in query.select([]).stream()]
+    print(f"Refreshing related lists for {len(paper_ids)} papers...")
+    await asyncio.gather(*(refresh(paper_id) for paper_id in paper_ids))
+    print(f"Done: {counts}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(refresh_all(args.concurrency, args.force))
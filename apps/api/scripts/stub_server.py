@@ -0,0 +1,144 @@
+"""
+ローカル検証用スタブHTTPサーバー
+
+外部API（arXiv / PubMed / Semantic Scholar）の代わりに固定レスポンスを返す。
+ベンチマーク・オフラインテストから `StubServer` として起動して使う。
+"""
+
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+ARXIV_FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:arxiv="http://arxiv.org/schemas/atom">
+  <entry>
+    <id>http://arxiv.org/abs/1706.03762v7</id>
+    <published>2017-06-12T17:57:34Z</published>
+    <title>Attention Is All You Need</title>
+    <summary>The dominant sequence transduction models are based on complex recurrent networks.</summary>
+    <author><name>Ashish Vaswani</name></author>
+    <link title="pdf" href="http://arxiv.org/pdf/1706.03762v7" rel="related" type="application/pdf"/>
+    <arxiv:primary_category term="cs.CL" scheme="http://arxiv.org/schemas/atom"/>
+  </entry>
+</feed>
+"""
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    # Keep-Alive を有効にするため HTTP/1.1 で応答する
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        # 新規TCP接続ごとの遅延（TLSハンドシェイク相当）を再現する
+        delay = getattr(self.server, "handshake_delay", 0.0)
+        if delay:
+            time.sleep(delay)
+        super().setup()
+        # ヘッダーとボディの分割送信で Nagle 遅延が乗らないようにする
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        self.server.request_count += 1
+
+        if url.path.endswith("/api/query"):
+            self._send(200, ARXIV_FEED.encode("utf-8"), "application/atom+xml")
+            return
+
+        if url.path.endswith("/esearch.fcgi"):
+            body = {"esearchresult": {"idlist": ["31452104"]}}
+            self._send(200, json.dumps(body).encode("utf-8"), "application/json")
+            return
+
+        if url.path.endswith("/esummary.fcgi"):
+            uid = (query.get("id") or ["31452104"])[0].split(",")[0]
+            body = {
+                "result": {
+                    "uids": [uid],
+                    uid: {
+                        "title": "Stub PubMed Article",
+                        "authors": [{"name": "Doe J"}],
+                        "pubdate": "2019 Aug",
+                        "source": "Stub J",
+                        "articleids": [{"idtype": "doi", "value": "10.0000/stub"}],
+                    },
+                }
+            }
+            self._send(200, json.dumps(body).encode("utf-8"), "application/json")
+            return
+
+        if url.path.endswith("/efetch.fcgi"):
+            ids = (query.get("id") or ["31452104"])[0].split(",")
+            articles = "".join(
+                "<PubmedArticle><MedlineCitation><PMID>{pmid}</PMID><Article><Abstract>"
+                "<AbstractText Label=\"BACKGROUND\">Stub abstract for {pmid}.</AbstractText>"
+                "</Abstract></Article></MedlineCitation></PubmedArticle>".format(pmid=pmid)
+                for pmid in ids
+            )
+            body = f"<?xml version=\"1.0\"?><PubmedArticleSet>{articles}</PubmedArticleSet>"
+            self._send(200, body.encode("utf-8"), "text/xml")
+            return
+
+        self._send(404, b"{}", "application/json")
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        self.server.request_count += 1
+
+        if url.path.endswith("/paper/batch"):
+            # 被引用数はIDから決定的に作る。"missing" を含むIDは未登録（null）
+            body = [
+                None if "missing" in paper_id.lower() else {
+                    "paperId": f"stub{index}",
+                    "citationCount": sum(map(ord, paper_id)) % 1000,
+                }
+                for index, paper_id in enumerate(payload.get("ids", []))
+            ]
+            self._send(200, json.dumps(body).encode("utf-8"), "application/json")
+            return
+
+        self._send(404, b"{}", "application/json")
+
+
+class StubServer:
+    """スレッドで動作するスタブHTTPサーバー"""
+
+    def __init__(self, handshake_delay: float = 0.0, handler_cls=_StubHandler):
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler_cls)
+        self._httpd.daemon_threads = True
+        self._httpd.handshake_delay = handshake_delay
+        self._httpd.request_count = 0
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def request_count(self) -> int:
+        return self._httpd.request_count
+
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,49 @@
+"""arXiv Atom 逐次パーサーのテスト"""
+
+from app.core.search.arxiv import ArxivClient
+
+FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:arxiv="http://arxiv.org/schemas/atom">
+  <title>ArXiv Query</title>
+  <entry>
+    <id>http://arxiv.org/abs/1706.03762v7</id>
+    <published>2017-06-12T17:57:34Z</published>
+    <title>Attention Is All
+      You Need</title>
+    <summary>  The dominant sequence transduction models.  </summary>
+    <author><name>Ashish Vaswani</name></author>
+    <author><name>Noam Shazeer</name></author>
+    <link title="pdf" href="http://arxiv.org/pdf/1706.03762v7" rel="related"/>
+    <link title="doi" href="http://dx.doi.org/10.0000/attention" rel="related"/>
+    <arxiv:primary_category term="cs.CL" scheme="http://arxiv.org/schemas/atom"/>
+  </entry>
+  <entry>
+    <id>http://arxiv.org/abs/2401.00001v1</id>
+    <published>2024-01-01T00:00:00Z</published>
+    <title>No Category</title>
+    <summary>Short.</summary>
+  </entry>
+</feed>
+"""
+
+
+def test_iter_entries_parses_fields_lazily():
+    """各 entry を逐次 SearchResult に変換し、任意要素の欠落も扱える"""
+    client = ArxivClient()
+    client.PARSE_CHUNK_SIZE = 64  # 小さなチャンクでも entry をまたいで正しく読めること
+
+    iterator = client._iter_entries(FEED)
+    first = next(iterator)
+    rest = list(iterator)
+
+    assert first.title == "Attention Is All       You Need"
+    assert first.authors == ["Ashish Vaswani", "Noam Shazeer"]
+    assert first.year == 2017
+    assert first.abstract == "The dominant sequence transduction models."
+    assert first.external_ids == {"ArXiv": "1706.03762v7", "DOI": "10.0000/attention"}
+    assert first.pdf_url == "http://arxiv.org/pdf/1706.03762v7"
+    assert first.venue == "arXiv:cs.CL"
+
+    assert len(rest) == 1
+    assert rest[0].venue == "arXiv"
+    assert rest[0].authors == []
@@ -0,0 +1,144 @@
+"""Semantic Scholar /paper/batch による被引用数補完のテスト"""
+
+import asyncio
+
+import pytest
+
+from app.core.http import HttpClientPool
+from app.core.semantic_scholar import SemanticScholarClient
+from app.modules.search.citations import CitationEnricher
+from app.modules.search.schemas import SearchResultItem
+from scripts.stub_server import StubServer
+
+
+def _item(external_id: str, **ids) -> SearchResultItem:
+    return SearchResultItem(
+        external_id=external_id,
+        source="arxiv",
+        title=f"Paper {external_id}",
+        authors=[],
+        year=2020,
+        venue="",
+        abstract="",
+        doi=ids.get("doi"),
+        arxiv_id=ids.get("arxiv_id"),
+        pdf_url=None,
+        citation_count=None,
+    )
+
+
+def _client(server: StubServer, pool: HttpClientPool) -> SemanticScholarClient:
+    client = SemanticScholarClient(http_pool=pool)
+    client.BASE_URL = server.base_url
+    return client
+
+
+@pytest.mark.asyncio
+async def test_page_is_resolved_in_one_batch_call_and_cached():
+    """1ページ分を1回の /paper/batch で埋め、次の検索はリクエストなしでキャッシュから埋める"""
+    pool = HttpClientPool()
+    written: list[dict[str, int]] = []
+
+    async def writer(counts: dict[str, int]) -> None:
+        written.append(counts)
+
+    with StubServer() as server:
+        enricher = CitationEnricher(client=_client(server, pool), writer=writer, wait_timeout=5.0)
+        items = [
+            _item("1706.03762", arxiv_id="1706.03762"),
+            _item("doi:10.1/a", doi="10.1/a"),
+            _item("doi:10.1/missing", doi="10.1/missing"),
+            _item("pubmed:31452104"),
+        ]
+        try:
+            await enricher.enrich(items)
+            assert server.request_count == 1
+            assert items[0].citation_count == sum(map(ord, "ARXIV:1706.03762")) % 1000
+            assert items[2].citation_count is None
+            assert items[3].citation_count is not None
+            assert set(written[0]) == {"1706.03762", "doi:10.1/a", "pubmed:31452104"}
+
+            again = [_item("doi:10.1/a", doi="10.1/a"), _item("doi:10.1/missing", doi="10.1/missing")]
+            await enricher.enrich(again)
+            assert server.request_count == 1
+            assert again[0].citation_count == items[1].citation_count
+        finally:
+            await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_slow_lookup_returns_after_bounded_wait_and_fills_cache_later():
+    """S2 が遅い場合は待ち上限で未解決のまま返し、取得完了後はキャッシュから埋まる"""
+    pool = HttpClientPool()
+    with StubServer(handshake_delay=0.3) as server:
+        enricher = CitationEnricher(client=_client(server, pool), wait_timeout=0.05)
+        try:
+            items = [_item("doi:10.1/slow", doi="10.1/slow")]
+            await enricher.enrich(items)
+            assert items[0].citation_count is None
+            assert enricher.stats()["timeouts"] == 1
+
+            await asyncio.gather(*enricher._background)
+            await enricher.enrich(items)
+            assert items[0].citation_count == sum(map(ord, "DOI:10.1/slow")) % 1000
+            assert server.request_count == 1
+        finally:
+            await pool.aclose()
+
+
+class _Snapshot:
+    def __init__(self, reference, exists: bool):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = exists
+
+
+class _Batch:
+    def __init__(self, db: "_FakeFirestore"):
+        self.db = db
+        self.updates: dict[str, dict] = {}
+
+    def update(self, reference, data: dict) -> None:
+        self.updates[reference.id] = data
+
+    async def commit(self) -> None:
+        self.db.committed.update(self.updates)
+
+
+class _FakeFirestore:
+    """ref の生成（ID の検証）は本物のクライアント、読み書きはメモリ上"""
+
+    def __init__(self, existing: set[str]):
+        from google.auth.credentials import AnonymousCredentials
+        from google.cloud.firestore import AsyncClient
+
+        self._client = AsyncClient(project="test", credentials=AnonymousCredentials())
+        self.existing = existing
+        self.committed: dict[str, dict] = {}
+
+    def collection(self, name: str):
+        return self._client.collection(name)
+
+    async def get_all(self, refs):
+        for ref in refs:
+            yield _Snapshot(ref, ref.id in self.existing)
+
+    def batch(self) -> _Batch:
+        return _Batch(self)
+
+
+@pytest.mark.asyncio
+async def test_doi_keyed_counts_do_not_block_other_papers(monkeypatch):
+    """"/" を含む DOI キーは飛ばし、同じページの arXiv / PubMed の論文には書き込む"""
+    from app.modules.papers.repository import PaperRepository
+
+    db = _FakeFirestore(existing={"1706.03762", "pubmed:31452104"})
+    repository = PaperRepository()
+    monkeypatch.setattr(repository, "_get_db", lambda: db)
+
+    updated = await repository.set_citation_counts(
+        {"1706.03762": 12, "doi:10.1/a": 3, "pubmed:31452104": 7, "missing": 1}
+    )
+
+    assert updated == 2
+    assert db.committed == {"1706.03762": {"citationCount": 12}, "pubmed:31452104": {"citationCount": 7}}
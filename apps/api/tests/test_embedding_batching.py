@@ -0,0 +1,84 @@
+"""埋め込み生成のマイクロバッチとキャッシュのテスト"""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.core.embedding import EmbeddingService
+from app.core.embedding_cache import EmbeddingCache
+
+
+class FakeEmbedding:
+    def __init__(self, values: list[float]):
+        self.values = values
+
+
+class FakeEmbeddingModel:
+    def __init__(self, fail: bool = False):
+        self.calls: list[list[str]] = []
+        self.threads: set[str] = set()
+        self.fail = fail
+
+    def get_embeddings(self, inputs):
+        self.calls.append([i.text for i in inputs])
+        self.threads.add(threading.current_thread().name)
+        if self.fail:
+            raise RuntimeError("quota exceeded")
+        return [FakeEmbedding([float(len(i.text)), 1.0]) for i in inputs]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_coalesced_into_micro_batches():
+    """同時の1件要求は件数上限ごとのバッチにまとまり、専用スレッドで実行される"""
+    model = FakeEmbeddingModel()
+    service = EmbeddingService(
+        model=model, max_batch_size=4, max_wait=0.05, max_workers=1, cache=EmbeddingCache()
+    )
+    texts = [f"text-{'x' * i}" for i in range(10)] + ["text-xxxxxxxx"]
+
+    vectors = await asyncio.gather(*(service.embed(text) for text in texts))
+
+    assert vectors[0] == [5.0, 1.0]
+    assert vectors[-1] == vectors[8] == [13.0, 1.0]
+    assert [len(call) for call in model.calls] == [4, 4, 2]  # 同じバッチ内の重複テキストは1回だけ送る
+    assert all(name.startswith("embedding") for name in model.threads)
+    assert service.stats()["batches"] == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_returns_empty_vectors_to_every_caller():
+    """API 失敗時は同じバッチの全要求に空リストを返す（従来の generate_embedding と同じ）"""
+    service = EmbeddingService(
+        model=FakeEmbeddingModel(fail=True), max_batch_size=8, max_wait=0.01, cache=EmbeddingCache()
+    )
+
+    vectors = await asyncio.gather(service.embed("a"), service.embed("b"))
+
+    assert vectors == [[], []]
+    assert service.stats()["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_vectors_skip_the_api_and_persist_as_float16(tmp_path):
+    """2回目以降はキャッシュから返し、別プロセス相当（メモリ空）でもファイルから復元できる"""
+    path = str(tmp_path / "embeddings.sqlite")
+    model = FakeEmbeddingModel()
+    service = EmbeddingService(model=model, max_wait=0.01, cache=EmbeddingCache(path=path))
+
+    first = await service.embed("graph neural network")
+    second = await service.embed("graph neural network")
+    assert first == second == [20.0, 1.0]
+    assert len(model.calls) == 1
+
+    # Worker 側（同期・文書用）は task_type が違うので別キー
+    worker_model = FakeEmbeddingModel()
+    worker = EmbeddingService(model=worker_model, cache=EmbeddingCache(path=path, max_entries=8))
+    assert worker.embed_batch_sync(["graph neural network"], task_type="RETRIEVAL_DOCUMENT") == [[20.0, 1.0]]
+    # 同じ task_type ならメモリが空でもファイル側から復元され API を呼ばない
+    assert await worker.embed("graph neural network") == [20.0, 1.0]
+    assert len(worker_model.calls) == 1
+
+    stats = worker.cache.stats()
+    assert stats["store_hits"] == 1 and stats["misses"] == 1
+    assert stats["store_entries"] == 2
@@ -0,0 +1,66 @@
+"""共有HTTPクライアントプールのテスト"""
+
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import FastAPI
+
+from app.core.http import HttpClientPool
+from scripts.stub_server import StubServer, _StubHandler
+
+
+class _CountingHandler(_StubHandler):
+    def setup(self):
+        self.server.connections += 1
+        super().setup()
+
+
+def test_one_client_per_host():
+    """同じホストはパスが違っても同じクライアント、別ホストは別クライアント"""
+    pool = HttpClientPool()
+
+    arxiv = pool.client_for("https://export.arxiv.org/api/query")
+    assert pool.client_for("https://export.arxiv.org/api/other?x=1") is arxiv
+    pubmed = pool.client_for("https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi")
+    assert pubmed is not arxiv
+    assert pool.client_for("https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi") is pubmed
+    assert pool.stats()["hosts"] == ["eutils.ncbi.nlm.nih.gov", "export.arxiv.org"]
+
+
+@pytest.mark.asyncio
+async def test_lifespan_starts_reuses_and_closes_clients():
+    """lifespan で事前生成したクライアントは接続を使い回し、終了後は閉じられて使えない"""
+    pool = HttpClientPool()
+    with StubServer(handler_cls=_CountingHandler) as server:
+        server._httpd.connections = 0
+        url = f"{server.base_url}/api/query"
+
+        @asynccontextmanager
+        async def lifespan(app: FastAPI):
+            await pool.startup(hosts=[url])
+            yield
+            await pool.aclose()
+
+        app = FastAPI(lifespan=lifespan)
+        async with app.router.lifespan_context(app):
+            client = pool.client_for(url)
+            assert pool.stats()["hosts"] == [url.split("/")[2]]
+            for _ in range(3):
+                response = await client.get(url)
+                assert response.status_code == 200
+            assert server.request_count == 3
+            # Keep-Alive により3回のリクエストで TCP 接続は1本
+            assert server._httpd.connections == 1
+
+        assert client.is_closed
+        with pytest.raises(RuntimeError):
+            await client.get(url)
+        with pytest.raises(RuntimeError):
+            pool.client_for(url)
+        assert pool.stats()["hosts"] == []
+
+        # 再起動（startup）すれば新しいクライアントを作る
+        await pool.startup()
+        reopened = pool.client_for(url)
+        assert reopened is not client and not reopened.is_closed
+        await pool.aclose()
@@ -0,0 +1,102 @@
+"""ライブラリ所属キャッシュのテスト"""
+
+import asyncio
+
+import pytest
+
+from app.modules.papers.membership import LibraryMembershipService
+
+
+class FakeLikesRepository:
+    def __init__(self, likes: list[str]):
+        self.likes = list(likes)
+        self.full_reads = 0
+        self.point_reads = 0
+
+    async def get_user_likes(self, uid: str) -> list[str]:
+        self.full_reads += 1
+        await asyncio.sleep(0.01)
+        return list(self.likes)
+
+    async def has_like(self, uid: str, paper_id: str) -> bool:
+        self.point_reads += 1
+        return paper_id in self.likes
+
+
+@pytest.mark.asyncio
+async def test_liked_ids_are_loaded_once_and_updated_in_place():
+    """同時の一覧取得は1回の全件読みにまとまり、いいねの追加・解除はその場で反映される"""
+    repository = FakeLikesRepository([f"p{i}" for i in range(2000)])
+    membership = LibraryMembershipService(repository=repository, ttl=60.0)
+
+    first, second = await asyncio.gather(membership.liked_ids("u1"), membership.liked_ids("u1"))
+    assert len(first) == len(second) == 2000
+    assert repository.full_reads == 1
+
+    repository.likes.append("new")
+    membership.added("u1", "new")
+    repository.likes.remove("p0")
+    membership.removed("u1", "p0")
+    assert await membership.cached_contains("u1", "new")
+    assert "new" in await membership.liked_ids("u1")
+    assert "p0" not in await membership.liked_ids("u1")
+    assert repository.full_reads == 1
+    assert repository.point_reads == 0
+
+
+@pytest.mark.asyncio
+async def test_cached_set_never_answers_no():
+    """表示用の判定でも、集合に無い論文は1件読みで確かめる"""
+    repository = FakeLikesRepository(["p1"])
+    membership = LibraryMembershipService(repository=repository, ttl=60.0)
+    await membership.liked_ids("u1")
+
+    # 別インスタンスでいいねされた（このプロセスの集合には無い）
+    repository.likes.append("p2")
+    assert await membership.cached_contains("u1", "p2")
+    assert not await membership.cached_contains("u1", "p3")
+    assert repository.point_reads == 2
+
+    # 1件読みで見つかったいいねは集合にも入る
+    assert await membership.cached_contains("u1", "p2")
+    assert repository.point_reads == 2
+    assert "p2" in await membership.liked_ids("u1")
+
+
+@pytest.mark.asyncio
+async def test_single_paper_check_uses_point_read_without_cached_set():
+    """集合が未キャッシュ・期限切れの場合、1論文の判定は全件読みせず1件読みで答える"""
+    repository = FakeLikesRepository(["p1"])
+    membership = LibraryMembershipService(repository=repository, ttl=0.0)
+
+    assert await membership.contains("u1", "p1")
+    assert not await membership.contains("u1", "p2")
+    assert repository.point_reads == 2
+    assert repository.full_reads == 0
+
+    await membership.liked_ids("u1")
+    await asyncio.sleep(0.001)
+    assert await membership.contains("u1", "p1")
+    assert repository.point_reads == 3
+
+
+@pytest.mark.asyncio
+async def test_access_checks_ignore_a_stale_cached_like():
+    """他インスタンスで解除されたいいねが集合に残っていても、権限判定は1件読みで False にする"""
+    repository = FakeLikesRepository(["p1", "p2"])
+    membership = LibraryMembershipService(repository=repository, ttl=60.0)
+    await membership.liked_ids("u1")
+
+    # 別インスタンスでいいね解除された（このプロセスの集合には残っている）
+    repository.likes.remove("p1")
+    assert await membership.cached_contains("u1", "p1")
+    assert not await membership.contains("u1", "p1")
+    assert repository.point_reads == 1
+
+    # 1件読みの結果で集合も補正される
+    assert "p1" not in await membership.liked_ids("u1")
+
+    repository.likes.remove("p2")
+    assert "p2" in await membership.liked_ids("u1")
+    assert await membership.liked_ids("u1", fresh=True) == frozenset()
+    assert repository.full_reads == 2
@@ -0,0 +1,96 @@
+"""ローカル論文カタログ（SQLite FTS5）のテスト"""
+
+import sqlite3
+
+import pytest
+
+from app.core.search import LocalCatalog, SearchResult
+
+
+def _result(title: str, abstract: str = "", **kwargs) -> SearchResult:
+    return SearchResult(
+        title=title,
+        authors=kwargs.pop("authors", ["Ada Lovelace"]),
+        abstract=abstract,
+        source=kwargs.pop("source", "arxiv"),
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_catalog_ranks_title_matches_and_fills_missing_fields():
+    """タイトル一致を優先して返し、同じ論文の再登録では空欄だけを補完する"""
+    catalog = LocalCatalog()
+    await catalog.add_results([
+        _result("Protein folding with attention", "graph networks are used", external_ids={"ArXiv": "1"}),
+        _result("Graph neural networks for molecules", external_ids={"ArXiv": "2"}),
+        _result("Unrelated survey", external_ids={"DOI": "10.1/x"}),
+    ])
+    await catalog.add_results([
+        _result("Graph neural networks for molecules", "message passing", external_ids={"ArXiv": "2", "DOI": "10.2/y"}, pdf_url="https://example.org/2.pdf"),
+    ])
+
+    hits = await catalog.search("graph networks", limit=10)
+
+    assert [hit.external_ids["ArXiv"] for hit in hits] == ["2", "1"]
+    assert hits[0].abstract == "message passing"
+    assert hits[0].external_ids["DOI"] == "10.2/y"
+    assert hits[0].pdf_url == "https://example.org/2.pdf"
+    assert len(catalog) == 3
+    # FTS5 の構文文字を含むクエリでもエラーにならない
+    assert await catalog.search('graph "OR* (', limit=10)
+
+
+@pytest.mark.asyncio
+async def test_catalog_indexes_library_papers():
+    """papers コレクションの論文（snake_case）を source=library で登録する"""
+    catalog = LocalCatalog()
+    await catalog.add_paper({
+        "id": "paper-1",
+        "title": "Attention is all you need",
+        "authors": ["Ashish Vaswani"],
+        "year": 2017,
+        "abstract": "The dominant sequence transduction models",
+        "arxiv_id": "1706.03762",
+    })
+
+    hits = await catalog.search("vaswani attention", limit=5)
+
+    assert len(hits) == 1
+    assert hits[0].source == "library"
+    assert hits[0].external_ids == {"ArXiv": "1706.03762"}
+    assert catalog.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_catalog_evicts_least_recently_used_rows_and_filters_by_age():
+    """上限件数を超えると最後に登録・ヒットした時刻が古い行から消え、max_age は古い行を除外する"""
+    catalog = LocalCatalog(max_rows=2)
+    await catalog.add_results([_result("Graph alpha", external_ids={"ArXiv": "a"})])
+    await catalog.add_results([_result("Graph beta", external_ids={"ArXiv": "b"})])
+    catalog._conn.execute("UPDATE catalog SET fetched_at = fetched_at - 100, used_at = used_at - 100")
+    # a はヒットしたので b より後まで残る
+    assert len(await catalog.search("graph alpha", limit=5)) == 1
+    await catalog.add_results([_result("Graph gamma", external_ids={"ArXiv": "c"})])
+
+    hits = await catalog.search("graph", limit=5)
+    assert sorted(hit.external_ids["ArXiv"] for hit in hits) == ["a", "c"]
+    assert len(catalog) == 2 and catalog.stats()["evictions"] == 1
+
+    # a は 100 秒前に外部APIから受け取ったまま、c は今受け取った
+    fresh = await catalog.search("graph", limit=5, max_age=50)
+    assert [hit.external_ids["ArXiv"] for hit in fresh] == ["c"]
+
+
+def test_catalog_rebuilds_an_older_schema(tmp_path):
+    """スキーマが古いファイルは作り直す"""
+    path = str(tmp_path / "catalog.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE catalog (key TEXT PRIMARY KEY, payload TEXT NOT NULL)")
+    conn.execute("INSERT INTO catalog VALUES ('arxiv:1', '{}')")
+    conn.commit()
+    conn.close()
+
+    catalog = LocalCatalog(path=path)
+
+    assert catalog.enabled and len(catalog) == 0
@@ -0,0 +1,85 @@
+"""PubMed efetch によるアブストラクト一括取得のテスト"""
+
+import pytest
+
+from app.core.http import HttpClientPool
+from app.core.search.cache import SearchResultCache
+from app.core.search.pubmed import PubmedClient
+from scripts.stub_server import StubServer
+
+EFETCH_XML = b"""<?xml version="1.0"?>
+<PubmedArticleSet>
+  <PubmedArticle>
+    <MedlineCitation>
+      <PMID Version="1">111</PMID>
+      <Article>
+        <Abstract>
+          <AbstractText Label="BACKGROUND">Background <i>text</i>.</AbstractText>
+          <AbstractText Label="RESULTS">Results text.</AbstractText>
+        </Abstract>
+      </Article>
+    </MedlineCitation>
+  </PubmedArticle>
+  <PubmedArticle>
+    <MedlineCitation>
+      <PMID Version="1">222</PMID>
+      <Article></Article>
+    </MedlineCitation>
+  </PubmedArticle>
+</PubmedArticleSet>
+"""
+
+
+def test_parse_abstracts_joins_labeled_sections():
+    """構造化アブストラクトはラベル付きで連結し、無い論文は空文字になる"""
+    abstracts = PubmedClient._parse_abstracts(EFETCH_XML)
+
+    assert abstracts == {
+        "111": "BACKGROUND: Background text. RESULTS: Results text.",
+        "222": "",
+    }
+
+
+@pytest.mark.asyncio
+async def test_search_costs_three_calls_and_caches_abstracts():
+    """1ページの検索は esearch/esummary/efetch の3回で、アブストラクトはPMIDでキャッシュされる"""
+    pool = HttpClientPool()
+    with StubServer() as server:
+        client = PubmedClient(http_pool=pool, cache=SearchResultCache())
+        client.BASE_URL_SEARCH = f"{server.base_url}/esearch.fcgi"
+        client.BASE_URL_SUMMARY = f"{server.base_url}/esummary.fcgi"
+        client.BASE_URL_FETCH = f"{server.base_url}/efetch.fcgi"
+        try:
+            results = await client.search("stub", 20)
+            assert server.request_count == 3
+            assert results[0].abstract == "BACKGROUND: Stub abstract for 31452104."
+
+            await client.fetch_abstracts(["31452104"])
+            assert server.request_count == 3
+        finally:
+            await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_pmids_missing_from_the_response_are_refetched_after_the_miss_ttl():
+    """応答に無かった PMID は短い TTL でだけ空として覚え、アブストラクトが無いと返った論文は再取得しない"""
+    client = PubmedClient(cache=SearchResultCache())
+    requested: list[list[str]] = []
+
+    async def efetch_chunk(pmids):
+        requested.append(list(pmids))
+        # 333 は途中で切れた応答に含まれなかった
+        return {pmid: abstract for pmid, abstract in {"111": "Abstract.", "222": "", "333": "Late."}.items()
+                if pmid in pmids and (pmid != "333" or len(requested) > 1)}
+
+    client._efetch_chunk = efetch_chunk
+    assert await client.fetch_abstracts(["111", "222", "333"]) == {"111": "Abstract.", "222": "", "333": ""}
+
+    await client.fetch_abstracts(["111", "222", "333"])
+    assert requested == [["111", "222", "333"]]
+
+    # TTL 経過後（見つかった 111 / 222 は期限なし）
+    for pmid in ("111", "222", "333"):
+        client._abstract_cache.get(pmid).stored_at -= client._abstract_miss_ttl
+    assert await client.fetch_abstracts(["111", "222", "333"]) == {"111": "Abstract.", "222": "", "333": "Late."}
+    assert requested[-1] == ["333"]
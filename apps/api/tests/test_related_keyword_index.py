@@ -0,0 +1,65 @@
+"""キーワードブリッジ（フレーズ転置インデックス）のテスト"""
+
+import random
+
+from app.modules.related.keyword_index import PhraseIndex
+from app.modules.related.service import RelatedService
+
+
+def _papers(seed: int, size: int) -> dict[str, dict]:
+    rng = random.Random(seed)
+    vocabulary = [f"Phrase-{i}" for i in range(25)]
+    return {
+        f"p{i}": {
+            "keywords": rng.sample(vocabulary, rng.randint(0, 5)),
+            "prerequisiteKeywords": [{"name": rng.choice(vocabulary)}],
+        }
+        for i in range(size)
+    }
+
+
+def test_overlaps_count_only_papers_after_the_source():
+    index = PhraseIndex(["a", "b", "c"], {"a": {"x", "y"}, "b": {"x"}, "c": {"x", "y", "z"}})
+
+    assert index.overlaps({"x", "y"}) == {0: 2, 1: 1, 2: 2}
+    assert index.overlaps({"x", "y"}, after=0) == {1: 1, 2: 2}
+    assert index.overlaps({"w"}) == {}
+
+
+def test_project_edges_match_the_pairwise_intersection():
+    """転置インデックスでも、全ペアの集合積と同じエッジが同じ順で作られる"""
+    service = RelatedService()
+    papers = _papers(seed=7, size=40)
+    ids = list(papers)
+    phrases = {pid: service._extract_keyword_phrases(data) for pid, data in papers.items()}
+    expected = [
+        (ids[i], ids[j], service._keyword_bridge_score(len(phrases[ids[i]] & phrases[ids[j]])))
+        for i in range(len(ids))
+        for j in range(i + 1, len(ids))
+        if phrases[ids[i]] & phrases[ids[j]] and (ids[i], ids[j]) != ("p0", "p1")
+    ]
+
+    edges = []
+    count = service._add_project_keyword_edges(ids, papers, {("p0", "p1")}, edges)
+
+    assert count == len(expected)
+    assert [(e.source, e.target, e.value) for e in edges] == expected
+
+
+def test_global_edges_rank_related_targets_by_overlap():
+    """owned → related のエッジは共通フレーズ数の多い順に上位5件まで（同数は related の並び順）"""
+    service = RelatedService()
+    papers = _papers(seed=11, size=60)
+    ids = list(papers)
+    related = set(ids[::3])
+    phrases = {pid: service._extract_keyword_phrases(data) for pid, data in papers.items()}
+    expected = []
+    for source in (pid for pid in ids if pid not in related):
+        ranked = [(target, len(phrases[source] & phrases[target])) for target in ids if target in related]
+        ranked = sorted((item for item in ranked if item[1] > 0), key=lambda item: -item[1])
+        expected.extend((source, target, service._keyword_bridge_score(n)) for target, n in ranked[:5])
+
+    edges = []
+    service._add_keyword_bridge_edges(ids, related, papers, set(), edges)
+
+    assert [(e.source, e.target, e.value) for e in edges] == expected
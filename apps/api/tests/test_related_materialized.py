@@ -0,0 +1,107 @@
+"""関連論文の事前計算リストのテスト"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.modules.related.materialized import RelatedListMaterializer
+from app.modules.related.schemas import RelatedPaper
+
+
+class FakeRelatedRepository:
+    def __init__(self):
+        self.lists: dict[str, dict] = {}
+
+    async def get_related_list(self, paper_id: str) -> dict | None:
+        return self.lists.get(paper_id)
+
+    async def set_related_list(self, paper_id: str, items: list[dict], computed_at: datetime, top_k: int) -> None:
+        self.lists[paper_id] = {"items": items, "computed_at": computed_at, "top_k": top_k}
+
+
+class FakeCompute:
+    def __init__(self, empty: set[str] | None = None):
+        self.calls: list[tuple[str, int]] = []
+        self.empty = empty or set()
+
+    async def __call__(self, paper_id: str, limit: int) -> list[RelatedPaper]:
+        self.calls.append((paper_id, limit))
+        if paper_id in self.empty:
+            return []
+        return [
+            RelatedPaper(paperId=f"{paper_id}-n{i}", title=f"neighbor {i}", authors=[], similarity=1.0 - i / 100)
+            for i in range(limit)
+        ]
+
+
+@pytest.mark.asyncio
+async def test_miss_computes_once_then_serves_the_stored_list():
+    """初回だけ計算して保存し、以降は保存済みリストから返す（件数が足りなければ再計算）"""
+    compute = FakeCompute()
+    repository = FakeRelatedRepository()
+    materialized = RelatedListMaterializer(compute, repository=repository, top_k=10, max_age=3600)
+
+    first = await materialized.get("p1", 5)
+    second = await materialized.get("p1", 3)
+
+    assert first.status == "miss" and second.status == "hit"
+    assert [p.paper_id for p in second.items] == ["p1-n0", "p1-n1", "p1-n2"]
+    assert second.computed_at == first.computed_at
+    assert compute.calls == [("p1", 10)]
+
+    assert (await materialized.get("p1", 12)).status == "miss"
+    assert compute.calls[-1] == ("p1", 12)
+
+
+@pytest.mark.asyncio
+async def test_stale_list_is_served_and_refreshed_in_background():
+    """古いリストはそのまま返し、裏で作り直す。空の結果（失敗）は保存しない"""
+    compute = FakeCompute(empty={"p2-n1"})
+    repository = FakeRelatedRepository()
+    materialized = RelatedListMaterializer(compute, repository=repository, top_k=4, max_age=60, neighbor_refresh=2)
+    old = datetime.now(timezone.utc) - timedelta(hours=1)
+    repository.lists["p2"] = {
+        "items": [RelatedPaper(paperId="old", title="old", authors=[], similarity=0.5).model_dump(by_alias=True)],
+        "computed_at": old,
+        "top_k": 4,
+    }
+
+    stale = await materialized.get("p2", 1)
+    assert stale.status == "stale" and stale.items[0].paper_id == "old"
+
+    materialized.schedule(["p2"], include_neighbors=True)  # 既に予約済みなので重複しない
+    await materialized.drain()
+
+    assert compute.calls == [("p2", 4)]
+    assert repository.lists["p2"]["computed_at"] > old
+
+    await materialized.refresh("p2", include_neighbors=True)
+    await materialized.drain()
+    assert sorted(call[0] for call in compute.calls[2:]) == ["p2-n0", "p2-n1"]
+    assert "p2-n0" in repository.lists and "p2-n1" not in repository.lists
+
+
+@pytest.mark.asyncio
+async def test_related_route_serves_the_materialized_list_with_headers(monkeypatch):
+    """ルーターは related_service.get_materialized の結果を返し、計算時刻と hit/miss をヘッダーに載せる"""
+    from fastapi import FastAPI
+    from httpx import ASGITransport, AsyncClient
+
+    from app.core.firebase_auth import get_current_user
+    from app.modules.related import router as related_router
+
+    repository = FakeRelatedRepository()
+    materialized = RelatedListMaterializer(FakeCompute(), repository=repository, top_k=10, max_age=3600)
+    monkeypatch.setattr(related_router.related_service, "materialized", materialized)
+    monkeypatch.setattr(related_router.related_service, "db", object())
+    app = FastAPI()
+    app.include_router(related_router.router)
+    app.dependency_overrides[get_current_user] = lambda: {"uid": "u1"}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        first = await client.get("/papers/p1/related", params={"limit": 2})
+        second = await client.get("/papers/p1/related", params={"limit": 2})
+
+    assert [paper["paperId"] for paper in second.json()] == ["p1-n0", "p1-n1"]
+    assert first.headers["X-Related-Cache"] == "miss" and second.headers["X-Related-Cache"] == "hit"
+    assert second.headers["X-Related-Computed-At"] == repository.lists["p1"]["computed_at"].isoformat()
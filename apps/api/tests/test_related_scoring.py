@@ -0,0 +1,40 @@
+"""関連論文の再ランク（配列でのスコア計算）のテスト"""
+
+import random
+
+import pytest
+
+from app.modules.related.scoring import score_candidates
+
+
+def _reference(source, vectors, keyword_sets, citations, years):
+    """従来の1件ずつの計算"""
+    scored = []
+    for i, (vector, target, count, year) in enumerate(zip(vectors, keyword_sets, citations, years)):
+        keyword = len(source & target) / len(source | target) if source and target else 0.0
+        citation = min(max(count, 0), 100) / 100
+        scored.append((i, 0.6 * vector + 0.25 * keyword + 0.15 * citation, citation, year))
+    scored.sort(key=lambda x: (-x[1], -x[2], -x[3]))
+    return scored
+
+
+def test_array_scorer_matches_the_per_candidate_blend():
+    """スコアと並び順（final → citation → 年、同点は候補順）が従来の計算と一致する"""
+    rng = random.Random(3)
+    vocabulary = [f"w{i}" for i in range(12)]
+    source = set(rng.sample(vocabulary, 5))
+    keyword_sets = [set(rng.sample(vocabulary, rng.randint(0, 6))) for _ in range(40)]
+    vectors = [round(rng.uniform(0.5, 0.9), 1) for _ in keyword_sets]
+    citations = [rng.choice([-5, 0, 40, 100, 250]) for _ in keyword_sets]
+    years = [rng.choice([0, 2019, 2023]) for _ in keyword_sets]
+
+    scores = score_candidates(source, vectors, keyword_sets, citations, years)
+    expected = _reference(source, vectors, keyword_sets, citations, years)
+
+    assert [int(i) for i in scores.order] == [i for i, *_ in expected]
+    assert [float(scores.final[i]) for i, *_ in expected] == pytest.approx([final for _, final, _, _ in expected])
+
+
+def test_empty_source_keywords_and_candidates():
+    assert score_candidates(set(), [0.5], [{"a"}], [10], [2020]).keyword.tolist() == [0.0]
+    assert score_candidates({"a"}, [], [], [], []).order.tolist() == []
@@ -0,0 +1,92 @@
+"""Scholar 専用スレッドプール・期限・キャンセルのテスト"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.search.cache import SearchResultCache
+from app.core.search.ratelimit import TokenBucketLimiter
+from app.core.search.scholar import ScholarClient, StubScholarBackend
+
+
+def _make_client() -> ScholarClient:
+    client = ScholarClient(
+        cache=SearchResultCache(),
+        backend=StubScholarBackend(delay=0.05, total=100),
+    )
+    client._rate_limiter = TokenBucketLimiter(rate=1000.0, burst=10)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_deadline_returns_partial_results_and_stops_worker():
+    """期限切れ時は取得済みの結果を返し、ワーカーは次の next() 前に止まる"""
+    client = _make_client()
+    client.timeout = 0.18
+
+    results = await client._search("graph", 20)
+
+    assert 0 < len(results) < 20
+    assert results[0].title == "graph (stub result 1)"
+    stats = client.stats()
+    assert stats["timeouts"] == 1
+    assert stats["partial_results"] == 1
+
+    # 期限後にワーカーが解放され、次の検索が実行できる
+    client.timeout = 5.0
+    assert len(await client._search("graph", 2)) == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_search_stops_scrape():
+    """呼び出し元のキャンセルでスクレイピングも打ち切られる"""
+    client = _make_client()
+    client.executor = ThreadPoolExecutor(max_workers=1)
+
+    task = asyncio.create_task(client._search("graph", 50))
+    await asyncio.sleep(0.1)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    # 単一ワーカーが解放されていれば後続の検索はすぐ終わる
+    assert len(await asyncio.wait_for(client._search("graph", 1), timeout=1.0)) == 1
+    assert client.stats()["cancelled"] == 1
+
+
+class _FailingBackend:
+    def __init__(self, fail_after: int):
+        self.fail_after = fail_after
+
+    def search_pubs(self, query: str):
+        for i in range(self.fail_after):
+            yield {"bib": {"title": f"{query} {i + 1}"}}
+        raise RuntimeError("blocked by Scholar")
+
+
+@pytest.mark.asyncio
+async def test_partial_page_is_cached_only_briefly():
+    """期限切れで打ち切られた結果は完全な結果として長期キャッシュしない"""
+    client = _make_client()
+    client.timeout = 0.18
+
+    await client.search("graph", 20)
+
+    entry = client._cache.backend.get(client._cache.make_key("scholar", "graph", 20))
+    assert entry.ttl == client._cache.empty_ttl
+
+
+@pytest.mark.asyncio
+async def test_failed_scrape_raises_and_counts_toward_breaker():
+    """1件も取れずに失敗したら例外を送出し、ブレーカーの失敗として数える。途中までの結果は部分結果として返す"""
+    client = _make_client()
+    client._backend = _FailingBackend(fail_after=0)
+
+    with pytest.raises(RuntimeError):
+        await client.search("graph", 5)
+    assert client.circuit_breaker.stats()["error_rate"] == 1.0
+
+    client._backend = _FailingBackend(fail_after=2)
+    results = await client._search("graph", 5)
+    assert len(results) == 2 and results.partial
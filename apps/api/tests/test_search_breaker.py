@@ -0,0 +1,140 @@
+"""検索ソース別サーキットブレーカーのテスト"""
+
+import asyncio
+
+import httpx
+import pytest
+from tenacity import wait_none
+
+from app.core.search import ArxivClient, CircuitBreaker, CircuitOpenError
+from app.core.search.base import BaseSearchClient
+from app.core.search.cache import SearchResultCache
+from app.core.search.ratelimit import TokenBucketLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def _call(breaker: CircuitBreaker, clock: FakeClock, ok: bool = True, latency: float = 0.1):
+    async with breaker.guard():
+        clock.now += latency
+        if not ok:
+            raise RuntimeError("upstream 503")
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_on_error_rate_and_recovers_through_half_open():
+    """エラー率がしきい値を超えると即時拒否し、open 期間後の試行成功で closed に戻る"""
+    clock = FakeClock()
+    breaker = CircuitBreaker("arxiv", min_calls=4, failure_rate=0.5, open_seconds=30.0, clock=clock)
+
+    await _call(breaker, clock)
+    await _call(breaker, clock)
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await _call(breaker, clock, ok=False)
+    assert breaker.state == "open"
+    assert not breaker.allows_request()
+
+    with pytest.raises(CircuitOpenError):
+        await _call(breaker, clock)
+    assert breaker.stats()["rejected"] == 1
+
+    clock.now += 30.0
+    assert breaker.state == "half_open"
+    await _call(breaker, clock)
+    assert breaker.state == "closed"
+    assert breaker.health() == 1.0
+
+
+@pytest.mark.asyncio
+async def test_breaker_reopens_on_failed_probe_and_trips_on_slow_calls():
+    """half_open の試行が失敗すると再び open、低速な呼び出しが続いても open になる"""
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        "pubmed", min_calls=3, slow_call_seconds=5.0, slow_call_rate=0.6, open_seconds=10.0, clock=clock
+    )
+
+    for _ in range(3):
+        await _call(breaker, clock, latency=6.0)
+    assert breaker.state == "open"
+
+    clock.now += 10.0
+    with pytest.raises(RuntimeError):
+        await _call(breaker, clock, ok=False)
+    assert breaker.state == "open"
+    assert breaker.stats()["opened"] == 2
+
+
+class _QueuedClient(BaseSearchClient):
+    SOURCE = "arxiv"
+
+    async def _search(self, query, limit=10):
+        async with self._rate_limited():
+            await asyncio.sleep(0.01)
+        return []
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_queueing_is_not_timed_as_a_slow_call():
+    """レート制御の待ち行列で遅れただけの呼び出しは低速扱いにしない。open 中は待ち行列に並ぶ前に拒否する"""
+    breaker = CircuitBreaker("arxiv", min_calls=3, slow_call_seconds=0.1, slow_call_rate=0.5)
+    client = _QueuedClient(
+        cache=SearchResultCache(),
+        rate_limiter=TokenBucketLimiter(rate=10.0, burst=1, max_in_flight=1),
+        circuit_breaker=breaker,
+    )
+
+    # 6本目は約0.5秒待つが、上流リクエスト自体は 10ms
+    await asyncio.gather(*(client.search(f"q{i}", 5) for i in range(6)))
+
+    assert breaker.state == "closed"
+    assert breaker.stats()["calls"] == 6 and breaker.stats()["slow_rate"] == 0.0
+
+    breaker._open(breaker._clock())
+    with pytest.raises(CircuitOpenError):
+        await client.search("q-open", 5)
+
+
+class _ArxivPool:
+    """title 候補は 503、all 候補は成功を返す HTTP プール"""
+
+    def __init__(self):
+        self.requests: list[str] = []
+
+    def client_for(self, url):
+        return self
+
+    async def get(self, url, params=None, **kwargs):
+        self.requests.append(params["search_query"])
+        request = httpx.Request("GET", url)
+        if params["search_query"].startswith("ti:"):
+            return httpx.Response(503, request=request)
+        return httpx.Response(200, request=request, content=_FEED)
+
+
+_FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry><id>http://arxiv.org/abs/1234.5678v1</id><title>Graph networks</title></entry>
+</feed>"""
+
+
+@pytest.mark.asyncio
+async def test_arxiv_records_each_http_attempt_even_when_a_fallback_rescues_it(monkeypatch):
+    """arXiv はリトライ・候補の各 HTTP リクエストを1回ずつ記録し、フォールバックで救われた失敗も数える"""
+    monkeypatch.setattr(ArxivClient._fetch_with_retry.retry, "wait", wait_none())
+    breaker = CircuitBreaker("arxiv", min_calls=100)
+    pool = _ArxivPool()
+    client = ArxivClient(http_pool=pool, cache=SearchResultCache())
+    client.circuit_breaker = breaker
+
+    results = await client.search("graph networks", 5)
+
+    assert [r.external_ids["ArXiv"] for r in results] == ["1234.5678v1"]
+    assert len(pool.requests) == 4
+    assert breaker.stats()["calls"] == 4 and breaker.stats()["error_rate"] == 0.75
@@ -0,0 +1,117 @@
+"""検索結果キャッシュのテスト"""
+
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.core.search.base import PartialResults, SearchResult
+from app.core.search.breaker import CircuitBreaker
+from app.core.search.cache import InMemoryLRUBackend, SearchResultCache
+from app.modules.search import service as search_service_module
+from app.modules.search.service import SearchService
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_uses_normalized_query():
+    """空白・大文字小文字が違うだけのクエリはキャッシュヒットする"""
+    cache = SearchResultCache()
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        return ["result"]
+
+    await cache.get_or_load("arxiv", "Graph  Neural", 10, loader)
+    result = await cache.get_or_load("arxiv", "graph neural ", 10, loader)
+
+    assert result == ["result"]
+    assert calls == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_backend_evicts_oldest_entry():
+    """上限を超えると最も古いエントリが破棄される"""
+    cache = SearchResultCache(backend=InMemoryLRUBackend(max_entries=2))
+    cache.set("arxiv", "a", 10, ["a"])
+    cache.set("arxiv", "b", 10, ["b"])
+    cache.get("arxiv", "a", 10)
+    cache.set("arxiv", "c", 10, ["c"])
+
+    assert cache.get("arxiv", "a", 10) == ["a"]
+    assert cache.get("arxiv", "b", 10) is None
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_while_revalidating():
+    """TTL切れ直後は古い結果を返し、裏で再取得する"""
+    cache = SearchResultCache(source_ttls={"pubmed": 0.0}, stale_ttl=60.0)
+    cache.set("pubmed", "q", 5, ["old"])
+
+    async def loader():
+        return ["new"]
+
+    result = await cache.get_or_load("pubmed", "q", 5, loader)
+    await asyncio.sleep(0)
+
+    assert result == ["old"]
+    assert cache.stats()["stale_hits"] == 1
+    assert cache.stats()["refreshes"] == 1
+
+
+def test_merged_entry_ttl_checks_results_and_degraded_flag():
+    """統合結果 (results, meta) も中身を見て、空・部分結果・degraded は短い TTL にする"""
+    cache = SearchResultCache(source_ttls={"merged": 600.0}, empty_ttl=60.0)
+
+    assert cache.ttl_for("merged:auto", ([], {})) == 60.0
+    assert cache.ttl_for("merged:auto", (PartialResults(["a"]), {})) == 60.0
+    assert cache.ttl_for("merged:auto", (["a"], {"degraded": True})) == 60.0
+    assert cache.ttl_for("merged:auto", (["a"], {"degraded": False})) == 600.0
+
+
+class _Client:
+    def __init__(self, results=None, error=None):
+        self.results = results or []
+        self.error = error
+        self.circuit_breaker = CircuitBreaker("fake")
+
+    async def search(self, query, limit):
+        if self.error:
+            raise self.error
+        return self.results[:limit]
+
+
+class _NoCatalog:
+    async def add_results(self, results):
+        pass
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("source, strategy", [("auto", "sequential"), ("auto", "hedged"), ("all", "hedged")])
+async def test_merged_page_during_outage_is_cached_briefly(monkeypatch, source, strategy):
+    """一部ソースの障害中に作った統合ページは degraded として短い TTL でだけ保持する"""
+    cache = SearchResultCache(source_ttls={"merged": 600.0}, empty_ttl=60.0)
+    monkeypatch.setattr(search_service_module, "search_cache", cache)
+    monkeypatch.setattr(settings, "search_local_first", False)
+    monkeypatch.setattr(settings, "search_auto_strategy", strategy)
+    monkeypatch.setattr(settings, "search_hedge_delay", 0.0)
+    monkeypatch.setattr(settings, "citation_enrich_enabled", False)
+    service = SearchService()
+    service.catalog = _NoCatalog()
+    results = [
+        SearchResult(title=title, authors=[], source="arxiv")
+        for title in ("Graph attention networks", "Spectral clustering of citation graphs")
+    ]
+    service.arxiv = _Client(results=results)
+    service.pubmed = _Client(error=RuntimeError("upstream 503"))
+    service.scholar = _Client(error=RuntimeError("upstream 503"))
+
+    response = await service.search_papers("graph neural network", limit=10, source=source)
+
+    assert response.meta["degraded"] is True
+    assert len(response.results) == 2
+    entry = cache.backend.get(cache.make_key(f"merged:{source}", "graph neural network", 10))
+    assert entry.ttl == 60.0
@@ -0,0 +1,88 @@
+"""検索結果の近似重複統合のテスト"""
+
+from app.core.search import SearchResult
+from app.modules.search.dedupe import NearDuplicateDetector
+
+
+def test_merges_cross_source_variants_and_fills_metadata():
+    """表記揺れのある arXiv / Scholar の同一論文を1件に統合し、欠けた情報を補う"""
+    results = [
+        SearchResult(
+            title="Attention Is All You Need",
+            authors=["Ashish Vaswani", "Noam Shazeer"],
+            year=2017,
+            abstract="short",
+            external_ids={"ArXiv": "1706.03762"},
+            source="arxiv",
+        ),
+        SearchResult(
+            title="Attention is all you need.",
+            authors=["A Vaswani"],
+            year=2017,
+            abstract="The dominant sequence transduction models are based on recurrent networks.",
+            pdf_url="https://example.org/attention.pdf",
+            source="scholar",
+        ),
+        SearchResult(
+            title="Attention Is All You Need",
+            authors=["Someone Else"],
+            year=2021,
+            source="scholar",
+        ),
+    ]
+
+    merged, merged_count = NearDuplicateDetector().merge(results)
+
+    assert merged_count == 1
+    assert len(merged) == 2
+    paper = merged[0]
+    assert paper.source == "arxiv"
+    assert paper.external_ids == {"ArXiv": "1706.03762"}
+    assert paper.abstract.startswith("The dominant")
+    assert paper.pdf_url == "https://example.org/attention.pdf"
+    assert paper.authors == ["Ashish Vaswani", "Noam Shazeer"]
+    # 元の結果（キャッシュ共有）は変更しない
+    assert results[0].abstract == "short"
+
+
+def test_conflicting_ids_are_not_merged():
+    """タイトルが似ていても同種の外部IDが異なれば別論文として残す"""
+    results = [
+        SearchResult(title="Deep Residual Learning Part I", authors=["K He"], external_ids={"DOI": "10.1/a"}, source="pubmed"),
+        SearchResult(title="Deep Residual Learning Part II", authors=["K He"], external_ids={"DOI": "10.1/b"}, source="pubmed"),
+    ]
+
+    merged, merged_count = NearDuplicateDetector().merge(results)
+
+    assert merged_count == 0
+    assert len(merged) == 2
+
+
+def test_numbered_parts_and_wording_variants_are_not_merged():
+    """番号だけが違う続編や、語の違う別タイトルは同じ著者・年でも統合しない"""
+    pairs = [
+        ("Deep Learning for Medical Image Segmentation: Part I", "Deep Learning for Medical Image Segmentation: Part II"),
+        ("Benchmarking Protein Folding Models 1", "Benchmarking Protein Folding Models 2"),
+        ("Language Models Are Few-Shot Learners", "Language Models Are Not Few-Shot Learners"),
+        ("A survey on graph neural networks", "A survey of graph neural networks"),
+    ]
+    detector = NearDuplicateDetector()
+    for left, right in pairs:
+        results = [
+            SearchResult(title=left, authors=["Jane Doe"], year=2020, source="arxiv"),
+            SearchResult(title=right, authors=["Jane Doe"], year=2020, source="scholar"),
+        ]
+        assert detector.find_groups(results) == [[0], [1]], (left, right)
+
+
+def test_groups_do_not_chain_through_a_bridging_result():
+    """A≈B かつ B≈C でも、A と C が別論文なら1グループにまとめない"""
+    results = [
+        SearchResult(title="Graph Neural Networks for Drug Discovery", authors=["Ann Lee"], year=2019, source="arxiv"),
+        SearchResult(title="Graph Neural Networks for Drug Discovery", authors=[], source="scholar"),
+        SearchResult(title="Graph Neural Networks for Drug Discovery", authors=["Bob Kim"], year=2023, source="pubmed"),
+    ]
+
+    groups = NearDuplicateDetector().find_groups(results)
+
+    assert groups == [[0, 1], [2]]
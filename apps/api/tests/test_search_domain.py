@@ -0,0 +1,91 @@
+"""検索ドメイン判定と分野別ソース収量のテスト"""
+
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.core.search.base import SearchResult
+from app.core.search.breaker import CircuitBreaker, CircuitOpenError
+from app.modules.search.domain import DomainClassifier, SourceYieldTable
+from app.modules.search.service import SearchService
+
+
+def test_classifier_scores_overlapping_phrases_and_tokens():
+    """重なり合うフレーズ・接頭辞関係のフレーズも従来の部分一致と同じく全て数える"""
+    classifier = DomainClassifier({
+        "a": {"single": {"model"}, "phrases": {"deep learning", "deep learning theory"}},
+        "b": {"single": {"theory"}, "phrases": {"learning theory"}},
+    })
+
+    scores = classifier.score("Deep Learning Theory of model")
+
+    assert scores == {"a": 2 + 2 + 1, "b": 2 + 1}
+    assert classifier.classify("deep learning theory") == "a"
+    assert classifier.classify("unrelated words") == "general"
+
+
+def test_yield_table_reorders_sources_after_repeated_misses():
+    """既定順の第1候補が結果を返さない状態が続くと、収量の高いソースが先頭に来る"""
+    table = SourceYieldTable(prior_weight=2.0)
+    default_order = ["arxiv", "scholar", "pubmed"]
+    assert table.order("math", default_order) == default_order
+
+    for _ in range(5):
+        table.record("math", "arxiv", returned=0, limit=10)
+        table.record("math", "scholar", returned=10, limit=10)
+        table.record_first_choice("math", satisfied=False)
+
+    assert table.order("math", default_order)[0] == "scholar"
+    assert table.order("cs", default_order) == default_order
+    stats = table.stats()
+    assert stats["first_choice"] == {"searches": 5, "satisfied": 0, "rate": 0.0}
+    assert stats["sources"]["math:scholar"]["avg_fill"] == 1.0
+
+
+class _FakeClient:
+    def __init__(self, results=None, error=None, delay=0.0):
+        self.results = results or []
+        self.error = error
+        self.delay = delay
+        self.circuit_breaker = CircuitBreaker("fake")
+
+    async def search(self, query, limit):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.results[:limit]
+
+
+class _NoCatalog:
+    async def add_results(self, results):
+        pass
+
+
+def _results(source: str, count: int) -> list[SearchResult]:
+    return [SearchResult(title=f"{source} paper {i}", authors=[], source=source) for i in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_failed_and_cancelled_sources_are_not_recorded_as_zero_yield(monkeypatch):
+    """障害（例外・ブレーカー拒否）やヘッジで打ち切られたソースは収量の標本にしない"""
+    monkeypatch.setattr(settings, "search_local_first", False)
+    service = SearchService()
+    service.catalog = _NoCatalog()
+    service.arxiv = _FakeClient(error=CircuitOpenError("arxiv", 30.0))
+    service.pubmed = _FakeClient(results=_results("pubmed", 5))
+    service.scholar = _FakeClient(results=_results("scholar", 5), delay=1.0)
+
+    monkeypatch.setattr(settings, "search_auto_strategy", "sequential")
+    await service._fetch_results("graph neural network", 5, "auto")
+    before = service.source_yields.stats()["sources"]
+    assert not any(key.endswith(":arxiv") for key in before)
+
+    monkeypatch.setattr(settings, "search_auto_strategy", "hedged")
+    monkeypatch.setattr(settings, "search_hedge_delay", 0.0)
+    _, meta = await service._fetch_results("graph neural network", 5, "auto")
+    after = service.source_yields.stats()["sources"]
+    assert meta["sources"]["scholar"]["status"] == "cancelled"
+    assert not any(key.endswith(":arxiv") for key in after)
+    changed = {key for key in after if key not in before or after[key]["attempts"] != before[key]["attempts"]}
+    assert {key.split(":")[1] for key in changed} == {"pubmed"}
@@ -0,0 +1,85 @@
+"""auto モードのヘッジ付き並列検索のテスト"""
+
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.core.search.base import SearchResult
+from app.core.search.breaker import CircuitBreaker
+from app.modules.search.service import SearchService
+
+
+class _FakeClient:
+    def __init__(self, name, count=0, delay=0.0, error=None):
+        self.name = name
+        self.count = count
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.circuit_breaker = CircuitBreaker(name)
+
+    async def search(self, query, limit):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return [
+            SearchResult(title=f"{self.name} result number {i}", authors=[], source=self.name)
+            for i in range(min(self.count, limit))
+        ]
+
+
+def _service(monkeypatch, hedge_delay, primary, pubmed, scholar) -> SearchService:
+    monkeypatch.setattr(settings, "search_hedge_delay", hedge_delay)
+    service = SearchService()
+    service._plan_auto_sources = lambda query: ("cs", ["arxiv", "pubmed", "scholar"])
+    service.arxiv, service.pubmed, service.scholar = primary, pubmed, scholar
+    return service
+
+
+@pytest.mark.asyncio
+async def test_full_primary_does_not_start_secondaries(monkeypatch):
+    """優先ソースが limit 件返したら残りのソースは起動しない"""
+    pubmed, scholar = _FakeClient("pubmed", 5), _FakeClient("scholar", 5)
+    service = _service(monkeypatch, 10.0, _FakeClient("arxiv", 5), pubmed, scholar)
+
+    results, meta = await service._search_auto_hedged("graph", 5)
+
+    assert len(results) == 5 and {r.source for r in results} == {"arxiv"}
+    assert pubmed.calls == 0 and scholar.calls == 0
+    assert meta["sources"]["arxiv"]["status"] == "ok"
+    assert meta["sources"]["pubmed"]["status"] == meta["sources"]["scholar"]["status"] == "not_started"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("primary_kwargs", [{"count": 2}, {"error": RuntimeError("503")}])
+async def test_short_or_failed_primary_starts_secondaries_without_waiting(monkeypatch, primary_kwargs):
+    """優先ソースが不足・失敗で返ったら、ヘッジ遅延を待たずに残りのソースを起動する"""
+    primary = _FakeClient("arxiv", **primary_kwargs)
+    service = _service(monkeypatch, 10.0, primary, _FakeClient("pubmed", 2), _FakeClient("scholar", 3))
+
+    results, meta = await asyncio.wait_for(service._search_auto_hedged("graph", 5), timeout=2.0)
+
+    assert len(results) == 5 + (0 if primary.error else 2)
+    assert meta["sources"]["pubmed"]["status"] == meta["sources"]["scholar"]["status"] == "ok"
+    assert meta["sources"]["scholar"]["started_ms"] < 1000
+    assert meta["sources"]["arxiv"]["status"] == ("error" if primary.error else "ok")
+
+
+@pytest.mark.asyncio
+async def test_hedge_delay_launches_secondaries_and_cancels_slow_primary(monkeypatch):
+    """優先ソースが遅いとヘッジ遅延で残りを起動し、limit 件そろったら遅いタスクはキャンセルする"""
+    slow_scholar = _FakeClient("scholar", 5, delay=5.0)
+    service = _service(
+        monkeypatch, 0.05, _FakeClient("arxiv", 5, delay=5.0), _FakeClient("pubmed", 5, delay=0.01), slow_scholar
+    )
+
+    results, meta = await asyncio.wait_for(service._search_auto_hedged("graph", 5), timeout=2.0)
+
+    assert {r.source for r in results} == {"pubmed"}
+    sources = meta["sources"]
+    assert 50 <= sources["pubmed"]["started_ms"] < 1000
+    assert sources["arxiv"]["status"] == sources["scholar"]["status"] == "cancelled"
+    assert slow_scholar.calls == 1
+    assert meta["degraded"] is False
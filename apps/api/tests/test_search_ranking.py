@@ -0,0 +1,29 @@
+"""BM25 ランキングのテスト"""
+
+from app.core.search import SearchResult
+from app.modules.search.ranking import BM25Ranker
+
+
+def _result(title: str, abstract: str = "") -> SearchResult:
+    return SearchResult(title=title, authors=[], abstract=abstract, source="arxiv")
+
+
+def test_bm25_uses_abstract_and_weights_title():
+    """アブストラクトの一致も評価し、同じ語ならタイトル側の一致を重く数える"""
+    results = [
+        _result("Unrelated work", "nothing to see here"),
+        _result("A survey", "We study protein folding with graph networks."),
+        _result("Protein folding with graph networks", "A survey."),
+    ]
+
+    scores = BM25Ranker().score("protein folding", results)
+
+    assert scores[0] == 0.0
+    assert scores[1] > 0.0
+    assert scores[2] > scores[1]
+
+
+def test_bm25_ignores_stopword_only_query():
+    """機能語だけのクエリは全件0点になる"""
+    scores = BM25Ranker().score("the of and", [_result("The art of war")])
+    assert scores.tolist() == [0.0]
@@ -0,0 +1,70 @@
+"""検索ソース別トークンバケットのテスト"""
+
+import asyncio
+
+import pytest
+
+from app.core.search.ratelimit import TokenBucketLimiter
+
+
+@pytest.mark.asyncio
+async def test_waiting_requests_are_served_round_robin_per_user():
+    """大量に並んだユーザーがいても他ユーザーのリクエストが間に入る"""
+    limiter = TokenBucketLimiter(rate=200.0, burst=1)
+    order: list[str] = []
+
+    async def request(user: str):
+        async with limiter.slot(user):
+            order.append(user)
+
+    await limiter.acquire("warmup")
+    limiter.release()
+    await asyncio.gather(
+        *[request("heavy") for _ in range(4)],
+        request("light"),
+    )
+
+    assert order.index("light") <= 1
+    stats = limiter.stats()
+    assert stats["acquired"] == 6
+    assert stats["queue_depth"] == 0
+    assert stats["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_max_in_flight_and_cancelled_waiter():
+    """同時実行数の上限を守り、キャンセルされた待機者は枠を消費しない"""
+    limiter = TokenBucketLimiter(rate=1000.0, burst=5, max_in_flight=1)
+    release = asyncio.Event()
+
+    async def holder():
+        async with limiter.slot("a"):
+            await release.wait()
+
+    first = asyncio.create_task(holder())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(limiter.acquire("b"))
+    await asyncio.sleep(0)
+    assert limiter.stats()["queue_depth"] == 1
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    release.set()
+    await first
+
+    await asyncio.wait_for(limiter.acquire("c"), timeout=1.0)
+    stats = limiter.stats()
+    assert stats["cancelled"] == 1
+    assert stats["in_flight"] == 1
+
+
+def test_published_limit_keeps_burst_within_window():
+    """バースト込みでも1秒窓あたりの公開上限を超えない補充レートになる"""
+    limiter = TokenBucketLimiter.for_published_limit(10, per=1.0, burst=3)
+    assert limiter.burst == 3
+    assert limiter.burst + limiter.rate - 1 <= 10
+
+    no_key = TokenBucketLimiter.for_published_limit(3, per=1.0, burst=3)
+    assert no_key.burst == 1
+    assert no_key.rate == 3
@@ -0,0 +1,135 @@
+"""検索再整理（ローカルクラスタリング・LLM 結果キャッシュ）のテスト"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.modules.search.recluster import ReclusterSearchService
+from app.modules.search.schemas import SearchResultItem
+
+
+def _item(paper_id: str, title: str, abstract: str) -> SearchResultItem:
+    return SearchResultItem(
+        external_id=paper_id,
+        source="arxiv",
+        title=title,
+        authors=[],
+        year=2020,
+        venue="",
+        abstract=abstract,
+        doi=None,
+        arxiv_id=None,
+        pdf_url=None,
+        citation_count=None,
+    )
+
+
+ITEMS = [
+    _item("g1", "Graph neural networks for molecules", "message passing over molecular graph nodes"),
+    _item("g2", "Message passing graph networks", "graph nodes exchange messages for molecular property"),
+    _item("g3", "Molecular graph representation", "graph message passing predicts molecular property"),
+    _item("d1", "Denoising diffusion image models", "diffusion sampling removes noise from image"),
+    _item("d2", "Score based diffusion sampling", "noise schedule for diffusion image generation"),
+    _item("d3", "Fast diffusion image sampling", "fewer denoising steps for diffusion noise image"),
+    _item("x1", "Untitled", ""),
+]
+
+
+class _NoGemini:
+    model = None
+    model_name = "none"
+
+
+@pytest.mark.asyncio
+async def test_local_engine_groups_topics_and_picks_central_hub():
+    """トピックごとにクラスタ化し、ハブは重心に最も近い論文、語を持たない論文は uncertain に置く"""
+    service = ReclusterSearchService(_NoGemini())
+
+    response = await service.recluster_from_results(
+        query="deep learning", results=ITEMS, group_target=2, engine="local"
+    )
+
+    groups = [
+        {c.hub_paper.paper_id} | {p.paper_id for p in c.children + c.related}
+        for c in response.clusters
+    ]
+    assert sorted(groups, key=sorted) == [{"d1", "d2", "d3"}, {"g1", "g2", "g3"}]
+    assert [p.paper_id for p in response.uncertain_items] == ["x1"]
+    assert all(c.label and c.label != "その他" for c in response.clusters)
+    assert response.meta["engine"] == "local"
+    assert response.meta["fallback_used"] is False
+
+
+@pytest.mark.asyncio
+async def test_llm_unavailable_falls_back_to_local_clusters():
+    """Gemini が使えない場合も先頭1件ではなくローカルのクラスタを返す"""
+    service = ReclusterSearchService(_NoGemini())
+
+    response = await service.recluster_from_results(query="q", results=ITEMS, group_target=3)
+
+    assert len(response.clusters) >= 2
+    assert response.meta["engine"] == "local"
+    assert response.meta["fallback_used"] is True
+
+
+class _CountingModel:
+    def __init__(self):
+        self.prompts: list[str] = []
+
+    async def generate_content_async(self, prompt, generation_config=None):
+        self.prompts.append(prompt)
+        hub = {"paper_id": "g1", "title": "Graph neural networks for molecules", "source": "arxiv"}
+        text = json.dumps({"query": "q", "clusters": [{"cluster_id": "c1", "label": "l", "summary": "s", "hub_paper": hub}]})
+        return SimpleNamespace(text=text, usage_metadata=SimpleNamespace(prompt_token_count=123, candidates_token_count=45))
+
+
+class _FakeGemini:
+    model_name = "fake"
+
+    def __init__(self):
+        self.model = _CountingModel()
+
+
+@pytest.mark.asyncio
+async def test_llm_result_is_cached_by_result_set_and_prompt_is_compacted():
+    """同じクエリ・同じ論文並びの再整理は LLM を呼ばずに返し、プロンプトは空欄省略・要約切り詰め済み"""
+    gemini = _FakeGemini()
+    service = ReclusterSearchService(gemini)
+    long_item = _item("long", "Long abstract paper", "word " * 5000)
+
+    first = await service.recluster_from_results(query="Graph  NN", results=ITEMS + [long_item])
+    second = await service.recluster_from_results(query="graph nn", results=ITEMS + [long_item])
+    reordered = await service.recluster_from_results(query="graph nn", results=[long_item] + ITEMS)
+
+    assert len(gemini.model.prompts) == 2
+    assert first.meta["cache_hit"] is False and second.meta["cache_hit"] is True
+    assert reordered.meta["cache_hit"] is False
+    assert second.clusters[0].hub_paper.paper_id == "g1"
+    assert first.meta["prompt_tokens"] == 123
+    assert first.meta["prompt_tokens_est"] < 2500
+
+    papers = ReclusterSearchService.compact_candidates(ITEMS + [long_item], token_budget=400)
+    assert "abstract" not in papers[6]
+    assert papers[7]["abstract"].endswith("…")
+    assert len(papers[7]["abstract"]) <= 50 * 4 + 1
+
+
+def test_id_less_results_get_the_same_recluster_cache_key_every_request():
+    """外部IDの無い結果（Scholar など）も、同じ検索結果なら毎回同じキャッシュキーになる"""
+    from app.core.search.base import SearchResult
+    from app.modules.search.service import SearchService
+
+    service = SearchService()
+    results = [
+        SearchResult(title="Graph Neural Networks", authors=[], year=2020, source="scholar"),
+        SearchResult(title="Diffusion models", authors=[], year=2021, source="scholar"),
+        SearchResult(title="Attention", authors=[], external_ids={"ArXiv": "1706.03762"}, source="arxiv"),
+    ]
+
+    first = [service._convert_to_item(r) for r in results]
+    second = [service._convert_to_item(r) for r in results]
+
+    assert [item.external_id for item in first] == [item.external_id for item in second]
+    assert first[0].external_id != first[1].external_id
+    assert ReclusterSearchService.cache_key("q", first, 4, True) == ReclusterSearchService.cache_key("q", second, 4, True)
@@ -0,0 +1,51 @@
+"""検索 single-flight 集約のテスト"""
+
+import asyncio
+
+import pytest
+
+from app.core.search.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_share_one_upstream_call():
+    """同時に来た同一検索は上流呼び出し1回にまとまり、小さいlimitは先頭を切り出す"""
+    flight = SingleFlight()
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return list(range(10))
+
+    results = await asyncio.gather(
+        flight.do("arxiv", "LLM", 10, loader),
+        flight.do("arxiv", "llm ", 10, loader),
+        flight.do("arxiv", "LLM", 3, loader),
+    )
+
+    assert calls == 1
+    assert results[0] == list(range(10))
+    assert results[2] == [0, 1, 2]
+    stats = flight.stats()
+    assert stats["collapsed"] == 2
+    assert stats["collapsed_by_larger_limit"] == 1
+    assert stats["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_call():
+    """1人の呼び出し元がキャンセルされても他の待機者は結果を受け取る"""
+    flight = SingleFlight()
+
+    async def loader():
+        await asyncio.sleep(0.01)
+        return ["ok"]
+
+    first = asyncio.create_task(flight.do("pubmed", "q", 5, loader))
+    second = asyncio.create_task(flight.do("pubmed", "q", 5, loader))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == ["ok"]
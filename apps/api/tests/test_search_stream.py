@@ -0,0 +1,110 @@
+"""検索結果ストリーム（NDJSON / SSE）のテスト"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.core.config import settings
+from app.core.firebase_auth import get_current_user
+from app.core.search.base import SearchResult
+from app.core.search.breaker import CircuitBreaker
+from app.modules.search import router as search_router
+from app.modules.search.service import SearchService
+
+
+class _FakeClient:
+    def __init__(self, titles=(), delay=0.0, error=None):
+        self.titles = titles
+        self.delay = delay
+        self.error = error
+        self.circuit_breaker = CircuitBreaker("fake")
+
+    async def search(self, query, limit):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return [SearchResult(title=title, authors=[], source="fake") for title in self.titles][:limit]
+
+
+class _NoCatalog:
+    async def add_results(self, results):
+        pass
+
+
+async def _no_likes(uid):
+    return set()
+
+
+def _service(monkeypatch, service: SearchService, pubmed_error=None) -> SearchService:
+    monkeypatch.setattr(settings, "search_local_first", False)
+    monkeypatch.setattr(settings, "citation_enrich_enabled", False)
+    monkeypatch.setattr(service, "catalog", _NoCatalog())
+    monkeypatch.setattr(service, "_get_liked_ids", _no_likes)
+    monkeypatch.setattr(service, "_plan_auto_sources", lambda query: ("cs", ["arxiv", "pubmed", "scholar"]))
+    monkeypatch.setattr(service, "arxiv", _FakeClient(["Graph attention networks", "Graph convolution"]))
+    monkeypatch.setattr(
+        service, "pubmed", _FakeClient(["Graph attention networks", "Protein graphs"], delay=0.05, error=pubmed_error)
+    )
+    monkeypatch.setattr(service, "scholar", _FakeClient(["Graph transformers"], delay=0.1))
+    return service
+
+
+@pytest.mark.asyncio
+async def test_frames_arrive_as_batch_delta_pairs_then_final(monkeypatch):
+    """ソースの到着順に batch → delta を返し、最後に統合結果の final を1回だけ返す"""
+    service = _service(monkeypatch, SearchService())
+
+    frames = [frame async for frame in service.stream_search_papers("graph", limit=10)]
+
+    assert [frame["type"] for frame in frames] == ["batch", "delta"] * 3 + ["final"]
+    assert [frame["source"] for frame in frames[:-1:2]] == ["arxiv", "pubmed", "scholar"]
+    pubmed_batch, pubmed_delta = frames[2], frames[3]
+    assert [item["title"] for item in pubmed_batch["items"]] == ["Protein graphs"]
+    assert pubmed_delta["duplicates"] == 1 and len(pubmed_delta["added"]) == 1
+    final = frames[-1]
+    assert final["total"] == 4 and final["meta"]["strategy"] == "stream:auto"
+    assert [item["external_id"] for item in final["results"]] == frames[-2]["order"]
+
+
+@pytest.mark.asyncio
+async def test_source_error_still_ends_with_final(monkeypatch):
+    """ソースが失敗しても空の batch / delta を返し、ストリームは final で終わる"""
+    service = _service(monkeypatch, SearchService(), pubmed_error=RuntimeError("upstream 503"))
+
+    frames = [frame async for frame in service.stream_search_papers("graph", limit=10)]
+
+    assert [frame["type"] for frame in frames] == ["batch", "delta"] * 3 + ["final"]
+    assert frames[2]["source"] == "pubmed" and frames[2]["items"] == []
+    assert frames[-1]["total"] == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "fmt, media_type",
+    [("ndjson", "application/x-ndjson"), ("sse", "text/event-stream")],
+)
+async def test_stream_route_encodes_frames_for_the_requested_format(monkeypatch, fmt, media_type):
+    """format=ndjson は1行1フレーム、format=sse は event / data のイベントとして返す"""
+    _service(monkeypatch, search_router.search_service)
+    app = FastAPI()
+    app.include_router(search_router.router, prefix="/search")
+    app.dependency_overrides[get_current_user] = lambda: {"uid": "u1"}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/search/papers/stream", params={"q": "graph", "format": fmt})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(media_type)
+    assert response.headers["cache-control"] == "no-cache"
+    if fmt == "ndjson":
+        frames = [json.loads(line) for line in response.text.splitlines()]
+        types = [frame["type"] for frame in frames]
+    else:
+        events = [chunk for chunk in response.text.split("\n\n") if chunk]
+        types = [event.split("\n")[0].removeprefix("event: ") for event in events]
+        payloads = [json.loads(event.split("\n")[1].removeprefix("data: ")) for event in events]
+        assert [payload["type"] for payload in payloads] == types
+    assert types == ["batch", "delta"] * 3 + ["final"]
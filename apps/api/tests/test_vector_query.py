@@ -0,0 +1,44 @@
+"""近傍検索のマルチクエリバッチのテスト"""
+
+import asyncio
+
+import pytest
+
+from app.core.vector_search import InMemoryIndexEndpoint, VectorQueryClient
+
+
+class FailingEndpoint:
+    def find_neighbors(self, deployed_index_id, queries, num_neighbors):
+        raise RuntimeError("deadline exceeded")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_share_one_multi_query_call():
+    """同時の検索は1回の find_neighbors にまとまり、各呼び出し元には自分の件数だけ返る"""
+    endpoint = InMemoryIndexEndpoint({"x": [1.0, 0.0], "y": [0.0, 1.0], "xy": [0.7, 0.7]})
+    client = VectorQueryClient(endpoint=endpoint, max_batch_size=8, max_wait=0.02, deployed_index_id="idx")
+
+    near_x, near_y = await asyncio.gather(
+        client.find_neighbors([1.0, 0.1], 1),
+        client.find_neighbors([0.1, 1.0], 3),
+    )
+
+    assert [n.id for n in near_x] == ["x"]
+    assert [n.id for n in near_y] == ["y", "xy", "x"]
+    assert endpoint.calls == [("idx", 2, 3)]  # num_neighbors はバッチ内の最大値
+    assert client.stats()["avg_batch_size"] == 2.0
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_raises_for_every_caller():
+    """API 失敗時は同じバッチの全呼び出し元に例外を返す"""
+    client = VectorQueryClient(endpoint=FailingEndpoint(), max_wait=0.01)
+
+    results = await asyncio.gather(
+        client.find_neighbors([1.0], 5),
+        client.find_neighbors([2.0], 5),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert client.stats()["errors"] == 1
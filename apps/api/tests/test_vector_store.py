@@ -0,0 +1,125 @@
+"""ローカルベクトルストア（NumPy）のテスト"""
+
+import logging
+import os
+
+import numpy as np
+import pytest
+
+from app.core import vector_store as vector_store_module
+from app.core.vector_store import NumpyVectorStore, VectorRecord
+
+
+def _records(rng: np.random.Generator, count: int, dims: int = 16) -> list[VectorRecord]:
+    vectors = rng.normal(size=(count, dims))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return [
+        VectorRecord(
+            id=f"c{i}",
+            vector=vectors[i].tolist(),
+            restricts={"paper_id": f"p{i % 10}", "owner_uid": "u1" if i % 2 else "u2"},
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_exact_top_k_matches_brute_force_with_restricts():
+    """全件の内積と同じ順位を返し、namespace 制限は AND で効く"""
+    rng = np.random.default_rng(0)
+    records = _records(rng, 3000)
+    store = NumpyVectorStore(block_rows=512)
+    store.upsert(records)
+    query = records[42].vector
+
+    neighbors = await store.query(query, 5)
+    expected = sorted(records, key=lambda r: -float(np.dot(r.vector, query)))[:5]
+    assert [n.id for n in neighbors] == [r.id for r in expected]
+    assert neighbors[0].id == "c42" and neighbors[0].distance == pytest.approx(1.0, abs=1e-5)
+
+    restricted = await store.query(query, 50, restricts={"paper_id": ["p2", "p3"], "owner_uid": ["u1"]})
+    assert restricted and all(int(n.id[1:]) % 10 == 3 for n in restricted)
+    assert await store.query(query, 5, restricts={"paper_id": ["unknown"]}) == []
+
+
+def test_float16_store_persists_and_reloads(tmp_path):
+    """float16 でも順位はほぼ同じで、別インスタンス（別プロセス相当）がファイルから読み直せる"""
+    rng = np.random.default_rng(1)
+    records = _records(rng, 500)
+    path = str(tmp_path / "vectors.npz")
+    writer = NumpyVectorStore(path=path, dtype="float16")
+    writer.upsert(records)
+    writer.upsert([VectorRecord(id="c0", vector=records[1].vector, restricts={"paper_id": "p9"})])
+
+    reader = NumpyVectorStore(path=path, dtype="float16")
+    assert len(reader) == 500
+    top = reader.query_sync(records[1].vector, 2)
+    assert {n.id for n in top} == {"c0", "c1"}
+    assert reader.query_sync(records[1].vector, 5, restricts={"owner_uid": ["u1"]})[0].id == "c1"
+    assert reader.stats()["bytes"] == 500 * 16 * 2
+
+
+def test_upserts_append_to_log_and_compact_into_snapshot(tmp_path):
+    """登録は追記ログに足し（.npz は書き直さない）、ログが本体より大きくなったらスナップショットにまとめる"""
+    rng = np.random.default_rng(2)
+    records = _records(rng, 40)
+    path = str(tmp_path / "vectors.npz")
+    writer = NumpyVectorStore(path=path, compact_min_records=16)
+    writer.upsert(records[:20])
+    assert writer.stats()["snapshots"] == 1 and os.path.exists(path)
+    snapshot_mtime = os.stat(path).st_mtime_ns
+
+    reader = NumpyVectorStore(path=path)
+    for i in range(20, 30):
+        writer.upsert([records[i]])
+    assert os.stat(path).st_mtime_ns == snapshot_mtime
+    assert writer.stats()["log_appends"] == 10 and os.path.exists(f"{path}.1.log")
+
+    # 読み手は前回の続きからログの増分だけを反映する
+    assert reader.query_sync(records[25].vector, 1)[0].id == "c25"
+    assert len(reader) == 30 and reader.stats()["log_records"] == 10
+
+    writer.upsert(records[30:])
+    assert writer.stats()["snapshots"] == 2
+    assert os.path.exists(f"{path}.2.log") is False and os.path.exists(f"{path}.1.log") is False
+    assert reader.query_sync(records[35].vector, 1)[0].id == "c35"
+    assert len(reader) == 40 and reader.stats()["log_records"] == 0
+
+
+def test_reader_skips_a_partially_written_log_frame(tmp_path):
+    """書き込み途中のフレームは読まず、揃ってから反映する"""
+    rng = np.random.default_rng(3)
+    records = _records(rng, 3)
+    path = str(tmp_path / "vectors.npz")
+    NumpyVectorStore(path=path).upsert(records[:2])
+    log_path = f"{path}.0.log"
+    # 2件目のフレームが途中まで書かれた状態
+    NumpyVectorStore(path=str(tmp_path / "other.npz")).upsert([records[2]])
+    with open(str(tmp_path / "other.npz.0.log"), "rb") as f:
+        second = f.read()
+    with open(log_path, "ab") as f:
+        f.write(second[: len(second) // 2])
+
+    reader = NumpyVectorStore(path=path)
+    assert len(reader) == 2 and reader.stats()["log_records"] == 2
+    with open(log_path, "ab") as f:
+        f.write(second[len(second) // 2 :])
+    assert reader.query_sync(records[2].vector, 1)[0].id == "c2"
+    assert len(reader) == 3
+
+
+def test_local_backend_without_path_warns(monkeypatch, caplog):
+    """Worker と API が別プロセスなのに保存先が無いと、API のストアは空のままなので警告する"""
+    monkeypatch.setattr(vector_store_module.settings, "vector_store_backend", "local")
+    monkeypatch.setattr(vector_store_module.settings, "vector_store_path", "")
+    monkeypatch.setattr(vector_store_module.settings, "run_ingest_locally", False)
+    with caplog.at_level(logging.WARNING, logger=vector_store_module.__name__):
+        store = vector_store_module.create_vector_store()
+    assert isinstance(store, NumpyVectorStore)
+    assert "VECTOR_STORE_PATH" in caplog.text
+
+    caplog.clear()
+    monkeypatch.setattr(vector_store_module.settings, "run_ingest_locally", True)
+    with caplog.at_level(logging.WARNING, logger=vector_store_module.__name__):
+        vector_store_module.create_vector_store()
+    assert caplog.text == ""
@@ -2,13 +2,13 @@
 
 import logging
 import vertexai
-from vertexai.language_models import TextEmbeddingInput, TextEmbeddingModel
 from app.core.config import settings
+from app.core.embedding import embedding_service
 
 logger = logging.getLogger(__name__)
 
 # モデル定数
-MODEL_NAME = "text-embedding-004"
+MODEL_NAME = embedding_service.model_name
 BATCH_SIZE = 5  # Vertex AIの制限に合わせて調整
 
 def generate_embeddings(chunks: list[dict]) -> list[dict]:
@@ -26,8 +26,6 @@ def generate_embeddings(chunks: list[dict]) -> list[dict]:
     # Vertex AI初期化 (Worker起動時に一度だけやるのがベストだがここでも可)
     vertexai.init(project=settings.gcp_project_id, location=settings.gcp_region)
     
-    model = TextEmbeddingModel.from_pretrained(MODEL_NAME)
-    
     # バッチ処理
     enriched_chunks = []
     
@@ -35,19 +33,18 @@ def generate_embeddings(chunks: list[dict]) -> list[dict]:
         batch = chunks[i:i + BATCH_SIZE]
         texts = [chunk["text"] for chunk in batch]
         
-        # Task Type: RETRIEVAL_DOCUMENT
-        inputs = [TextEmbeddingInput(text=t, task_type="RETRIEVAL_DOCUMENT") for t in texts]
-        
+        # Task Type: RETRIEVAL_DOCUMENT（API と共有のキャッシュにあるチャンクは再計算しない）
         try:
-            embeddings = model.get_embeddings(inputs)
+            embeddings = embedding_service.embed_batch_sync(texts, task_type="RETRIEVAL_DOCUMENT")
             
-            for j, embedding in enumerate(embeddings):
-                batch[j]["embedding"] = embedding.values
+            for j, values in enumerate(embeddings):
+                batch[j]["embedding"] = values
                 enriched_chunks.append(batch[j])
                 
         except Exception as e:
             logger.error(f"埋め込み生成エラー (batch {i}): {e}")
             raise e
 
-    logger.info(f"埋め込み生成完了")
+    cache_stats = embedding_service.cache.stats()
+    logger.info(f"埋め込み生成完了 (キャッシュヒット率: {cache_stats['hit_rate']:.1%})")
     return enriched_chunks
@@ -12,6 +12,7 @@ from google.cloud import firestore
 
 from app.core.firestore import get_firestore_client
 from app.core.config import settings
+from app.modules.related.service import related_service
 from worker.pipeline import parser, chunker, embedder, indexer
 
 logger = logging.getLogger(__name__)
@@ -97,12 +98,24 @@ async def run_ingest(paper_id: str, owner_uid: str, request_id: str = "", pdf_ur
         await _update_status(db, paper_id, "READY", request_id)
         logger.info(f"[{request_id}] インジェスト成功完了")
 
+        # 8. 関連論文の事前計算リスト（この論文と、近傍の論文のリスト）を更新（失敗しても取り込みは成功扱い）
+        await _refresh_related_lists(paper_id, request_id)
+
     except Exception as e:
         logger.error(f"[{request_id}] インジェスト失敗: {e}", exc_info=True)
         await _update_status(db, paper_id, "FAILED", request_id, error=str(e))
         raise e
 
 
+async def _refresh_related_lists(paper_id: str, request_id: str) -> None:
+    try:
+        await related_service.materialized.refresh(paper_id, include_neighbors=True)
+        await related_service.materialized.drain()
+        logger.info(f"[{request_id}] 関連論文リスト更新完了")
+    except Exception as e:
+        logger.warning(f"[{request_id}] 関連論文リスト更新失敗: {e}")
+
+
 async def _update_status(db, paper_id: str, status: str, request_id: str, error: str | None = None):
     """Firestoreのステータス更新"""
     doc_ref = db.collection("papers").document(paper_id)